@@ -0,0 +1,9 @@
+"""Measurement scripts for the client subsystems.
+
+Every script is run from the repository root as a module, for example ``python -m benchmarks.abr_traces``.
+"""
+import os
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
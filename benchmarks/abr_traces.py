@@ -0,0 +1,123 @@
+"""Adaptive bitrate selection against scripted bandwidth traces.
+
+A local stand-in server delays every segment response by its size divided by the bandwidth of the trace at
+that moment. The Streamer downloads the segments while the playback consumes the buffer in real time, and
+the rebuffer count, the rebuffer time and the average bitrate are reported for every trace. The buffer
+thresholds are scaled down so that a trace takes half a minute.
+"""
+import argparse
+import asyncio
+import time
+
+from aiohttp import web
+
+from src.modules.abr import AbrController, Manifest, Rendition
+from src.modules.streamer import Streamer
+
+PORT: int = 22021
+BITRATES: tuple[int, ...] = (400_000, 1_000_000, 2_500_000, 5_000_000)
+
+# Bandwidth in bits per second as a list of (start time in seconds, bandwidth) steps.
+TRACES: dict[str, list[tuple[float, float]]] = {
+    'steady': [(0, 4_000_000)],
+    'step_down': [(0, 6_000_000), (10, 800_000), (20, 6_000_000)],
+    'oscillating': [(t, 3_000_000 if t % 8 == 0 else 1_000_000) for t in range(0, 30, 4)],
+    'outage': [(0, 4_000_000), (12, 150_000), (17, 4_000_000)],
+}
+
+
+class TraceServer:
+    """Stand-in segment server throttled by a bandwidth trace.
+
+    Attributes:
+        trace: Bandwidth steps.
+        started: The moment the trace started (in seconds of time.perf_counter).
+    """
+
+    def __init__(self, trace: list[tuple[float, float]]):
+        self.trace: list[tuple[float, float]] = trace
+        self.started: float = time.perf_counter()
+
+    def get_bandwidth(self) -> float:
+        """Get the bandwidth of the trace at the current moment.
+
+        Returns:
+            Bandwidth in bits per second.
+        """
+        elapsed: float = time.perf_counter() - self.started
+        return [bandwidth for start, bandwidth in self.trace if start <= elapsed][-1]
+
+    async def handle_segment(self, request: web.Request) -> web.Response:
+        """Send a segment of the requested rendition after the transfer time of the trace.
+
+        Args:
+            request: Segment request.
+
+        Returns:
+            Segment data.
+        """
+        size: int = int(request.match_info['bitrate']) // 8
+        await asyncio.sleep(size * 8 / self.get_bandwidth() + 0.02)
+        return web.Response(body=bytes(size))
+
+
+async def run_trace(name: str, duration: float) -> dict:
+    """Play the stream over one bandwidth trace.
+
+    Args:
+        name: Trace name.
+        duration: Playback time (in seconds).
+
+    Returns:
+        ABR metrics.
+    """
+    server: TraceServer = TraceServer(TRACES[name])
+    application: web.Application = web.Application()
+    application.router.add_get('/{bitrate}/{index}', server.handle_segment)
+    runner: web.AppRunner = web.AppRunner(application, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', PORT).start()
+
+    manifest: Manifest = Manifest(
+        [Rendition(f'{bitrate // 1000}k', bitrate, f'http://127.0.0.1:{PORT}/{bitrate}') for bitrate in BITRATES],
+        1, int(duration))
+    streamer: Streamer = Streamer('127.0.0.1', max_buffer=10)
+    streamer.manifest = manifest
+    streamer.controller = AbrController(manifest, reservoir=2, cushion=5.5)
+
+    server.started = time.perf_counter()
+    download: asyncio.Task = asyncio.create_task(streamer.run())
+    previous: float = time.perf_counter()
+    while time.perf_counter() - server.started < duration + 5:
+        await asyncio.sleep(1 / 60)
+        now: float = time.perf_counter()
+        streamer.advance(now - previous)
+        previous = now
+        if streamer.finished and streamer.buffer_level <= 0:
+            break
+
+    download.cancel()
+    await asyncio.gather(download, return_exceptions=True)
+    await runner.cleanup()
+    return streamer.controller.metrics.as_dict()
+
+
+async def main(arguments: argparse.Namespace):
+    """Run the traces and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    for name in arguments.traces:
+        metrics: dict = await run_trace(name, arguments.duration)
+        print(f'{name:12} rebuffers: {metrics["rebuffer_count"]:2d} '
+              f'rebuffer time: {metrics["rebuffer_time"]:5.2f} s '
+              f'average bitrate: {metrics["average_bitrate"] / 1000:6.0f} kbps '
+              f'switches: {metrics["switches_up"]} up, {metrics["switches_down"]} down', flush=True)
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--traces', nargs='+', choices=list(TRACES), default=list(TRACES))
+    parser.add_argument('--duration', type=float, default=30, help='playback time of a trace (in seconds)')
+    asyncio.run(main(parser.parse_args()))
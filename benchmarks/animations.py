@@ -0,0 +1,104 @@
+"""Cost of many simultaneous animations.
+
+Thousands of small sprites are animated at once, the way the Waiting sprite is: every sprite has an
+infinite tween of its position and a keyframe track of its color, and its image is redrawn once per frame
+however many of its tracks have changed. The time of one Animator pass and of the whole frame is reported
+per track, it should not grow with the number of animations. Leaving the scene must stop all its tracks,
+which is checked at the end of every run.
+"""
+import argparse
+import asyncio
+import time
+
+from pygame import Vector2
+
+from src.app import App
+from src.modules.animation import Animator, KeyframeTrack, Tween, ease_in_out_sine
+from src.sprite import Sprite
+
+COLORS: list[tuple[float, tuple[int, int, int]]] = [(0, (250, 200, 80)), (0.5, (80, 200, 250)),
+                                                     (1, (250, 200, 80))]
+
+
+class Blinker(Sprite):
+    """Small square that moves and changes its color.
+
+    Attributes:
+        color: Fill color.
+    """
+
+    def __init__(self, app: App, position: Vector2):
+        super().__init__(app, (8, 8), position)
+        self.color: tuple[int, int, int] = COLORS[0][1]
+        self.update_view()
+
+    def update_view(self):
+        self.mark_dirty()
+        self.image.fill(self.color)
+
+    async def update(self):
+        pass
+
+
+async def measure(app: App, count: int, frames: int) -> dict[str, float]:
+    """Measure the animations of the sprites on the Intro scene.
+
+    Args:
+        app: The main class of the application with the Intro scene open.
+        count: Number of animated sprites.
+        frames: Number of measured frames.
+
+    Returns:
+        Time per frame (in seconds) in {name: time} format.
+    """
+    animator: Animator = app.animator
+    for i in range(count):
+        position: Vector2 = Vector2(i * 13 % 1900, i * 7 % 1060)
+        sprite: Blinker = app.current_scene.add_sprite(f'blinker_{i}', Blinker(app, position))
+        animator.add(Tween(sprite, 'position', position, position + Vector2(20, 0), 1 + i % 5 / 10,
+                           easing=ease_in_out_sine, loops=0))
+        animator.add(KeyframeTrack(sprite, 'color', COLORS, loops=0))
+
+    animator_time: float = 0
+    started: float = time.perf_counter()
+    for _ in range(frames):
+        animator_started: float = time.perf_counter()
+        animator.update(1 / 60)
+        animator_time += time.perf_counter() - animator_started
+        app.update_view()
+    frame_time: float = time.perf_counter() - started
+
+    # Entering the Intro scene again exits it first.
+    await app.change_scene('Intro')
+    left: int = len(animator.tracks)
+    for i in range(count):
+        app.surface_pool.release(app.current_scene.get_sprite(f'blinker_{i}').image)
+        app.current_scene.remove_sprite(f'blinker_{i}')
+    return {'animator': animator_time / frames, 'frame': frame_time / frames, 'tracks left': left}
+
+
+async def main(arguments: argparse.Namespace):
+    """Run the measurements and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    app: App = App()
+    await app.init_scenes()
+    await app.change_scene('Intro')
+    for count in arguments.sprites:
+        result: dict[str, float] = await measure(app, count, arguments.frames)
+        tracks: int = count * 2
+        print(f'{tracks:6d} tracks: animator {result["animator"] * 1000:7.2f} ms '
+              f'({result["animator"] / tracks * 1e6:.2f} us per track), '
+              f'frame {result["frame"] * 1000:7.2f} ms, {result["tracks left"]} tracks left after the scene exit',
+              flush=True)
+    app.close_session()
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sprites', type=int, nargs='+', default=[500, 2000, 10000],
+                        help='numbers of animated sprites, every sprite has two tracks')
+    parser.add_argument('--frames', type=int, default=120, help='number of measured frames')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,138 @@
+"""Garbage collector pauses and allocation rate during a long session.
+
+Replays a long session on the Intro scene: typing into the server address input, a status text that
+changes every frame and a short-lived notification that appears and disappears every second, the churn
+the surface pool is meant to absorb. The session is replayed with and without the surface pool and with
+and without the boot-time objects frozen for the garbage collector. For every run the collections and
+pauses of every generation, the surface allocations, the net growth of Python memory blocks per frame and
+the time of one full collection after the session are reported.
+"""
+import argparse
+import asyncio
+import gc
+import statistics
+import sys
+import time
+
+from pygame import Vector2
+
+from src.app import App
+from src.modules.pool import SurfacePool
+from src.sprites import Text
+from benchmarks.input_keypresses import make_frames
+
+
+class PauseRecorder:
+    """Recorder of the garbage collector pauses, based on gc.callbacks.
+
+    Attributes:
+        pauses: Pause durations (in seconds) in {generation: [pause]} format.
+        _started: The moment the current collection started.
+    """
+
+    def __init__(self):
+        self.pauses: dict[int, list[float]] = {0: [], 1: [], 2: []}
+        self._started: float = 0
+
+    def __enter__(self) -> 'PauseRecorder':
+        gc.callbacks.append(self.on_collection)
+        return self
+
+    def __exit__(self, *args):
+        gc.callbacks.remove(self.on_collection)
+
+    def on_collection(self, phase: str, info: dict[str, int]):
+        """Record the start or the end of a collection.
+
+        Args:
+            phase: "start" or "stop".
+            info: Collection details with the generation.
+        """
+        if phase == 'start':
+            self._started = time.perf_counter()
+        else:
+            self.pauses[info['generation']].append(time.perf_counter() - self._started)
+
+
+async def run_session(app: App, frames: int) -> dict[str, float]:
+    """Replay the session and measure it.
+
+    Args:
+        app: The main class of the application with the Intro scene open.
+        frames: Number of frames.
+
+    Returns:
+        Measurements in {name: value} format.
+    """
+    status: Text = app.current_scene.add_sprite('status', Text(app, Vector2(960, 20), '', font_size=16))
+    stats_before: dict[str, float] = app.surface_pool.stats.as_dict()
+    blocks: int = 0
+    frame_times: list[float] = []
+    with PauseRecorder() as recorder:
+        for number, frame in enumerate(make_frames(frames)):
+            started: float = time.perf_counter()
+            blocks_before: int = sys.getallocatedblocks()
+            app.apply_input(frame)
+            status.text = f'frame {number}, {len(app.current_scene.sprites)} sprites'
+            status.update_view()
+            if number % 60 == 0:
+                app.current_scene.add_sprite('notification', Text(app, Vector2(960, 60), f'saved {number}'))
+            elif number % 60 == 30:
+                app.surface_pool.release(app.current_scene.get_sprite('notification').image)
+                app.current_scene.remove_sprite('notification')
+            await app.update()
+            blocks += max(sys.getallocatedblocks() - blocks_before, 0)
+            frame_times.append(time.perf_counter() - started)
+    app.current_scene.remove_sprite('status')
+    app.surface_pool.release(status.image)
+    if 'notification' in app.current_scene.sprites:
+        app.surface_pool.release(app.current_scene.get_sprite('notification').image)
+        app.current_scene.remove_sprite('notification')
+
+    full_started: float = time.perf_counter()
+    gc.collect()
+    full_collection: float = time.perf_counter() - full_started
+
+    pauses: list[float] = [pause for generation in recorder.pauses.values() for pause in generation]
+    result: dict[str, float] = {
+        'surfaces allocated per frame': (app.surface_pool.stats.allocated - stats_before['allocated']) / frames,
+        'net new blocks per frame': blocks / frames,
+        'median frame (ms)': statistics.median(frame_times) * 1000,
+        'total pause (ms)': sum(pauses) * 1000,
+        'max pause (ms)': max(pauses, default=0) * 1000,
+        'full collection (ms)': full_collection * 1000,
+    }
+    for generation, generation_pauses in recorder.pauses.items():
+        result[f'gen{generation} collections'] = len(generation_pauses)
+    return result
+
+
+async def main(arguments: argparse.Namespace):
+    """Run the sessions and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    app: App = App()
+    await app.init_scenes()
+    await app.change_scene('Intro')
+    # init_scenes froze the boot-time objects, the runs without freezing unfreeze them.
+    pooled: SurfacePool = app.surface_pool
+    for frozen in (True, False):
+        if not frozen:
+            gc.unfreeze()
+        for pool in (True, False):
+            app.surface_pool = pooled if pool else SurfacePool(max_per_key=0)
+            gc.collect()
+            result: dict[str, float] = await run_session(app, arguments.frames)
+            print(f'pool {"on " if pool else "off"}, boot objects {"frozen" if frozen else "scanned"}: '
+                  + ', '.join(f'{name} {value:.2f}' if isinstance(value, float) else f'{name} {value}'
+                              for name, value in result.items()), flush=True)
+    app.surface_pool = pooled
+    app.close_session()
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=6000, help='number of frames of every session')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,175 @@
+"""Connection monitor validation by killing and restarting a stand-in server.
+
+The stand-in server of the party simulation runs in its own process on a free port, and a restarted server
+listens on the same port. The connection monitor probes it and
+the sync channel is reconnected once the monitor sees the connection again, like in the Cinema scene. Every
+cycle kills the server, waits until the monitor detects the stall, restarts the server and waits until the
+monitor and the sync channel recover. The detection and recovery times are reported for every cycle.
+
+The errors of the stream downloading are checked as well: a refused connection is a network error that is
+reported to the monitor, while a missing manifest is not and is restarted with a backoff instead.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import time
+from typing import Any, Optional
+
+from src.modules.health import ConnectionHealth, HealthState, is_network_error
+from src.modules.message_queue import MessageQueue
+from src.modules.simulation import run_server
+from src.modules.streamer import Streamer
+from src.modules.sync_channel import SyncChannel
+
+UNHEALTHY_STATES: tuple[HealthState, ...] = (HealthState.STALLED, HealthState.RECONNECTING)
+
+
+async def start_server(started: float, port: Any) -> multiprocessing.Process:
+    """Start the stand-in server in its own process.
+
+    Args:
+        started: The moment the party started playing (unix time).
+        port: Shared integer value with the server port, 0 to listen on a free port. It is set to the port
+            the server listens on.
+
+    Returns:
+        Server process.
+
+    Raises:
+        RuntimeError: If the server did not start.
+    """
+    ready: Any = multiprocessing.Event()
+    server: multiprocessing.Process = multiprocessing.Process(
+        target=run_server, args=(started, 0.1, ready, port), name='stand-in-server', daemon=True)
+    server.start()
+    if not await asyncio.to_thread(ready.wait, 10):
+        server.kill()
+        raise RuntimeError('The stand-in server did not start.')
+    return server
+
+
+async def wait_for(condition: Any, timeout: float) -> Optional[float]:
+    """Wait until the condition is true, checking it every frame.
+
+    Args:
+        condition: Function without arguments returning whether the condition is met.
+        timeout: Maximum waiting time (in seconds).
+
+    Returns:
+        Waiting time (in seconds) or None if the condition was not met in time.
+    """
+    started: float = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if condition():
+            return time.perf_counter() - started
+        await asyncio.sleep(1 / 60)
+    return None
+
+
+def format_time(value: Optional[float]) -> str:
+    """Format a measured time.
+
+    Args:
+        value: Time (in seconds) or None if it was not measured.
+
+    Returns:
+        Formatted time.
+    """
+    return 'never' if value is None else f'{value:.2f} s'
+
+
+async def get_stream_error(host: str) -> Optional[BaseException]:
+    """Run the stream downloading once and get its error.
+
+    Args:
+        host: Server address with the port.
+
+    Returns:
+        Error or None if the downloading finished.
+    """
+    try:
+        await Streamer(host).run()
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        return error
+    return None
+
+
+async def keep_sync_channel(health: ConnectionHealth, queue: MessageQueue):
+    """Run the sync channel and reconnect it whenever the monitor sees the connection, like the Cinema scene.
+
+    Args:
+        health: Connection monitor, the channel connects to its server.
+        queue: The queue into which received messages are put.
+    """
+    while True:
+        if health.state in UNHEALTHY_STATES or health.state == HealthState.CONNECTING:
+            await asyncio.sleep(1 / 60)
+            continue
+        try:
+            await SyncChannel(health.host, queue).run()
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            if not is_network_error(error):
+                raise
+        health.report_failure()
+
+
+async def main(arguments: argparse.Namespace):
+    """Run the kill and restart cycles and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    started: float = time.time()
+    port: Any = multiprocessing.Value('i', 0)
+    server: multiprocessing.Process = await start_server(started, port)
+    host: str = f'127.0.0.1:{port.value}'
+    error: Optional[BaseException] = await get_stream_error(host)
+    print(f'stream without a manifest: {type(error).__name__}, network error: {is_network_error(error)}')
+
+    server.kill()
+    await asyncio.to_thread(server.join)
+    error = await get_stream_error(host)
+    print(f'stream without a server: {type(error).__name__}, network error: {is_network_error(error)}')
+    server = await start_server(started, port)
+
+    health: ConnectionHealth = ConnectionHealth(host)
+    queue: MessageQueue = MessageQueue()
+    health_task: asyncio.Task = asyncio.create_task(health.run())
+    sync_task: asyncio.Task = asyncio.create_task(keep_sync_channel(health, queue))
+    try:
+        if await wait_for(lambda: health.state == HealthState.CONNECTED, 10) is None:
+            print('The monitor did not connect to the stand-in server.')
+            return
+
+        for cycle in range(arguments.cycles):
+            await asyncio.sleep(arguments.uptime)
+            server.kill()
+            await asyncio.to_thread(server.join)
+            detection: Optional[float] = await wait_for(lambda: health.state in UNHEALTHY_STATES, 10)
+
+            await asyncio.sleep(arguments.downtime)
+            restarted: float = time.perf_counter()
+            server = await start_server(started, port)
+            startup: float = time.perf_counter() - restarted
+            queue.clear()
+            recovery: Optional[float] = await wait_for(
+                lambda: health.state in (HealthState.CONNECTED, HealthState.DEGRADED), 30)
+            resync: Optional[float] = await wait_for(lambda: len(queue) > 0, 30)
+            connected: Optional[float] = None if recovery is None else startup + recovery
+            synced: Optional[float] = None if connected is None or resync is None else connected + resync
+            print(f'cycle {cycle + 1}: stall detected in {format_time(detection)}, '
+                  f'connected in {format_time(connected)} and synced in {format_time(synced)} after the restart '
+                  f'(server startup {startup:.2f} s)', flush=True)
+    finally:
+        health_task.cancel()
+        sync_task.cancel()
+        await asyncio.gather(health_task, sync_task, return_exceptions=True)
+        server.kill()
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=3, help='number of kill and restart cycles')
+    parser.add_argument('--uptime', type=float, default=2, help='time before killing the server (in seconds)')
+    parser.add_argument('--downtime', type=float, default=3, help='time the server is down (in seconds)')
+    asyncio.run(main(parser.parse_args()))
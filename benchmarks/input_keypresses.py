@@ -0,0 +1,88 @@
+"""Cost of a keystroke in the text input as the text grows.
+
+Replays thousands of frames of typing into the server address input of the Intro scene, with occasional
+cursor movements, deletions and selections, through the same App input path as a recorded session. The
+frame time is reported for every block of keystrokes: it should stay flat while the text grows, because
+only the inserted characters are formatted and only the visible window is drawn.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import pygame as pg
+
+from src.app import App
+from src.modules.input_log import InputFrame
+from src.sprites import Input
+
+URL_CHARACTERS: str = 'abcdefghijklmnopqrstuvwxyz0123456789-._~:/?#[]@!$&()*+,;=%'
+EDITING_KEYS: tuple[int, ...] = (pg.K_LEFT, pg.K_RIGHT, pg.K_BACKSPACE, pg.K_DELETE, pg.K_HOME, pg.K_END)
+
+
+def make_frames(count: int, seed: int = 0) -> list[InputFrame]:
+    """Make the frames of typing a long URL, one key per frame.
+
+    Args:
+        count: Number of keystrokes.
+        seed: Seed of the typed characters and the editing keys.
+
+    Returns:
+        Frames.
+    """
+    generator: random.Random = random.Random(seed)
+    frames: list[InputFrame] = []
+    for i in range(count):
+        frame: InputFrame = InputFrame()
+        frame.delta_time = 1 / 60
+        if i % 50 == 49:
+            key: int = generator.choice(EDITING_KEYS)
+            frame.keys.append((key, -1))
+            if key in (pg.K_LEFT, pg.K_RIGHT) and generator.random() < 0.5:
+                frame.key_modifiers = pg.KMOD_SHIFT
+        else:
+            character: str = generator.choice(URL_CHARACTERS)
+            frame.keys.append((ord(character), ord(character)))
+        frames.append(frame)
+    # Typing continues at the end of the text after the editing keys moved the cursor.
+    for i in range(99, count, 100):
+        frames[i].keys = [(pg.K_END, -1)]
+    return frames
+
+
+async def main(arguments: argparse.Namespace):
+    """Replay the keystrokes and print the frame times.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    app: App = App()
+    await app.init_scenes()
+    await app.change_scene('Intro')
+    text_input: Input = app.current_scene.get_sprite('server_url_input')
+    text_input.selected = True
+
+    times: list[float] = []
+    for frame in make_frames(arguments.keys):
+        started: float = time.perf_counter()
+        app.apply_input(frame)
+        await app.update()
+        times.append(time.perf_counter() - started)
+
+    print(f'{len(text_input.buffer.text)} characters typed, {text_input.scroll} scrolled out of the input')
+    for start in range(0, len(times), arguments.block):
+        block: list[float] = times[start:start + arguments.block]
+        print(f'keys {start:6d}-{start + len(block) - 1:6d}: median {statistics.median(block) * 1e6:7.1f} us, '
+              f'max {max(block) * 1e6:7.1f} us per frame')
+    first: float = statistics.median(times[:arguments.block])
+    last: float = statistics.median(times[-arguments.block:])
+    print(f'last block / first block: {last / first:.2f}')
+    app.close_session()
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--keys', type=int, default=10000, help='number of replayed keystrokes')
+    parser.add_argument('--block', type=int, default=1000, help='number of keystrokes in a reported block')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,101 @@
+"""Frame loop jitter with the media worker in a thread and in a process.
+
+A stand-in frame loop runs for a while with Python work every frame and takes the decoded frames, like the
+Cinema scene does, while the media worker decodes segments with a decoder that holds the interpreter for
+a while per frame, like a decoder written in Python would. The frame times of the loop and the number of
+decoded frames are reported without a worker, with a thread worker and with a process worker.
+"""
+import argparse
+import statistics
+import time
+from typing import Iterator, Optional
+
+import pygame as pg
+
+from src.modules.media_worker import MediaWorker, decode_raw_frames
+
+FRAME_SIZE: tuple[int, int] = (640, 360)
+DECODE_WORK: int = 40000
+
+
+def decode_with_work(data: bytes, frame_bytes: int) -> Iterator[memoryview]:
+    """Split raw frames with Python work per frame, standing in for a decoder.
+
+    Args:
+        data: Segment data.
+        frame_bytes: Size of one frame (in bytes).
+
+    Returns:
+        Frames.
+    """
+    for frame in decode_raw_frames(data, frame_bytes):
+        checksum: int = 0
+        for value in range(DECODE_WORK):
+            checksum = (checksum * 31 + value) & 0xFFFF
+        yield frame
+
+
+def run_loop(worker: Optional[MediaWorker], duration: float, frame_work: int) -> tuple[list[float], int]:
+    """Run the stand-in frame loop.
+
+    Args:
+        worker: Started media worker or None to run the loop alone.
+        duration: Running time (in seconds).
+        frame_work: Number of Python loop iterations per frame.
+
+    Returns:
+        Frame times (in seconds) and the number of taken frames.
+    """
+    segment: bytes = bytes(FRAME_SIZE[0] * FRAME_SIZE[1] * 3 * 25)
+    target: pg.Surface = pg.Surface(FRAME_SIZE)
+    frame_times: list[float] = []
+    frames: int = 0
+    submitted: int = 0
+    started: float = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        frame_started: float = time.perf_counter()
+        if worker is not None:
+            # Two segments are kept queued ahead, so the worker is never idle.
+            while submitted - frames // 25 < 2:
+                worker.submit(segment)
+                submitted += 1
+            frame: Optional[pg.Surface] = worker.next_frame()
+            while frame is not None:
+                target.blit(frame, (0, 0))
+                worker.release_frame()
+                frames += 1
+                frame = worker.next_frame()
+        checksum: int = 0
+        for value in range(frame_work):
+            checksum = (checksum * 31 + value) & 0xFFFF
+        frame_times.append(time.perf_counter() - frame_started)
+    return frame_times, frames
+
+
+def main(arguments: argparse.Namespace):
+    """Run the measurements and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    for mode in (None, 'thread', 'process'):
+        worker: Optional[MediaWorker] = None
+        if mode is not None:
+            worker = MediaWorker(FRAME_SIZE, mode, decoder=decode_with_work)
+            worker.start()
+        frame_times, frames = run_loop(worker, arguments.duration, arguments.frame_work)
+        if worker is not None:
+            worker.stop()
+        frame_times.sort()
+        print(f'{mode or "no worker":9}: frame median {statistics.median(frame_times) * 1000:6.2f} ms, '
+              f'p95 {frame_times[int(len(frame_times) * 0.95)] * 1000:6.2f} ms, '
+              f'max {frame_times[-1] * 1000:6.2f} ms, {len(frame_times) / arguments.duration:6.1f} loop frames/s, '
+              f'{frames / arguments.duration:6.1f} decoded frames/s', flush=True)
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=5, help='running time of every mode (in seconds)')
+    parser.add_argument('--frame-work', type=int, default=40000,
+                        help='number of Python loop iterations per frame of the loop')
+    main(parser.parse_args())
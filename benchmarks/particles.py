@@ -0,0 +1,182 @@
+"""Moving, culling and hit-testing tens of thousands of particles.
+
+The same particles are kept in two ways: as separate sprites with their own Vector2 positions, updated and
+culled one by one, and in the TransformStore of a ParticleField, updated and culled with array operations.
+A frame moves every particle, culls them against the field, draws the visible ones with one batched blit
+and hit-tests the mouse position. The time of every step and of the whole frame is reported.
+"""
+import argparse
+import asyncio
+import gc
+import random
+import time
+from typing import Callable
+
+import pygame as pg
+from pygame import Vector2
+
+from src.app import App
+from src.sprite import Sprite
+from src.sprites import ParticleField
+from src.modules.transform_store import np
+
+FIELD_SIZE: tuple[int, int] = (1920, 1080)
+PARTICLE_SIZE: tuple[int, int] = (6, 6)
+
+
+class Particle(Sprite):
+    """Particle as a separate sprite.
+
+    Attributes:
+        velocity: Velocity in pixels per second.
+    """
+    __slots__ = ('velocity',)
+
+    def __init__(self, app: App, position: Vector2, velocity: Vector2):
+        super().__init__(app, PARTICLE_SIZE, position)
+        self.velocity: Vector2 = velocity
+        self.update_view()
+
+    def update_view(self):
+        self.mark_dirty()
+        self.image.fill((250, 200, 80))
+
+    async def update(self):
+        self.position += self.velocity * self.app.delta_time
+
+
+def measure_steps(steps: dict[str, Callable[[], None]], frames: int) -> dict[str, float]:
+    """Measure the time of every step of a frame.
+
+    Args:
+        steps: Steps of a frame in {name: function} format, run in this order every frame.
+        frames: Number of frames.
+
+    Returns:
+        Time per frame (in seconds) in {name: time} format, with the sum under "frame".
+    """
+    gc.collect()
+    times: dict[str, float] = dict.fromkeys(steps, 0.0)
+    for _ in range(frames):
+        for name, step in steps.items():
+            started: float = time.perf_counter()
+            step()
+            times[name] += time.perf_counter() - started
+    result: dict[str, float] = {name: total / frames for name, total in times.items()}
+    result['frame'] = sum(result.values())
+    return result
+
+
+def measure(app: App, count: int, frames: int) -> dict[str, dict[str, float]]:
+    """Measure both ways of keeping the particles.
+
+    Args:
+        app: The main class of the application.
+        count: Number of particles.
+        frames: Number of measured frames.
+
+    Returns:
+        Step times of every way in {way: {step: time}} format.
+    """
+    generator: random.Random = random.Random(0)
+    initial: list[tuple[tuple[float, float], tuple[float, float]]] = [
+        ((generator.uniform(-100, FIELD_SIZE[0] + 100), generator.uniform(-100, FIELD_SIZE[1] + 100)),
+         (generator.uniform(-60, 60), generator.uniform(-60, 60)))
+        for _ in range(count)]
+    target: pg.Surface = app.surface_pool.acquire(FIELD_SIZE)
+    viewport: pg.Rect = pg.Rect((0, 0), FIELD_SIZE)
+    mouse: tuple[int, int] = (FIELD_SIZE[0] // 2, FIELD_SIZE[1] // 2)
+    loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+
+    sprites: list[Particle] = [Particle(app, Vector2(position), Vector2(velocity)) for position, velocity in initial]
+    visible: list[Particle] = []
+    hits: list[Particle] = []
+
+    def move_sprites():
+        for sprite in sprites:
+            sprite.position += sprite.velocity * app.delta_time
+
+    def cull_sprites():
+        visible.clear()
+        visible.extend(sprite for sprite in sprites
+                       if viewport.colliderect(sprite.position.x, sprite.position.y, *PARTICLE_SIZE))
+
+    def draw_sprites():
+        target.fill((0, 0, 0, 0))
+        target.blits([(sprite.image, sprite.position) for sprite in visible], doreturn=False)
+
+    def hit_test_sprites():
+        hits.clear()
+        for sprite in sprites:
+            if pg.Rect(sprite.position, PARTICLE_SIZE).collidepoint(mouse):
+                hits.append(sprite)
+
+    app.delta_time = 1 / 60
+    results: dict[str, dict[str, float]] = {
+        'sprites': measure_steps({'move': move_sprites, 'cull': cull_sprites, 'draw': draw_sprites,
+                                  'hit-test': hit_test_sprites}, frames),
+    }
+    # The sprites are released first, so the garbage collector does not walk them during the other runs.
+    particle: pg.Surface = sprites[0].image.copy()
+    for sprite in sprites:
+        app.surface_pool.release(sprite.image)
+    sprites.clear()
+    visible.clear()
+    hits.clear()
+
+    field: ParticleField = ParticleField(app, Vector2(0, 0), FIELD_SIZE, particle, capacity=count)
+    for position, velocity in initial:
+        field.emit(position, velocity, float('inf'))
+
+    def move_store():
+        alive: np.ndarray = field.store.alive
+        field.store.positions[alive] += field.velocities[:len(alive)][alive] * app.delta_time
+
+    slots: list[np.ndarray] = []
+
+    def cull_store():
+        slots[:] = [field.store.cull((0, 0, FIELD_SIZE[0], FIELD_SIZE[1]))]
+
+    def draw_store():
+        target.fill((0, 0, 0, 0))
+        target.blits([(field.particle, position) for position in field.store.positions[slots[0]].tolist()],
+                     doreturn=False)
+
+    def hit_test_store():
+        field.store.hit_test(mouse)
+
+    def update_field():
+        loop.run_until_complete(field.update())
+
+    results['transform store'] = measure_steps({'move': move_store, 'cull': cull_store, 'draw': draw_store,
+                                                'hit-test': hit_test_store}, frames)
+    results['ParticleField.update'] = measure_steps({'update': update_field}, frames)
+    loop.close()
+    app.surface_pool.release(field.image)
+    app.surface_pool.release(target)
+    return results
+
+
+def main(arguments: argparse.Namespace):
+    """Run the measurements and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    app: App = App()
+    for count in arguments.particles:
+        results: dict[str, dict[str, float]] = measure(app, count, arguments.frames)
+        print(f'{count} particles:')
+        for way, steps in results.items():
+            print(f'  {way:22} ' + ', '.join(f'{step} {value * 1000:6.2f} ms' for step, value in steps.items()),
+                  flush=True)
+        speedup: float = results['sprites']['frame'] / results['transform store']['frame']
+        print(f'  the transform store frame is {speedup:.1f}x cheaper', flush=True)
+    app.close_session()
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--particles', type=int, nargs='+', default=[10000, 50000], help='numbers of particles')
+    parser.add_argument('--frames', type=int, default=60, help='number of measured frames')
+    main(parser.parse_args())
@@ -0,0 +1,52 @@
+"""Binary sync frames compared with the JSON equivalent.
+
+Frames of position reports are encoded and decoded with the binary protocol and with json, and the time per
+frame and the frame size are reported.
+"""
+import argparse
+import json
+import random
+import timeit
+
+from src.modules.protocol import FrameDecoder, MessageType, SyncMessage, encode_frame
+
+
+def main(arguments: argparse.Namespace):
+    """Run the comparison and print the results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    generator: random.Random = random.Random(0)
+    messages: list[SyncMessage] = [
+        SyncMessage(MessageType.POSITION, peer, generator.randrange(100_000), generator.randrange(7_200_000),
+                    generator.randrange(2 ** 40))
+        for peer in range(arguments.messages)]
+
+    binary: bytes = encode_frame(messages)
+    text: bytes = json.dumps([message.as_dict() for message in messages]).encode()
+    decoder: FrameDecoder = FrameDecoder()
+
+    def decode_json():
+        for fields in json.loads(text):
+            message: SyncMessage = SyncMessage(MessageType(fields['type']), fields['peer'], fields['sequence'],
+                                               fields['position'], fields['timestamp'])
+            del message
+
+    cases: dict[str, tuple] = {
+        'binary encode': (lambda: encode_frame(messages), len(binary)),
+        'json encode': (lambda: json.dumps([message.as_dict() for message in messages]).encode(), len(text)),
+        'binary decode': (lambda: decoder.decode(binary), len(binary)),
+        'json decode': (decode_json, len(text)),
+    }
+    print(f'{arguments.messages} position reports per frame')
+    for name, (function, size) in cases.items():
+        seconds: float = min(timeit.repeat(function, number=arguments.number, repeat=5)) / arguments.number
+        print(f'{name:14} {seconds * 1e6:8.2f} us/frame {size:6d} bytes')
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=16, help='messages per frame')
+    parser.add_argument('--number', type=int, default=2000, help='frames per measurement')
+    main(parser.parse_args())
@@ -0,0 +1,130 @@
+"""Render pass throughput on scenes with thousands of sprites.
+
+Thousands of small sprites are added to the Intro scene: most of them stand still, some move every frame,
+and a part of them is placed off-screen or has an empty image. The render pass of App, which caches the
+screen rects and culls the sprites outside the viewport before one batched blit, is compared with the
+render pass it replaced, which blitted every sprite separately with a new rect every frame.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import pygame as pg
+from pygame import Vector2
+
+from src.app import App
+from src.sprite import Sprite
+
+WINDOW_SIZE: tuple[int, int] = (1920, 1080)
+
+
+class Dot(Sprite):
+    """Small filled square.
+
+    Attributes:
+        velocity: Movement per frame (zero for a standing sprite).
+    """
+
+    def __init__(self, app: App, position: Vector2, size: tuple[int, int], velocity: Vector2):
+        super().__init__(app, size, position)
+        self.velocity: Vector2 = velocity
+        self.update_view()
+
+    def update_view(self):
+        self.mark_dirty()
+        self.image.fill((200, 120, 40))
+
+    async def update(self):
+        pass
+
+    def move(self):
+        """Move the sprite by its velocity, wrapping around the window.
+        """
+        if self.velocity.x or self.velocity.y:
+            self.position.x = (self.position.x + self.velocity.x) % WINDOW_SIZE[0]
+            self.position.y = (self.position.y + self.velocity.y) % WINDOW_SIZE[1]
+
+
+def draw_separately(app: App):
+    """The render pass before the draw list: one blit and one new rect per sprite, without culling.
+
+    Args:
+        app: The main class of the application.
+    """
+    window_size: tuple[int, int] = pg.display.get_window_size()
+    x_factor: float = window_size[0] / 1920
+    y_factor: float = window_size[1] / 1080
+    app.screen.fill((32, 32, 32))
+    for sprite in app.current_scene.get_draw_order():
+        app.screen.blit(sprite.image, pg.Rect(sprite.position.x * x_factor, sprite.position.y * y_factor,
+                                              sprite.image.get_width(), sprite.image.get_height()))
+    pg.display.flip()
+
+
+def measure(app: App, sprites: int, frames: int, moving: float, off_screen: float) -> dict[str, float]:
+    """Measure both render passes on one scene.
+
+    Args:
+        app: The main class of the application with the Intro scene open.
+        sprites: Number of sprites.
+        frames: Number of measured frames of every render pass.
+        moving: Share of the sprites that move every frame.
+        off_screen: Share of the sprites that are off-screen or have an empty image.
+
+    Returns:
+        Time per frame (in seconds) in {render pass: time} format.
+    """
+    generator: random.Random = random.Random(0)
+    dots: list[Dot] = []
+    for i in range(sprites):
+        position: Vector2 = Vector2(generator.uniform(0, WINDOW_SIZE[0]), generator.uniform(0, WINDOW_SIZE[1]))
+        size: tuple[int, int] = (8, 8)
+        if generator.random() < off_screen:
+            if generator.random() < 0.5:
+                position.x += WINDOW_SIZE[0] + 100
+            else:
+                size = (0, 0)
+        velocity: Vector2 = (Vector2(generator.uniform(-3, 3), generator.uniform(-3, 3))
+                             if generator.random() < moving else Vector2(0, 0))
+        dots.append(app.current_scene.add_sprite(f'dot_{i}', Dot(app, position, size, velocity)))
+
+    results: dict[str, float] = {}
+    for name, draw in (('separate blits', draw_separately), ('draw list', App.update_view)):
+        started: float = time.perf_counter()
+        for _ in range(frames):
+            for dot in dots:
+                dot.move()
+            draw(app)
+        results[name] = (time.perf_counter() - started) / frames
+
+    for i in range(sprites):
+        app.current_scene.remove_sprite(f'dot_{i}')
+    return results
+
+
+async def main(arguments: argparse.Namespace):
+    """Run the measurements and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    app: App = App()
+    await app.init_scenes()
+    await app.change_scene('Intro')
+    for sprites in arguments.sprites:
+        results: dict[str, float] = measure(app, sprites, arguments.frames, arguments.moving, arguments.off_screen)
+        print(f'{sprites:6d} sprites: separate blits {results["separate blits"] * 1000:6.2f} ms, '
+              f'draw list {results["draw list"] * 1000:6.2f} ms per frame '
+              f'({results["separate blits"] / results["draw list"]:.2f}x)', flush=True)
+    app.close_session()
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sprites', type=int, nargs='+', default=[1000, 5000, 20000], help='numbers of sprites')
+    parser.add_argument('--frames', type=int, default=200, help='number of measured frames of every render pass')
+    parser.add_argument('--moving', type=float, default=0.1, help='share of the sprites that move every frame')
+    parser.add_argument('--off-screen', type=float, default=0.2,
+                        help='share of the sprites that are off-screen or have an empty image')
+    asyncio.run(main(parser.parse_args()))
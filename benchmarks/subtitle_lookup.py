@@ -0,0 +1,143 @@
+"""Subtitle lookup on files with tens of thousands of cues.
+
+A subtitle file with tens of thousands of short cues is generated, optionally with one cue shown for the
+whole film, like a sign translation or a song title. Its parsing and indexing are timed, then the active
+cues are looked up for every frame of linear playback, where SubtitleIndex moves its cursor forward, and
+for random seeks, where it searches its interval tree. It is compared with the lookup the tree replaced,
+which scanned every cue between the first one that could still be shown by the running maximum of the end
+times and the position, so one long cue made it scan all the cues after it.
+"""
+import argparse
+import random
+import time
+from bisect import bisect_right
+
+from src.modules.subtitles import Cue, SubtitleIndex, parse_subtitles
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format an SRT timestamp.
+
+    Args:
+        seconds: Time (in seconds).
+
+    Returns:
+        Timestamp like 01:02:03,456.
+    """
+    milliseconds: int = round(seconds * 1000)
+    return (f'{milliseconds // 3_600_000:02d}:{milliseconds // 60_000 % 60:02d}:'
+            f'{milliseconds // 1000 % 60:02d},{milliseconds % 1000:03d}')
+
+
+def make_srt(count: int, long_cue: bool, seed: int = 0) -> tuple[str, float]:
+    """Make the content of an SRT file with back-to-back cues of one to four seconds.
+
+    Args:
+        count: Number of cues.
+        long_cue: Whether to add a cue shown for the whole film.
+        seed: Seed of the cue durations.
+
+    Returns:
+        File content and the film duration (in seconds).
+    """
+    generator: random.Random = random.Random(seed)
+    blocks: list[str] = []
+    position: float = 0
+    for number in range(1, count + 1):
+        duration: float = generator.uniform(1, 4)
+        blocks.append(f'{number}\n{format_timestamp(position)} --> {format_timestamp(position + duration)}\n'
+                      f'Line number {number}\n')
+        position += duration + generator.uniform(0, 0.5)
+    if long_cue:
+        blocks.append(f'{count + 1}\n{format_timestamp(0)} --> {format_timestamp(position)}\n[Song title]\n')
+    return '\n'.join(blocks), position
+
+
+class RunningMaxLookup:
+    """The lookup SubtitleIndex used before the interval tree.
+
+    Attributes:
+        cues: Cues sorted by start time.
+        starts: Start times of the cues.
+        max_ends: Running maximum of the end times.
+    """
+
+    def __init__(self, index: SubtitleIndex):
+        """Initialization.
+
+        Args:
+            index: Subtitle index with the cues.
+        """
+        self.cues: list[Cue] = index.cues
+        self.starts: list[float] = index.starts
+        self.max_ends: list[float] = []
+        max_end: float = float('-inf')
+        for cue in self.cues:
+            max_end = max(max_end, cue.end)
+            self.max_ends.append(max_end)
+
+    def get_active(self, position: float) -> list[Cue]:
+        """Get the cues shown at the position.
+
+        Args:
+            position: Media position (in seconds).
+
+        Returns:
+            Active cues sorted by start time.
+        """
+        high: int = bisect_right(self.starts, position)
+        low: int = bisect_right(self.max_ends, position, 0, high)
+        return [cue for cue in self.cues[low:high] if cue.end > position]
+
+
+def measure_lookups(lookup: SubtitleIndex | RunningMaxLookup, positions: list[float]) -> float:
+    """Measure the lookups of the active cues.
+
+    Args:
+        lookup: Lookup of the active cues.
+        positions: Looked up positions (in seconds).
+
+    Returns:
+        Time per lookup (in seconds).
+    """
+    started: float = time.perf_counter()
+    for position in positions:
+        lookup.get_active(position)
+    return (time.perf_counter() - started) / len(positions)
+
+
+def main(arguments: argparse.Namespace):
+    """Run the measurements and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    generator: random.Random = random.Random(1)
+    for long_cue in (False, True):
+        content, duration = make_srt(arguments.cues, long_cue)
+        started: float = time.perf_counter()
+        cues: list[Cue] = parse_subtitles(content)
+        parsed: float = time.perf_counter() - started
+        started = time.perf_counter()
+        index: SubtitleIndex = SubtitleIndex(cues)
+        indexed: float = time.perf_counter() - started
+        print(f'{len(index)} cues{" with a whole-film cue" if long_cue else ""}: parsed in {parsed:.2f} s, '
+              f'indexed in {indexed:.2f} s', flush=True)
+
+        first_frame: int = generator.randrange(int(duration * 60) - arguments.lookups)
+        playback: list[float] = [frame / 60 for frame in range(first_frame, first_frame + arguments.lookups)]
+        seeks: list[float] = [generator.uniform(0, duration) for _ in range(arguments.lookups)]
+        previous: RunningMaxLookup = RunningMaxLookup(index)
+        for name, positions in (('playback', playback), ('seeks', seeks)):
+            assert all(index.get_active(position) == previous.get_active(position) for position in positions[:100])
+            current: float = measure_lookups(index, positions)
+            running_max: float = measure_lookups(previous, positions)
+            print(f'  {name:8}: SubtitleIndex {current * 1e6:8.2f} us, running maximum {running_max * 1e6:9.2f} us '
+                  f'per lookup ({running_max / current:.1f}x)', flush=True)
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cues', type=int, default=50000, help='number of short cues')
+    parser.add_argument('--lookups', type=int, default=2000, help='number of lookups of every kind')
+    main(parser.parse_args())
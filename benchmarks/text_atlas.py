@@ -0,0 +1,117 @@
+"""Cost of changing text every frame: rendered text against the glyph atlas.
+
+A timecode that changes every frame is drawn in several ways: the way Text rendered before the atlas
+(loading the font and allocating the surface every time, as LagMachine did every frame), a new Text sprite
+per frame, one Text sprite re-rendered per frame, one AtlasText sprite, and the atlas drawing into an opaque
+surface like LagMachine does now. The time per frame and the speedup of the atlas are reported. Adding
+characters outside the initial set one by one is measured as well, its cost per character should not grow
+with the size of the atlas.
+"""
+import argparse
+import os
+import time
+from typing import Callable
+
+import pygame as pg
+from pygame import SRCALPHA, Vector2
+
+from src.app import App
+from src.sprites import AtlasText, GlyphAtlas, Text
+
+
+def format_timecode(frame: int) -> str:
+    """Format the timecode of the frame.
+
+    Args:
+        frame: Frame number at 60 frames per second.
+
+    Returns:
+        Timecode in "hh:mm:ss.mmm" format.
+    """
+    milliseconds: int = frame * 1000 // 60
+    return (f'{milliseconds // 3_600_000:02d}:{milliseconds // 60_000 % 60:02d}:'
+            f'{milliseconds // 1000 % 60:02d}.{milliseconds % 1000:03d}')
+
+
+def measure(draw: Callable[[int], None], frames: int) -> float:
+    """Measure the time of drawing the frames.
+
+    Args:
+        draw: Function drawing the frame with the given number.
+        frames: Number of frames.
+
+    Returns:
+        Time per frame (in seconds).
+    """
+    started: float = time.perf_counter()
+    for frame in range(frames):
+        draw(frame)
+    return (time.perf_counter() - started) / frames
+
+
+def main(arguments: argparse.Namespace):
+    """Run the measurements and print their results.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    app: App = App()
+    position: Vector2 = Vector2(960, 540)
+    font_path: str = os.path.join('assets', 'fonts', 'MainFont.ttf')
+
+    def draw_text_before_atlas(frame: int):
+        text: str = format_timecode(frame)
+        size: tuple[int, int] = pg.font.Font(font_path, 24).render(text, True, (255, 255, 255)).get_size()
+        image: pg.Surface = pg.Surface(size, SRCALPHA, 32).convert_alpha()
+        image.blit(pg.font.Font(font_path, 24).render(text, True, (255, 255, 255)), (0, 0))
+
+    def draw_new_text(frame: int):
+        text: Text = Text(app, position, format_timecode(frame), font_size=24)
+        app.surface_pool.release(text.image)
+
+    rendered: Text = Text(app, position, format_timecode(0), font_size=24)
+
+    def draw_rendered_text(frame: int):
+        rendered.text = format_timecode(frame)
+        rendered.update_view()
+
+    atlas_text: AtlasText = AtlasText(app, position, format_timecode(0), font_size=24)
+
+    def draw_atlas_text(frame: int):
+        atlas_text.set_text(format_timecode(frame))
+
+    opaque: pg.Surface = pg.Surface((200, 50))
+    sequence: list[list] = []
+
+    def draw_atlas_opaque(frame: int):
+        opaque.fill((32, 32, 32))
+        atlas_text.atlas.draw(opaque, format_timecode(frame), (10, 10), sequence)
+
+    results: dict[str, float] = {
+        'Text before the atlas': measure(draw_text_before_atlas, arguments.frames),
+        'new Text per frame': measure(draw_new_text, arguments.frames),
+        'Text re-rendered per frame': measure(draw_rendered_text, arguments.frames),
+        'AtlasText': measure(draw_atlas_text, arguments.frames),
+        'atlas into an opaque surface': measure(draw_atlas_opaque, arguments.frames),
+    }
+    for name, frame_time in results.items():
+        print(f'{name:28} {frame_time * 1e6:8.1f} us per frame, '
+              f'atlas is {frame_time / results["AtlasText"]:5.1f}x cheaper', flush=True)
+
+    atlas: GlyphAtlas = GlyphAtlas(font_path, 24, (255, 255, 255))
+    block: int = arguments.characters // 4
+    for start in range(0, arguments.characters, block):
+        started: float = time.perf_counter()
+        for code in range(0x4E00 + start, 0x4E00 + start + block):
+            atlas.get_rect(chr(code))
+        print(f'new characters {start:5d}-{start + block - 1:5d}: '
+              f'{(time.perf_counter() - started) / block * 1e6:6.1f} us per character, '
+              f'atlas width {atlas.surface.get_width()} px', flush=True)
+    app.close_session()
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=3000, help='number of drawn frames of every way')
+    parser.add_argument('--characters', type=int, default=2000, help='number of characters added to the atlas')
+    main(parser.parse_args())
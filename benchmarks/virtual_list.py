@@ -0,0 +1,107 @@
+"""Frame time of scrolling a chat log with a hundred thousand messages.
+
+A VirtualList on the Intro scene is filled with generated chat messages of one to forty words, then the
+frames are replayed through the App input path with the mouse over the list: the wheel scrolls it up by a
+few steps every frame, and now and then the list jumps to a random position, like a drag of a scroll bar.
+The time of filling the list and the frame times while scrolling are reported, the 95th percentile should
+stay well within the 16.7 ms of a 60 FPS frame however many messages the list has.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from pygame import Vector2
+
+from src.app import App
+from src.modules.input_log import InputFrame
+from src.sprites import VirtualList
+
+WORDS: tuple[str, ...] = ('hello', 'the', 'movie', 'is', 'starting', 'wait', 'for', 'me', 'pause', 'please',
+                          'that', 'scene', 'was', 'great', 'lol', 'who', 'is', 'this', 'actor', 'again',
+                          'buffering', 'here', 'ok', 'now', 'back', 'in', 'sync', 'popcorn', 'time', 'brb')
+LIST_POSITION: Vector2 = Vector2(1400, 100)
+LIST_SIZE: tuple[int, int] = (480, 860)
+
+
+def make_messages(count: int, seed: int = 0) -> list[str]:
+    """Make chat messages.
+
+    Args:
+        count: Number of messages.
+        seed: Seed of the message lengths and words.
+
+    Returns:
+        Messages.
+    """
+    generator: random.Random = random.Random(seed)
+    return [f'user{generator.randrange(50)}: ' + ' '.join(generator.choices(WORDS, k=generator.randint(1, 40)))
+            for _ in range(count)]
+
+
+def make_frames(count: int, seed: int = 0) -> list[InputFrame]:
+    """Make the frames of scrolling the list with the mouse wheel.
+
+    Args:
+        count: Number of frames.
+        seed: Seed of the scroll steps.
+
+    Returns:
+        Frames.
+    """
+    generator: random.Random = random.Random(seed)
+    frames: list[InputFrame] = []
+    for _ in range(count):
+        frame: InputFrame = InputFrame()
+        frame.delta_time = 1 / 60
+        frame.mouse_position = (int(LIST_POSITION.x) + LIST_SIZE[0] // 2, int(LIST_POSITION.y) + LIST_SIZE[1] // 2)
+        frame.mouse_wheel = generator.randint(1, 3)
+        frames.append(frame)
+    return frames
+
+
+async def main(arguments: argparse.Namespace):
+    """Fill the list, scroll it and print the frame times.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    app: App = App()
+    await app.init_scenes()
+    await app.change_scene('Intro')
+    chat: VirtualList = app.current_scene.add_sprite('chat', VirtualList(app, LIST_POSITION, LIST_SIZE))
+
+    messages: list[str] = make_messages(arguments.messages)
+    started: float = time.perf_counter()
+    chat.extend(messages)
+    filled: float = time.perf_counter() - started
+    print(f'{len(chat)} messages, {chat.content_height} px of content: filled in {filled:.2f} s', flush=True)
+
+    generator: random.Random = random.Random(1)
+    times: list[float] = []
+    for number, frame in enumerate(make_frames(arguments.frames)):
+        started = time.perf_counter()
+        if number % arguments.jump_every == arguments.jump_every - 1:
+            chat.scroll_to(generator.uniform(0, chat.get_max_scroll()))
+        app.apply_input(frame)
+        await app.update()
+        times.append(time.perf_counter() - started)
+
+    times.sort()
+    print(f'{len(times)} scrolling frames: median {statistics.median(times) * 1000:.2f} ms, '
+          f'p95 {times[int(len(times) * 0.95)] * 1000:.2f} ms, p99 {times[int(len(times) * 0.99)] * 1000:.2f} ms, '
+          f'max {times[-1] * 1000:.2f} ms', flush=True)
+    chat.clear()
+    app.surface_pool.release(chat.image)
+    app.current_scene.remove_sprite('chat')
+    app.close_session()
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=100000, help='number of messages in the list')
+    parser.add_argument('--frames', type=int, default=3000, help='number of scrolling frames')
+    parser.add_argument('--jump-every', type=int, default=120,
+                        help='number of frames between jumps to a random position')
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+"""Headless party simulation.
+
+Starts the stand-in server and runs parties of growing size against it, for example:
+
+    python simulate.py --clients 10 50 100 --duration 20 --processes 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from typing import Any
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+
+# pylint: disable=wrong-import-position
+from src.modules.simulation import run_server, simulate_party
+
+COLUMNS: tuple[tuple[str, str], ...] = (
+    ('clients', 'clients'),
+    ('connected', 'connected'),
+    ('error_p95_median_ms', 'p95 err, median client (ms)'),
+    ('error_p95_worst_ms', 'p95 err, worst client (ms)'),
+    ('error_max_ms', 'max err (ms)'),
+    ('received_per_second', 'msg/s per client'),
+    ('cpu_ms_per_second', 'client CPU (ms/s)'),
+    ('process_cpu_ms_per_second', 'process CPU per client (ms/s)'),
+    ('seeks', 'seeks'),
+    ('overflowed', 'queue overflows'),
+)
+
+
+async def main(arguments: argparse.Namespace):
+    """The function starts when the program is started.
+
+    Args:
+        arguments: Command line arguments.
+    """
+    started: float = time.time()
+    ready: Any = multiprocessing.Event()
+    port: Any = multiprocessing.Value('i', arguments.port)
+    server: multiprocessing.Process = multiprocessing.Process(
+        target=run_server, args=(started, arguments.broadcast_interval, ready, port), name='stand-in-server',
+        daemon=True)
+    server.start()
+    if not await asyncio.to_thread(ready.wait, 10):
+        logging.error('The stand-in server did not start.')
+        return
+    host: str = f'127.0.0.1:{port.value}'
+
+    results: list[dict[str, Any]] = []
+    try:
+        for clients in arguments.clients:
+            print(f'Simulating a party of {clients} clients for {arguments.duration:.0f} s.', flush=True)
+            result: dict[str, Any] = await simulate_party(
+                clients, host, started, arguments.duration, arguments.processes, frame_rate=arguments.frame_rate,
+                clock_error=arguments.clock_error, report_interval=arguments.report_interval,
+                dead_zone=arguments.dead_zone, seek_threshold=arguments.seek_threshold)
+            results.append(result)
+            print(' | '.join(f'{title}: {result[key]:.1f}' if isinstance(result[key], float) else
+                             f'{title}: {result[key]}' for key, title in COLUMNS), flush=True)
+    finally:
+        server.terminate()
+        server.join()
+
+    if arguments.output:
+        with open(arguments.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[10, 50, 100], help='party sizes to simulate')
+    parser.add_argument('--duration', type=float, default=20, help='running time of a party (in seconds)')
+    parser.add_argument('--processes', type=int, default=1, help='number of processes to split the clients across')
+    parser.add_argument('--frame-rate', type=float, default=60, help='frames per second of every client')
+    parser.add_argument('--clock-error', type=float, default=0.005,
+                        help='maximum deviation of the client clock rates from 1')
+    parser.add_argument('--report-interval', type=float, default=1,
+                        help='time between position reports of a client (in seconds)')
+    parser.add_argument('--broadcast-interval', type=float, default=0.1,
+                        help='time between relays of the reports by the server (in seconds)')
+    parser.add_argument('--dead-zone', type=float, default=0.04,
+                        help='error below which the drift corrector makes no correction (in seconds)')
+    parser.add_argument('--seek-threshold', type=float, default=1,
+                        help='error above which the drift corrector makes a hard seek (in seconds)')
+    parser.add_argument('--port', type=int, default=0, help='port of the stand-in server (0 for a free port)')
+    parser.add_argument('--output', help='path of a JSON file with the results of every client')
+    logging.basicConfig(level=logging.WARNING, format='[%(asctime)s][%(levelname)s] %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S')
+    asyncio.run(main(parser.parse_args()))
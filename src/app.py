@@ -3,8 +3,10 @@
 Implements the main application cycle, scenes management (states) and rendering.
 """
 import asyncio
+import gc
 import os
 import logging
+import time
 from typing import Any, TypeVar, Type, Optional, Awaitable
 
 from colorlog import ColoredFormatter
@@ -15,6 +17,11 @@ from pygame.time import Clock
 
 from src.scene import Scene
 from src.audio import Audio
+from src.modules.pool import SurfacePool
+from src.modules.animation import Animator
+from src.modules.input_log import InputFrame, InputRecorder, InputReplay, FrameCapture
+from src.modules.metrics import MetricsRegistry, MetricsExporter, Counter, Histogram, NullMetric
+from src.modules.profiler import SamplingProfiler, AllocationTracker, FramePhase
 
 # DO NOT DELETE IMPORT. It is necessary that all child classes of Scene are initialized
 from src.scenes import *  # pylint: disable=wildcard-import
@@ -29,15 +36,35 @@ class App:
         scenes (dict[str, Scenes]): Dictionary of all registered scenes.
         current_scene (Scene | None): Current active status.
         transmitted_data (dict[str, Any]): Data to transfer between scenes.
+        surface_pool (SurfacePool): Pool of reusable sprite surfaces.
+        animator (Animator): Animations of all sprites, advanced once per frame.
         screen (Surface): The main surface for rendering.
         clock (Clock): Timer for FPS control.
         omitted_buttons (list[int]): List of omitted keyboard buttons.
+        omitted_keys (list[int]): List of key codes of omitted keyboard buttons, including non-character keys.
+        key_modifiers (int): Bitmask of the held modifier keys.
         omitted_mouse_buttons (list[int]): List of omitted mouse buttons.
         is_mouse_move (bool): Mouse movement flag.
         running (bool): Application lifecycle operation flag.
         delta_time (float): Time between frames (in seconds).
         lock_mouse (bool): The mouse cursor lock flag.
         mouse_offset (tuple[int, int]): Mouse offset from the last frame.
+        mouse_wheel (int): Vertical mouse wheel scroll since the last frame (positive is away from the user).
+        mouse_position (tuple[int, int]): Mouse position in the current frame.
+        mouse_pressed (tuple[bool, bool, bool]): Held mouse buttons (left, middle, right) in the current frame.
+        recorder (InputRecorder | None): Recorder of the input (WATCHSYNC_RECORD environment variable).
+        replay (InputReplay | None): Replayed input used instead of the events (WATCHSYNC_REPLAY).
+        frame_capture (FrameCapture | None): Frame times and hashes of the run (WATCHSYNC_FRAME_TIMES and
+            WATCHSYNC_FRAME_HASHES).
+        metrics (MetricsRegistry): Application metrics, disabled unless they are exported.
+        metrics_exporter (MetricsExporter | None): Exporter of the metrics (WATCHSYNC_METRICS_FILE and
+            WATCHSYNC_METRICS_PORT).
+        profiler (SamplingProfiler): Sampling profiler, toggled by Ctrl+Shift+P or started by WATCHSYNC_PROFILE.
+        profile_path (str | None): Path of the profile (a new file in the logs directory for every run if None).
+        allocation_tracker (AllocationTracker): Allocation differences between scene switches, toggled by
+            Ctrl+Shift+M or started by WATCHSYNC_TRACEMALLOC.
+        message_budget (float): Time limit for handling inbound messages per frame (in seconds).
+        _draw_list (list[tuple[Surface, Rect]]): Reusable list of the visible sprites for the render pass.
         _previous_mouse_location (tuple[int, int]): Previous mouse position.
     """
 
@@ -45,10 +72,29 @@ class App:
         """Initialization.
         """
         App.configure_logs()
+        self.recorder: Optional[InputRecorder] = None
+        self.replay: Optional[InputReplay] = None
+        self.frame_capture: Optional[FrameCapture] = None
+        self.metrics: MetricsRegistry = MetricsRegistry()
+        self.metrics_exporter: Optional[MetricsExporter] = None
+        self.profiler: SamplingProfiler = SamplingProfiler()
+        self.profile_path: Optional[str] = None
+        self.allocation_tracker: AllocationTracker = AllocationTracker(os.path.join('logs', 'allocations.txt'))
+        self.configure_session()
+
+        self._frame_time: Histogram | NullMetric = self.metrics.histogram(
+            'frame_time_seconds', 'Time of updating and drawing a frame.')
+        self._input_events: Counter | NullMetric = self.metrics.counter(
+            'input_events', 'Number of handled input events.')
+        self._scene_switch_time: Histogram | NullMetric = self.metrics.histogram(
+            'scene_switch_seconds', 'Time of switching scenes.')
+
         pg.init()
         pg.font.init()
 
-        self.audio = Audio()
+        self.audio = Audio(metrics=self.metrics)
+        self.surface_pool: SurfacePool = SurfacePool()
+        self.animator: Animator = Animator()
 
         self.scenes: dict[str, 'Scene'] = {}
         self.current_scene: Optional['Scene'] = None
@@ -58,6 +104,8 @@ class App:
         self.clock: Clock = Clock()
 
         self.omitted_buttons: list[int] = []
+        self.omitted_keys: list[int] = []
+        self.key_modifiers: int = 0
         self.omitted_mouse_buttons: list[int] = []
         self.is_mouse_move: bool = False
 
@@ -67,68 +115,177 @@ class App:
         self.lock_mouse: bool = False
         self._previous_mouse_location: tuple[int, int] = (0, 0)
         self.mouse_offset: tuple[int, int] = (0, 0)
+        self.mouse_wheel: int = 0
+        self.mouse_position: tuple[int, int] = (0, 0)
+        self.mouse_pressed: tuple[bool, bool, bool] = (False, False, False)
+
+        self.message_budget: float = 0.004
+        self._draw_list: list[tuple[Surface, pg.Rect]] = []
 
         pg.display.set_caption('WatchSync')
 
     async def loop(self):
         """The start of the application lifecycle.
         """
-        while self.running:
-            self.omitted_buttons = []
-            self.omitted_mouse_buttons = []
-            self.is_mouse_move = False
-            self.mouse_offset = (0, 0)
-            for event in pg.event.get():
-                if event.type == pg.QUIT:
-                    logging.debug('Exit the program by pressing the external exit button.')
-                    self.running = False
-                elif event.type == pg.KEYDOWN:
-                    try:
-                        key = ord(event.unicode)
-                        logging.debug('Pressing the "%s" key', key)
-                        self.omitted_buttons.append(ord(event.unicode))
-                    except ValueError:
-                        pass
-                    except TypeError:
-                        pass
-                elif event.type == pg.MOUSEBUTTONDOWN:
-                    logging.debug('Pressing the mouse button %s', event.button)
-                    self.omitted_mouse_buttons.append(event.button)
-                if event.type == pg.MOUSEMOTION:
-                    self.is_mouse_move = True
-                    self.mouse_offset = (pg.mouse.get_pos()[0] - self._previous_mouse_location[0],
-                                         pg.mouse.get_pos()[1] - self._previous_mouse_location[1])
-                    if self.lock_mouse:
-                        pg.mouse.set_pos(self._previous_mouse_location)
-                    else:
-                        self._previous_mouse_location = pg.mouse.get_pos()
-            self.delta_time = self.clock.tick(60) / 1000
+        exporter_task: Optional[asyncio.Task] = None
+        if self.metrics_exporter is not None:
+            exporter_task = asyncio.create_task(self.metrics_exporter.run())
 
+        while self.running:
+            if self.replay is not None:
+                frame: Optional[InputFrame] = self.replay.read()
+                if frame is None:
+                    logging.info('The replay of %s is finished after %d frames.', self.replay.path,
+                                 self.replay.frames)
+                    break
+            else:
+                self.profiler.phase = FramePhase.INPUT
+                frame = self.read_input()
+                self.profiler.phase = FramePhase.IDLE
+                frame.delta_time = self.clock.tick(60) / 1000
+
+            if self.recorder is not None:
+                self.recorder.write(frame)
+            self.apply_input(frame)
+
+            started: float = time.perf_counter()
             await self.update()
-
+            frame_time: float = time.perf_counter() - started
+            self._frame_time.record(frame_time)
+            if self.frame_capture is not None:
+                self.frame_capture.add(self.screen, frame_time)
+            self.profiler.phase = FramePhase.IDLE
+
+        if exporter_task is not None:
+            exporter_task.cancel()
+            await asyncio.gather(exporter_task, return_exceptions=True)
+        self.close_session()
         pg.quit()
 
+    def read_input(self) -> InputFrame:
+        """Reads the input of the frame from the event queue.
+
+        Returns:
+            Frame input without the delta time.
+        """
+        frame: InputFrame = InputFrame()
+        frame.key_modifiers = pg.key.get_mods()
+        events: list[pg.event.Event] = pg.event.get()
+        self._input_events.inc(len(events))
+        for event in events:
+            if event.type == pg.QUIT:
+                logging.debug('Exit the program by pressing the external exit button.')
+                frame.quit = True
+            elif event.type == pg.KEYDOWN:
+                character: int = -1
+                try:
+                    character = ord(event.unicode)
+                    logging.debug('Pressing the "%s" key', character)
+                except ValueError:
+                    pass
+                except TypeError:
+                    pass
+                frame.keys.append((event.key, character))
+            elif event.type == pg.MOUSEBUTTONDOWN:
+                logging.debug('Pressing the mouse button %s', event.button)
+                frame.mouse_buttons.append(event.button)
+            elif event.type == pg.MOUSEWHEEL:
+                frame.mouse_wheel += event.y
+            if event.type == pg.MOUSEMOTION:
+                frame.is_mouse_move = True
+                frame.mouse_offset = (pg.mouse.get_pos()[0] - self._previous_mouse_location[0],
+                                      pg.mouse.get_pos()[1] - self._previous_mouse_location[1])
+                if self.lock_mouse:
+                    pg.mouse.set_pos(self._previous_mouse_location)
+                else:
+                    self._previous_mouse_location = pg.mouse.get_pos()
+
+        frame.mouse_position = pg.mouse.get_pos()
+        frame.mouse_pressed = pg.mouse.get_pressed()
+        return frame
+
+    def apply_input(self, frame: InputFrame):
+        """Makes the frame input current.
+
+        Args:
+            frame: Frame input.
+        """
+        if frame.quit:
+            self.running = False
+        self.delta_time = frame.delta_time
+        self.omitted_keys = [key for key, _ in frame.keys]
+        self.omitted_buttons = [character for _, character in frame.keys if character >= 0]
+        self.key_modifiers = frame.key_modifiers
+        self.omitted_mouse_buttons = frame.mouse_buttons
+        self.is_mouse_move = frame.is_mouse_move
+        self.mouse_offset = frame.mouse_offset
+        self.mouse_wheel = frame.mouse_wheel
+        self.mouse_position = frame.mouse_position
+        self.mouse_pressed = frame.mouse_pressed
+
+        if self.key_modifiers & pg.KMOD_CTRL and self.key_modifiers & pg.KMOD_SHIFT:
+            if pg.K_p in self.omitted_keys:
+                self.toggle_profiler()
+            if pg.K_m in self.omitted_keys:
+                self.toggle_allocation_tracker()
+
+    def toggle_profiler(self):
+        """Starts the sampling profiler or stops it and writes the profile.
+        """
+        if not self.profiler.running:
+            self.profiler.start()
+            return
+        self.profiler.stop()
+        path: str = self.profile_path or os.path.join('logs', f'profile-{time.strftime("%Y%m%d-%H%M%S")}.collapsed')
+        try:
+            self.profiler.write(path)
+        except OSError as error:
+            logging.error('Failed to write the profile to %s: %s', path, error)
+
+    def toggle_allocation_tracker(self):
+        """Starts or stops tracing the allocations between scene switches.
+        """
+        if self.allocation_tracker.running:
+            self.allocation_tracker.stop()
+        else:
+            self.allocation_tracker.start()
+
     async def update(self):
         """Updating the active scene.
         """
+        self.audio.update()
         if self.current_scene:
+            self.profiler.phase = FramePhase.MESSAGES
+            self.current_scene.messages.drain(self.current_scene.handle_message, self.message_budget)
+            self.profiler.phase = FramePhase.SCENE
             await self.current_scene.update()
+            self.profiler.phase = FramePhase.ANIMATION
+            self.animator.update(self.delta_time)
+            self.profiler.phase = FramePhase.SPRITES
             tasks: list[Awaitable[None]] = []
             for sprite in list(self.current_scene.sprites.values()):
                 tasks.append(sprite.update())
             await asyncio.gather(*tasks)
 
+            self.profiler.phase = FramePhase.VIEW
             self.update_view()
 
     def update_view(self):
         """Draws objects on the active scene.
         """
-        x_factor = pg.display.get_window_size()[0] / 1920
-        y_factor = pg.display.get_window_size()[1] / 1080
+        window_size = pg.display.get_window_size()
+        x_factor = window_size[0] / 1920
+        y_factor = window_size[1] / 1080
+        viewport = self.screen.get_rect()
+
+        self._draw_list.clear()
+        for sprite in self.current_scene.get_draw_order():
+            draw_item = sprite.get_draw_item(x_factor, y_factor)
+            if draw_item[1].width and draw_item[1].height and viewport.colliderect(draw_item[1]):
+                self._draw_list.append(draw_item)
+
         self.screen.fill((32, 32, 32))
-        for sprite in self.current_scene.sprites.values():
-            self.screen.blit(sprite.image,
-                             pg.Rect(sprite.position.x * x_factor, sprite.position.y * y_factor, 0, 0))
+        self.screen.blits(self._draw_list, doreturn=False)
         pg.display.flip()
 
     async def init_scenes(self):
@@ -140,6 +297,10 @@ class App:
             tasks.append(asyncio.create_task(self.register_scene(scene)))
         await asyncio.gather(*tasks)
 
+        # Objects created on boot live until the exit, there is no need for the garbage collector to scan them.
+        gc.collect()
+        gc.freeze()
+
     async def register_scene(self, scene: Type[SceneT]):
         """Registration of a new scene.
 
@@ -163,13 +324,22 @@ class App:
             logging.error('The scene with name %s is not registered.', scene)
             return
 
+        started: float = time.perf_counter()
+        previous: str = ''
         if self.current_scene is not None:
+            previous = type(self.current_scene).__name__
             await self.current_scene.exit()
+            self.animator.clear(self.current_scene)
 
+        logging.debug('Surface pool: %s', self.surface_pool.stats.as_dict())
         self.current_scene = self.scenes[scene]
+        self.animator.scene = self.current_scene
         self.transmitted_data = transmitted_data
         await self.current_scene.enter()
         self.transmitted_data = {}
+        self._scene_switch_time.record(time.perf_counter() - started)
+        self.profiler.scene = scene
+        self.allocation_tracker.on_scene_change(previous, scene)
 
     def quit(self):
         """End of the application lifecycle.
@@ -177,6 +347,72 @@ class App:
         logging.info('Exiting the program.')
         self.running = False
 
+    def configure_session(self):
+        """Configuring input recording, replay and frame capture from the environment variables.
+
+        WATCHSYNC_RECORD is the path of the input log to write, WATCHSYNC_REPLAY is the path of the input log
+        to replay without a window, WATCHSYNC_REPLAY_DELTA_TIME is the time between replayed frames
+        (1/60 by default, "recorded" to use the recorded time), WATCHSYNC_FRAME_HASHES and
+        WATCHSYNC_FRAME_TIMES are the paths to save the frame hashes and the frame times.
+        The metrics are collected if WATCHSYNC_METRICS_FILE (the path of the snapshot file) or
+        WATCHSYNC_METRICS_PORT (the port of the local HTTP endpoint) is set, WATCHSYNC_METRICS_INTERVAL is
+        the time between snapshots in seconds.
+        WATCHSYNC_PROFILE is the path of the profile to write when the application exits, the profiler is
+        started at once if it is set, WATCHSYNC_PROFILE_INTERVAL is the time between samples in seconds.
+        WATCHSYNC_TRACEMALLOC is the path of the allocation report, the allocations are traced from the start
+        if it is set.
+        """
+        record_path: Optional[str] = os.environ.get('WATCHSYNC_RECORD')
+        replay_path: Optional[str] = os.environ.get('WATCHSYNC_REPLAY')
+        hashes_path: Optional[str] = os.environ.get('WATCHSYNC_FRAME_HASHES')
+        times_path: Optional[str] = os.environ.get('WATCHSYNC_FRAME_TIMES')
+
+        if replay_path:
+            delta_time: str = os.environ.get('WATCHSYNC_REPLAY_DELTA_TIME', str(1 / 60))
+            self.replay = InputReplay(replay_path, None if delta_time == 'recorded' else float(delta_time))
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            logging.info('Replaying the input from %s.', replay_path)
+        if record_path:
+            self.recorder = InputRecorder(record_path)
+            logging.info('Recording the input into %s.', record_path)
+        if hashes_path or times_path:
+            self.frame_capture = FrameCapture(hashes_path or None, times_path or None)
+
+        metrics_path: Optional[str] = os.environ.get('WATCHSYNC_METRICS_FILE') or None
+        metrics_port: Optional[str] = os.environ.get('WATCHSYNC_METRICS_PORT') or None
+        if metrics_path or metrics_port:
+            self.metrics.enabled = True
+            self.metrics_exporter = MetricsExporter(self.metrics, metrics_path,
+                                                    int(metrics_port) if metrics_port else None,
+                                                    float(os.environ.get('WATCHSYNC_METRICS_INTERVAL', 10)))
+
+        profile_interval: float = float(os.environ.get('WATCHSYNC_PROFILE_INTERVAL', self.profiler.interval))
+        if profile_interval > 0:
+            self.profiler.interval = profile_interval
+        else:
+            logging.warning('WATCHSYNC_PROFILE_INTERVAL is ignored: the interval must be positive, got %s.',
+                            profile_interval)
+        self.profile_path = os.environ.get('WATCHSYNC_PROFILE') or None
+        if self.profile_path:
+            self.profiler.start()
+        allocations_path: Optional[str] = os.environ.get('WATCHSYNC_TRACEMALLOC') or None
+        if allocations_path:
+            self.allocation_tracker.path = allocations_path
+            self.allocation_tracker.start()
+
+    def close_session(self):
+        """Finishing input recording, replay, frame capture and profiling.
+        """
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.replay is not None:
+            self.replay.close()
+        if self.frame_capture is not None:
+            self.frame_capture.close()
+        if self.profiler.running:
+            self.toggle_profiler()
+        self.allocation_tracker.stop()
+
     @staticmethod
     def configure_logs():
         """Configuring logs.
@@ -1,48 +1,343 @@
 """A module for working with audio.
+
+Sounds are played on a fixed pool of mixer channels. Every sound belongs to a category with a priority:
+when all channels are busy, a new sound takes the channel of the oldest sound with the lowest priority,
+and a category cannot occupy more than its own number of voices. Loaded sounds are kept within a memory
+budget and the least recently used ones are unloaded and loaded again from their files when needed.
 """
+from collections import OrderedDict
+from enum import Enum
 from typing import Optional
 import logging
+import time
 import pygame as pg
-from pygame.mixer import SoundType
+from pygame.mixer import SoundType, Channel
+
+from src.modules.metrics import MetricsRegistry, Counter, Gauge, Histogram, NullMetric
+
+
+class SoundCategory(Enum):
+    """Sound category. The value is a tuple of the priority and the maximum number of voices.
+    """
+    UI = (0, 4)
+    EFFECT = (1, 6)
+    DIALOGUE = (2, 4)
+    FILM = (3, 2)
+
+    @property
+    def priority(self) -> int:
+        """A sound with a higher priority can take the channel of a sound with a lower one.
+        """
+        return self.value[0]
+
+    @property
+    def max_voices(self) -> int:
+        """Maximum number of sounds of the category that play at the same time.
+        """
+        return self.value[1]
+
+
+class SoundBank:
+    """Loaded sounds limited by the size of their decoded data.
+
+    Attributes:
+        budget: Maximum total size of the loaded sounds (in bytes).
+        paths: Paths to the audio files in {name: path} format.
+        volumes: Sound volumes in {name: volume} format.
+        size: Total size of the loaded sounds (in bytes).
+        loads: Number of loads from files, including reloads of unloaded sounds.
+        evictions: Number of unloaded sounds.
+        load_time: Histogram of the sound load times.
+        _sounds: Loaded sounds in {name: (sound, size)} format, from the least to the most recently used.
+    """
+
+    def __init__(self, budget: int = 64 * 1024 * 1024, metrics: Optional[MetricsRegistry] = None):
+        """Initialization.
+
+        Args:
+            budget: Maximum total size of the loaded sounds (in bytes).
+            metrics: Metrics registry.
+        """
+        metrics = metrics if metrics is not None else MetricsRegistry()
+        self.load_time: Histogram | NullMetric = metrics.histogram(
+            'audio_load_seconds', 'Time of loading a sound from its file.')
+        self.budget: int = budget
+        self.paths: dict[str, str] = {}
+        self.volumes: dict[str, float] = {}
+        self.size: int = 0
+        self.loads: int = 0
+        self.evictions: int = 0
+        self._sounds: OrderedDict[str, tuple[SoundType, int]] = OrderedDict()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.paths
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the sound is in memory.
+
+        Args:
+            name: Sound name.
+        """
+        return name in self._sounds
+
+    def get(self, name: str, protected: frozenset[str] = frozenset()) -> Optional[SoundType]:
+        """Get a sound, loading it from the file if it was unloaded.
+
+        Args:
+            name: Sound name.
+            protected: Names of the sounds that must not be unloaded, for example the playing ones.
+
+        Returns:
+            Sound or None if the sound is unknown.
+        """
+        if name not in self.paths:
+            return None
+
+        loaded: Optional[tuple[SoundType, int]] = self._sounds.get(name)
+        if loaded is not None:
+            self._sounds.move_to_end(name)
+            return loaded[0]
+
+        started: float = time.perf_counter()
+        sound: SoundType = pg.mixer.Sound(self.paths[name])
+        self.load_time.record(time.perf_counter() - started)
+        if name in self.volumes:
+            sound.set_volume(self.volumes[name])
+        size: int = self.get_decoded_size(sound)
+        self.loads += 1
+        self._sounds[name] = (sound, size)
+        self.size += size
+        self._evict(protected | {name})
+        return sound
+
+    def add(self, name: str, path: str):
+        """Register and load a sound.
+
+        Args:
+            name: Sound name.
+            path: The path to the audio file.
+        """
+        self.paths[name] = path
+        self.get(name)
+
+    def set_volume(self, name: str, volume: float):
+        """Set the sound volume. It is kept when the sound is loaded again.
+
+        Args:
+            name: Sound name.
+            volume: Sound volume [0; 1].
+        """
+        self.volumes[name] = volume
+        loaded: Optional[tuple[SoundType, int]] = self._sounds.get(name)
+        if loaded is not None:
+            loaded[0].set_volume(volume)
+
+    def _evict(self, protected: frozenset[str]):
+        """Unload the least recently used sounds while the budget is exceeded.
+
+        Args:
+            protected: Names of the sounds that must not be unloaded.
+        """
+        for name in list(self._sounds):
+            if self.size <= self.budget:
+                break
+            if name in protected:
+                continue
+            _, size = self._sounds.pop(name)
+            self.size -= size
+            self.evictions += 1
+            logging.debug('Sound %s is unloaded (%d bytes), %d bytes are loaded.', name, size, self.size)
+
+    @staticmethod
+    def get_decoded_size(sound: SoundType) -> int:
+        """Get the size of the decoded sound without copying its samples.
+
+        Args:
+            sound: Sound.
+
+        Returns:
+            Size in bytes.
+        """
+        mixer: Optional[tuple[int, int, int]] = pg.mixer.get_init()
+        if mixer is None:
+            return 0
+        frequency, sample_format, channels = mixer
+        return int(sound.get_length() * frequency) * abs(sample_format) // 8 * channels
+
+
+class Voice:
+    """A sound playing on a channel.
+
+    Attributes:
+        name: Sound name.
+        category: Sound category.
+        started: The moment the sound started (in seconds of time.perf_counter).
+    """
+    __slots__ = ('name', 'category', 'started')
+
+    def __init__(self, name: str, category: SoundCategory):
+        """Initialization.
+
+        Args:
+            name: Sound name.
+            category: Sound category.
+        """
+        self.name: str = name
+        self.category: SoundCategory = category
+        self.started: float = time.perf_counter()
 
 
 class Audio:
     """A class for uploading and playing sounds.
+
+    Attributes:
+        bank: Loaded sounds.
+        categories: Sound categories in {name: category} format.
+        channels: Mixer channels.
+        voices: Sounds on the channels, indexed like the channels (None if the channel was not used).
+        stolen: Number of sounds stopped to free a channel.
+        dropped: Number of sounds that were not played because no channel could be freed.
+        metrics: Metrics registry.
     """
 
-    def __init__(self):
-        self.sounds: dict[str, SoundType] = {}
+    def __init__(self, channels: int = 16, budget: int = 64 * 1024 * 1024,
+                 metrics: Optional[MetricsRegistry] = None):
+        """Initialization.
 
-    def load_sound(self, name: str, path: str):
+        Args:
+            channels: Number of mixer channels.
+            budget: Maximum total size of the loaded sounds (in bytes).
+            metrics: Metrics registry.
+        """
+        self.metrics: MetricsRegistry = metrics if metrics is not None else MetricsRegistry()
+        self._active_channels: Gauge | NullMetric = self.metrics.gauge(
+            'audio_active_channels', 'Number of playing mixer channels.')
+        self._stolen: Counter | NullMetric = self.metrics.counter(
+            'audio_stolen_voices', 'Sounds stopped to free a channel.')
+        self._dropped: Counter | NullMetric = self.metrics.counter(
+            'audio_dropped_sounds', 'Sounds not played for lack of a channel.')
+        self.bank: SoundBank = SoundBank(budget, self.metrics)
+        self.categories: dict[str, SoundCategory] = {}
+        self.channels: list[Channel] = []
+        self.voices: list[Optional[Voice]] = []
+        self.stolen: int = 0
+        self.dropped: int = 0
+
+        if pg.mixer.get_init() is not None:
+            pg.mixer.set_num_channels(channels)
+            self.channels = [pg.mixer.Channel(i) for i in range(channels)]
+            self.voices = [None] * channels
+
+    def load_sound(self, name: str, path: str, category: SoundCategory = SoundCategory.EFFECT):
         """Upload an audio file.
 
         Args:
             name: Sound name.
             path: The path to the audio file
+            category: Sound category.
         """
-        if name in self.sounds:
+        if name in self.bank:
             logging.warning("Звук %s уже загружен", name)
             return
-        self.sounds[name] = pg.mixer.Sound(path)
+        self.categories[name] = category
+        self.bank.add(name, path)
 
-    def load_sounds(self, sounds: dict[str, str]):
+    def load_sounds(self, sounds: dict[str, str], category: SoundCategory = SoundCategory.EFFECT):
         """Upload some audio.
 
         Args:
             A dictionary of sounds, where the key is the name of the sound,and the values are the path to the sound file.
+            category: Category of the sounds.
         """
         for name in sounds:
-            self.load_sound(name, sounds[name])
+            self.load_sound(name, sounds[name], category)
 
-    def play(self, name: str, loops: int = 0):
+    def play(self, name: str, loops: int = 0) -> bool:
         """Play a sound.
 
         Args:
             name: Sound name.
             loops: Number of repetitions.
+
+        Returns:
+            Whether the sound has started.
+        """
+        if name not in self.bank or not self.channels:
+            return False
+
+        category: SoundCategory = self.categories[name]
+        index: Optional[int] = self._get_channel(category)
+        if index is None:
+            self.dropped += 1
+            self._dropped.inc()
+            logging.debug('Sound %s is dropped: no channel for the %s category.', name, category.name)
+            return False
+
+        sound: SoundType = self.bank.get(name, self._get_playing_names())
+        self.channels[index].play(sound, loops=loops)
+        self.voices[index] = Voice(name, category)
+        self._update_active_channels()
+        return True
+
+    def update(self):
+        """Refresh the number of playing channels. Sounds end on their own, so it is called every frame.
+        """
+        self._update_active_channels()
+
+    def _update_active_channels(self):
+        """Set the gauge of playing channels from the mixer.
+        """
+        if self.metrics.enabled:
+            self._active_channels.set(sum(channel.get_busy() for channel in self.channels))
+
+    def _get_playing_names(self) -> frozenset[str]:
+        """Get the names of the playing sounds.
+
+        Returns:
+            Sound names.
+        """
+        return frozenset(voice.name for channel, voice in zip(self.channels, self.voices)
+                         if voice is not None and channel.get_busy())
+
+    def _get_channel(self, category: SoundCategory) -> Optional[int]:
+        """Find a channel for a sound, stopping another sound if necessary.
+
+        A category that has reached its number of voices replaces its own oldest sound. Otherwise a free
+        channel is used, and if there is none, the oldest sound with the lowest priority not higher than
+        the category priority is stopped.
+
+        Args:
+            category: Sound category.
+
+        Returns:
+            Channel index or None if the sound should not be played.
         """
-        if name in self.sounds:
-            self.sounds[name].play(loops=loops)
+        free: Optional[int] = None
+        own: list[int] = []
+        victim: Optional[int] = None
+        for index, (channel, voice) in enumerate(zip(self.channels, self.voices)):
+            if voice is None or not channel.get_busy():
+                if free is None:
+                    free = index
+                continue
+            if voice.category == category:
+                own.append(index)
+            if voice.category.priority <= category.priority and (
+                    victim is None or
+                    (voice.category.priority, voice.started) <
+                    (self.voices[victim].category.priority, self.voices[victim].started)):
+                victim = index
+
+        if len(own) >= category.max_voices:
+            victim = min(own, key=lambda i: self.voices[i].started)
+        elif free is not None:
+            return free
+
+        if victim is not None:
+            self.channels[victim].stop()
+            self.stolen += 1
+            self._stolen.inc()
+        return victim
 
     def set_volume(self, name: str, volume: float):
         """Set the sound volume.
@@ -51,8 +346,8 @@ class Audio:
             name: Sound name.
             volume: Sound volume [0; 1]
         """
-        if name in self.sounds:
-            self.sounds[name].set_volume(volume)
+        if name in self.bank:
+            self.bank.set_volume(name, volume)
 
     def stop(self, name: Optional[str] = None):
         """Stop the sound.
@@ -60,9 +355,7 @@ class Audio:
         Args:
             name: Sound name.
         """
-        if name is None:
-            for sound_name, sound in self.sounds.items():
-                sound.stop()
-        else:
-            if name in self.sounds:
-                self.sounds[name].stop()
+        for channel, voice in zip(self.channels, self.voices):
+            if voice is not None and (name is None or voice.name == name):
+                channel.stop()
+        self._update_active_channels()
@@ -0,0 +1,18 @@
+from .abr import AbrController, AbrMetrics, AbrReason, Manifest, Rendition, ThroughputEstimator
+from .streamer import Streamer, Segment
+from .protocol import (SyncMessage, MessageType, FrameDecoder, encode_frame, get_server_url, PROTOCOL_VERSION,
+                       SERVER_PORT)
+from .message_queue import MessageQueue
+from .sync_channel import SyncChannel
+from .health import ConnectionHealth, HealthState, RingBuffer, Backoff, RestartPolicy, is_network_error
+from .playback_clock import PlaybackClock, DriftCorrector, DriftHistogram, Correction, PartySync
+from .transform_store import TransformStore, Transform
+from .pool import SurfacePool, SpritePool, PoolStats
+from .animation import Animator, Tween, KeyframeTrack, Track
+from .subtitles import SubtitleIndex, Cue, parse_subtitles, load_subtitles
+from .input_log import InputFrame, InputRecorder, InputReplay, FrameCapture
+from .metrics import MetricsRegistry, MetricsExporter, Counter, Gauge, Histogram
+from .media_worker import MediaWorker, FrameRing, decode_raw_frames
+from .thumbnails import ThumbnailJob, ThumbnailSheet
+from .profiler import SamplingProfiler, AllocationTracker, FramePhase
+from .simulation import StandInServer, SimulatedClient, simulate_party
@@ -0,0 +1,369 @@
+"""A module for adaptive bitrate selection.
+
+Implements a buffer-based (BBA) rendition selection with hysteresis. The controller is asked for
+the next rendition only at segment boundaries, so a switch never interrupts a segment in progress.
+"""
+import logging
+from typing import Any, Optional
+from enum import Enum
+
+from src.modules.protocol import get_server_url
+
+
+class Rendition:
+    """One quality level of the stream from the server manifest.
+
+    Attributes:
+        name: Rendition name, for example "720p".
+        bitrate: Average bitrate in bits per second.
+        url: Base URL of the rendition segments.
+    """
+
+    def __init__(self, name: str, bitrate: int, url: str):
+        """Initialization.
+
+        Args:
+            name: Rendition name.
+            bitrate: Average bitrate in bits per second.
+            url: Base URL of the rendition segments.
+        """
+        self.name: str = name
+        self.bitrate: int = bitrate
+        self.url: str = url
+
+    def get_segment_url(self, index: int) -> str:
+        """Get the URL of a segment.
+
+        Args:
+            index: Segment index.
+
+        Returns:
+            Segment URL.
+        """
+        return f'{self.url}/{index}'
+
+
+class Manifest:
+    """Server manifest with the list of renditions.
+
+    Attributes:
+        renditions: Renditions sorted by bitrate in ascending order.
+        segment_duration: Duration of one segment (in seconds).
+        segments_count: Number of segments in the stream.
+    """
+
+    def __init__(self, renditions: list[Rendition], segment_duration: float, segments_count: int):
+        """Initialization.
+
+        Args:
+            renditions: Renditions of the stream.
+            segment_duration: Duration of one segment (in seconds).
+            segments_count: Number of segments in the stream.
+        """
+        self.renditions: list[Rendition] = sorted(renditions, key=lambda r: r.bitrate)
+        self.segment_duration: float = segment_duration
+        self.segments_count: int = segments_count
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any], host: str) -> 'Manifest':
+        """Create a manifest from the server response.
+
+        Args:
+            data: Response data.
+            host: Server address, used for relative rendition URLs.
+
+        Returns:
+            Manifest.
+
+        Raises:
+            ValueError: If the manifest does not contain any rendition.
+        """
+        renditions: list[Rendition] = []
+        for rendition in data.get('renditions', []):
+            url: str = rendition['url']
+            if not url.startswith('http'):
+                url = get_server_url(host, url)
+            renditions.append(Rendition(rendition['name'], int(rendition['bitrate']), url))
+
+        if not renditions:
+            raise ValueError('The manifest does not contain any rendition.')
+
+        return cls(renditions, float(data.get('segment_duration', 4)), int(data.get('segments_count', 0)))
+
+
+class AbrReason(Enum):
+    """The reason for the rendition decision.
+    """
+    STARTUP = 0
+    BUFFER_UP = 1
+    BUFFER_DOWN = 2
+    THROUGHPUT_CAP = 3
+    HOLD = 4
+
+
+class ThroughputEstimator:
+    """Exponentially weighted estimation of the network throughput.
+
+    Attributes:
+        alpha: Weight of the newest sample.
+        estimate: Current estimation in bits per second (0 if there are no samples).
+    """
+
+    def __init__(self, alpha: float = 0.3):
+        """Initialization.
+
+        Args:
+            alpha: Weight of the newest sample.
+        """
+        self.alpha: float = alpha
+        self.estimate: float = 0
+
+    def add_sample(self, size: int, duration: float):
+        """Add a download sample.
+
+        Args:
+            size: Downloaded size in bytes.
+            duration: Download time (in seconds).
+        """
+        if duration <= 0:
+            return
+        throughput: float = size * 8 / duration
+        if self.estimate == 0:
+            self.estimate = throughput
+        else:
+            self.estimate = self.alpha * throughput + (1 - self.alpha) * self.estimate
+
+
+class AbrMetrics:
+    """Counters of the adaptive bitrate controller.
+
+    Attributes:
+        decisions: Number of decisions made.
+        switches_up: Number of switches to a higher rendition.
+        switches_down: Number of switches to a lower rendition.
+        rebuffer_count: Number of playback stalls.
+        rebuffer_time: Total time of playback stalls (in seconds).
+        last_reason: The reason for the last decision.
+        _played_bits: Bits of the selected renditions weighted by the segment duration.
+        _played_time: Duration of the selected segments (in seconds).
+    """
+
+    def __init__(self):
+        self.decisions: int = 0
+        self.switches_up: int = 0
+        self.switches_down: int = 0
+        self.rebuffer_count: int = 0
+        self.rebuffer_time: float = 0
+        self.last_reason: AbrReason = AbrReason.STARTUP
+        self._played_bits: float = 0
+        self._played_time: float = 0
+
+    def add_segment(self, bitrate: int, duration: float):
+        """Take the selected segment into account in the average bitrate.
+
+        Args:
+            bitrate: Bitrate of the segment rendition.
+            duration: Segment duration (in seconds).
+        """
+        self._played_bits += bitrate * duration
+        self._played_time += duration
+
+    @property
+    def average_bitrate(self) -> float:
+        """Average bitrate of the selected segments in bits per second.
+        """
+        if self._played_time == 0:
+            return 0
+        return self._played_bits / self._played_time
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the metrics as a dictionary.
+
+        Returns:
+            Metrics in {name: value} format.
+        """
+        return {
+            'decisions': self.decisions,
+            'switches_up': self.switches_up,
+            'switches_down': self.switches_down,
+            'rebuffer_count': self.rebuffer_count,
+            'rebuffer_time': self.rebuffer_time,
+            'average_bitrate': self.average_bitrate,
+            'last_reason': self.last_reason.name,
+        }
+
+
+class AbrController:
+    """Buffer-based rendition selection with hysteresis.
+
+    The buffer level is mapped to a target bitrate linearly between the reservoir and the end of the
+    cushion. The rendition changes only when the target crosses the bitrate of a neighboring rendition,
+    which prevents oscillation between two levels.
+
+    Attributes:
+        manifest: Server manifest.
+        reservoir: Buffer level (in seconds) below which the lowest rendition is always selected.
+        cushion: Buffer range (in seconds) over which the target grows to the highest rendition.
+        safety: Share of the estimated throughput that can be used while the buffer is not full.
+        throughput: Network throughput estimation.
+        metrics: Decision counters.
+        current: Index of the rendition of the last downloaded segment.
+        _pending: The selected rendition index and the reason, recorded when its segment is downloaded.
+    """
+
+    def __init__(self, manifest: Manifest, reservoir: float = 8, cushion: float = 22,
+                 safety: float = 0.8):
+        """Initialization.
+
+        Args:
+            manifest: Server manifest.
+            reservoir: Buffer level (in seconds) below which the lowest rendition is always selected.
+            cushion: Buffer range (in seconds) over which the target grows to the highest rendition.
+            safety: Share of the estimated throughput that can be used while the buffer is not full.
+        """
+        self.manifest: Manifest = manifest
+        self.reservoir: float = reservoir
+        self.cushion: float = cushion
+        self.safety: float = safety
+
+        self.throughput: ThroughputEstimator = ThroughputEstimator()
+        self.metrics: AbrMetrics = AbrMetrics()
+        self.current: int = 0
+        self._pending: Optional[tuple[int, AbrReason]] = None
+
+    def get_rendition(self) -> Rendition:
+        """Get the current rendition.
+
+        Returns:
+            Current rendition.
+        """
+        return self.manifest.renditions[self.current]
+
+    def select(self, buffer_level: float) -> Rendition:
+        """Select the rendition for the next segment. Called at segment boundaries.
+
+        The decision is recorded in the metrics only when the segment is downloaded, so failed and cancelled
+        downloads are not counted.
+
+        Args:
+            buffer_level: Current buffer level (in seconds).
+
+        Returns:
+            Rendition for the next segment.
+        """
+        renditions: list[Rendition] = self.manifest.renditions
+        previous: int = self.current
+        selected: int = previous
+        reason: AbrReason = AbrReason.HOLD
+
+        if self.metrics.decisions == 0:
+            reason = AbrReason.STARTUP
+            selected = self._get_highest_below(self.throughput.estimate * self.safety)
+        else:
+            target: float = self._map_buffer(buffer_level)
+            higher: Optional[Rendition] = renditions[previous + 1] if previous + 1 < len(renditions) else None
+            lower: Optional[Rendition] = renditions[previous - 1] if previous > 0 else None
+
+            if higher is not None and target >= higher.bitrate:
+                reason = AbrReason.BUFFER_UP
+                selected = self._get_highest_below(target)
+            elif lower is not None and target <= lower.bitrate:
+                reason = AbrReason.BUFFER_DOWN
+                selected = self._get_lowest_above(target)
+
+            if self.throughput.estimate and buffer_level < self.reservoir + self.cushion:
+                capped: int = self._get_highest_below(self.throughput.estimate * self.safety)
+                if capped < selected:
+                    reason = AbrReason.THROUGHPUT_CAP
+                    selected = capped
+
+        self._pending = (selected, reason)
+        return renditions[selected]
+
+    def on_segment_downloaded(self, size: int, duration: float):
+        """Report the download of a segment and record the decision that selected its rendition.
+
+        Args:
+            size: Segment size in bytes.
+            duration: Download time (in seconds).
+        """
+        self.throughput.add_sample(size, duration)
+        if self._pending is not None:
+            previous: int = self.current
+            self.current, reason = self._pending
+            self._pending = None
+            self._register_decision(previous, reason)
+
+    def on_rebuffer(self):
+        """Report the start of a playback stall.
+        """
+        self.metrics.rebuffer_count += 1
+        logging.warning('Playback stalled: the buffer is empty.')
+
+    def add_rebuffer_time(self, duration: float):
+        """Take into account the time spent in a playback stall.
+
+        Args:
+            duration: Stall time (in seconds).
+        """
+        self.metrics.rebuffer_time += duration
+
+    def _register_decision(self, previous: int, reason: AbrReason):
+        """Update the metrics after the decision.
+
+        Args:
+            previous: Index of the previous rendition.
+            reason: The reason for the decision.
+        """
+        self.metrics.decisions += 1
+        self.metrics.last_reason = reason
+        self.metrics.add_segment(self.get_rendition().bitrate, self.manifest.segment_duration)
+
+        if self.current > previous:
+            self.metrics.switches_up += 1
+        elif self.current < previous:
+            self.metrics.switches_down += 1
+        else:
+            return
+        logging.info('Rendition switched from %s to %s (%s).', self.manifest.renditions[previous].name,
+                     self.get_rendition().name, reason.name)
+
+    def _map_buffer(self, buffer_level: float) -> float:
+        """Map the buffer level to the target bitrate.
+
+        Args:
+            buffer_level: Current buffer level (in seconds).
+
+        Returns:
+            Target bitrate in bits per second.
+        """
+        minimum: int = self.manifest.renditions[0].bitrate
+        maximum: int = self.manifest.renditions[-1].bitrate
+        if buffer_level <= self.reservoir:
+            return minimum
+        if buffer_level >= self.reservoir + self.cushion:
+            return maximum
+        return minimum + (maximum - minimum) * (buffer_level - self.reservoir) / self.cushion
+
+    def _get_highest_below(self, bitrate: float) -> int:
+        """Get the highest rendition whose bitrate does not exceed the given one.
+
+        Returns:
+            Rendition index (0 if all renditions exceed the bitrate).
+        """
+        index: int = 0
+        for i, rendition in enumerate(self.manifest.renditions):
+            if rendition.bitrate <= bitrate:
+                index = i
+        return index
+
+    def _get_lowest_above(self, bitrate: float) -> int:
+        """Get the lowest rendition whose bitrate is not below the given one.
+
+        Returns:
+            Rendition index (0 if the bitrate is below the lowest rendition).
+        """
+        for i, rendition in enumerate(self.manifest.renditions):
+            if rendition.bitrate >= bitrate:
+                return i
+        return len(self.manifest.renditions) - 1
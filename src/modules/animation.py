@@ -0,0 +1,312 @@
+"""A module for animations.
+
+All tweens and keyframe tracks are advanced by the Animator in one pass per frame using App.delta_time.
+Targets are redrawn only on frames in which one of their tracks has changed something.
+"""
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+Easing = Callable[[float], float]
+
+
+def linear(t: float) -> float:
+    """Linear easing.
+
+    Args:
+        t: Progress [0; 1].
+
+    Returns:
+        Eased progress.
+    """
+    return t
+
+
+def ease_in_quad(t: float) -> float:
+    """Quadratic easing in.
+
+    Args:
+        t: Progress [0; 1].
+
+    Returns:
+        Eased progress.
+    """
+    return t * t
+
+
+def ease_out_quad(t: float) -> float:
+    """Quadratic easing out.
+
+    Args:
+        t: Progress [0; 1].
+
+    Returns:
+        Eased progress.
+    """
+    return t * (2 - t)
+
+
+def ease_in_out_quad(t: float) -> float:
+    """Quadratic easing in and out.
+
+    Args:
+        t: Progress [0; 1].
+
+    Returns:
+        Eased progress.
+    """
+    return 2 * t * t if t < 0.5 else 1 - (-2 * t + 2) ** 2 / 2
+
+
+def ease_out_cubic(t: float) -> float:
+    """Cubic easing out.
+
+    Args:
+        t: Progress [0; 1].
+
+    Returns:
+        Eased progress.
+    """
+    return 1 - (1 - t) ** 3
+
+
+def ease_in_out_sine(t: float) -> float:
+    """Sine easing in and out.
+
+    Args:
+        t: Progress [0; 1].
+
+    Returns:
+        Eased progress.
+    """
+    return -(math.cos(math.pi * t) - 1) / 2
+
+
+def interpolate(start: Any, end: Any, t: float) -> Any:
+    """Interpolate numbers or tuples of numbers.
+
+    Args:
+        start: Start value.
+        end: End value.
+        t: Progress.
+
+    Returns:
+        Interpolated value.
+    """
+    if isinstance(start, tuple):
+        return tuple(a + (b - a) * t for a, b in zip(start, end))
+    return start + (end - start) * t
+
+
+class Track(ABC):
+    """Base class of the animation tracks. A track changes one attribute of the target.
+
+    Attributes:
+        target: Animated object.
+        attribute: Name of the animated attribute.
+        duration: Duration of one cycle (in seconds).
+        loops: Number of cycles, 0 for an infinite animation.
+        on_finish: The function that is called when the track ends.
+        elapsed: Time since the start of the current cycle (in seconds).
+        finished: The flag that the track has ended.
+        scene: The scene that was open when the track started, None for tracks started outside of scenes.
+    """
+
+    def __init__(self, target: Any, attribute: str, duration: float, loops: int = 1,
+                 on_finish: Optional[Callable[[], None]] = None):
+        """Initialization.
+
+        Args:
+            target: Animated object.
+            attribute: Name of the animated attribute.
+            duration: Duration of one cycle (in seconds).
+            loops: Number of cycles, 0 for an infinite animation.
+            on_finish: The function that is called when the track ends.
+        """
+        self.target: Any = target
+        self.attribute: str = attribute
+        self.duration: float = duration
+        self.loops: int = loops
+        self.on_finish: Optional[Callable[[], None]] = on_finish
+        self.elapsed: float = 0
+        self.finished: bool = False
+        self.scene: Optional[Any] = None
+
+    def advance(self, delta_time: float):
+        """Advance the track and apply the value to the target.
+
+        Args:
+            delta_time: Time between frames (in seconds).
+        """
+        self.elapsed += delta_time
+        if self.elapsed >= self.duration:
+            if self.loops == 1 or self.duration <= 0:
+                self.elapsed = self.duration
+                self.finished = True
+            else:
+                if self.loops > 1:
+                    self.loops -= 1
+                self.elapsed %= self.duration
+
+        setattr(self.target, self.attribute, self.get_value(self.elapsed / self.duration if self.duration > 0 else 1))
+
+    @abstractmethod
+    def get_value(self, progress: float) -> Any:
+        """Get the value of the attribute.
+
+        Args:
+            progress: Progress of the current cycle [0; 1].
+
+        Returns:
+            Attribute value.
+        """
+
+
+class Tween(Track):
+    """Transition of an attribute between two values.
+
+    Attributes:
+        start: Start value.
+        end: End value.
+        easing: Easing function.
+    """
+
+    def __init__(self, target: Any, attribute: str, start: Any, end: Any, duration: float,
+                 easing: Easing = linear, loops: int = 1, on_finish: Optional[Callable[[], None]] = None):
+        """Initialization.
+
+        Args:
+            target: Animated object.
+            attribute: Name of the animated attribute.
+            start: Start value.
+            end: End value.
+            duration: Duration of one cycle (in seconds).
+            easing: Easing function.
+            loops: Number of cycles, 0 for an infinite animation.
+            on_finish: The function that is called when the track ends.
+        """
+        super().__init__(target, attribute, duration, loops, on_finish)
+        self.start: Any = start
+        self.end: Any = end
+        self.easing: Easing = easing
+
+    def get_value(self, progress: float) -> Any:
+        return interpolate(self.start, self.end, self.easing(progress))
+
+
+class KeyframeTrack(Track):
+    """Transition of an attribute through several keyframes.
+
+    Attributes:
+        keyframes: Keyframes in (time, value) format sorted by time.
+        easing: Easing function between neighboring keyframes.
+    """
+
+    def __init__(self, target: Any, attribute: str, keyframes: list[tuple[float, Any]], easing: Easing = linear,
+                 loops: int = 1, on_finish: Optional[Callable[[], None]] = None):
+        """Initialization.
+
+        Args:
+            target: Animated object.
+            attribute: Name of the animated attribute.
+            keyframes: Keyframes in (time, value) format. The time of the last keyframe is the duration.
+            easing: Easing function between neighboring keyframes.
+            loops: Number of cycles, 0 for an infinite animation.
+            on_finish: The function that is called when the track ends.
+        """
+        self.keyframes: list[tuple[float, Any]] = sorted(keyframes, key=lambda keyframe: keyframe[0])
+        super().__init__(target, attribute, self.keyframes[-1][0], loops, on_finish)
+        self.easing: Easing = easing
+
+    def get_value(self, progress: float) -> Any:
+        time: float = progress * self.duration
+        previous: tuple[float, Any] = self.keyframes[0]
+        for keyframe in self.keyframes:
+            if keyframe[0] >= time:
+                if keyframe[0] == previous[0]:
+                    return keyframe[1]
+                return interpolate(previous[1], keyframe[1],
+                                   self.easing((time - previous[0]) / (keyframe[0] - previous[0])))
+            previous = keyframe
+        return self.keyframes[-1][1]
+
+
+class Animator:
+    """Advances all animation tracks in one pass per frame.
+
+    Tracks belong to the scene that is open when they start and are stopped when it is exited, so infinite
+    animations do not keep the sprites of closed scenes alive.
+
+    Attributes:
+        tracks: Active tracks.
+        scene: The open scene, it is set by App on every scene switch.
+    """
+
+    def __init__(self):
+        self.tracks: list[Track] = []
+        self.scene: Optional[Any] = None
+
+    def add(self, track: Track) -> Track:
+        """Start a track in the open scene.
+
+        Args:
+            track: Track.
+
+        Returns:
+            The same track.
+        """
+        track.scene = self.scene
+        self.tracks.append(track)
+        return track
+
+    def cancel(self, target: Any, attribute: Optional[str] = None):
+        """Stop the tracks of the target.
+
+        Args:
+            target: Animated object.
+            attribute: Name of the attribute. All tracks of the target are stopped if None.
+        """
+        self.tracks = [track for track in self.tracks
+                       if track.target is not target or (attribute is not None and track.attribute != attribute)]
+
+    def clear(self, scene: Any):
+        """Stop the tracks started in the scene. Their on_finish functions are not called.
+
+        Args:
+            scene: Scene.
+        """
+        self.tracks = [track for track in self.tracks if track.scene is not scene]
+
+    def is_idle(self) -> bool:
+        """Whether there are no active animations.
+        """
+        return not self.tracks
+
+    def update(self, delta_time: float):
+        """Advance all tracks and redraw the changed targets once.
+
+        Args:
+            delta_time: Time between frames (in seconds).
+        """
+        if not self.tracks:
+            return
+
+        changed: dict[int, Any] = {}
+        finished: list[Track] = []
+        for track in self.tracks:
+            track.advance(delta_time)
+            changed[id(track.target)] = track.target
+            if track.finished:
+                finished.append(track)
+
+        if finished:
+            self.tracks = [track for track in self.tracks if not track.finished]
+
+        for target in changed.values():
+            update_view: Optional[Callable[[], None]] = getattr(target, 'update_view', None)
+            if update_view is not None:
+                update_view()
+
+        for track in finished:
+            if track.on_finish is not None:
+                track.on_finish()
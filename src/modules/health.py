@@ -0,0 +1,323 @@
+"""A module for monitoring the connection to the server.
+
+The monitor sends lightweight probes to the server, keeps the round-trip time and loss statistics and
+detects stalls. When the server stops responding, probes continue with a jittered exponential backoff
+until the connection is restored. Everything runs in an asyncio task, so the frame loop is not blocked.
+"""
+import asyncio
+import logging
+import random
+import time
+from enum import Enum
+from typing import Optional
+
+import aiohttp
+
+from src.modules.protocol import get_server_url
+
+
+class RingBuffer:
+    """Fixed-size buffer of the latest numeric samples.
+
+    Attributes:
+        capacity: Maximum number of samples.
+        _samples: Preallocated sample storage.
+        _index: Position of the next sample.
+        _count: Number of stored samples.
+    """
+
+    def __init__(self, capacity: int):
+        """Initialization.
+
+        Args:
+            capacity: Maximum number of samples.
+        """
+        self.capacity: int = capacity
+        self._samples: list[float] = [0.0] * capacity
+        self._index: int = 0
+        self._count: int = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        """Add a sample, replacing the oldest one if the buffer is full.
+
+        Args:
+            value: Sample.
+        """
+        self._samples[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def get_values(self) -> list[float]:
+        """Get the samples from the oldest to the newest.
+
+        Returns:
+            List of samples.
+        """
+        if self._count < self.capacity:
+            return self._samples[:self._count]
+        return self._samples[self._index:] + self._samples[:self._index]
+
+    def get_mean(self) -> float:
+        """Get the mean of the samples.
+
+        Returns:
+            Mean value (0 if there are no samples).
+        """
+        if self._count == 0:
+            return 0
+        return sum(self._samples[:self._count]) / self._count
+
+    def get_min(self) -> float:
+        """Get the minimum of the samples.
+
+        Returns:
+            Minimum value (0 if there are no samples).
+        """
+        if self._count == 0:
+            return 0
+        return min(self._samples[:self._count])
+
+    def get_max(self) -> float:
+        """Get the maximum of the samples.
+
+        Returns:
+            Maximum value (0 if there are no samples).
+        """
+        if self._count == 0:
+            return 0
+        return max(self._samples[:self._count])
+
+
+class Backoff:
+    """Exponential backoff with jitter.
+
+    Attributes:
+        base: Delay of the first attempt (in seconds).
+        maximum: Maximum delay (in seconds).
+        attempt: Number of the current attempt.
+    """
+
+    def __init__(self, base: float = 0.5, maximum: float = 15):
+        """Initialization.
+
+        Args:
+            base: Delay of the first attempt (in seconds).
+            maximum: Maximum delay (in seconds).
+        """
+        self.base: float = base
+        self.maximum: float = maximum
+        self.attempt: int = 0
+
+    def get_delay(self) -> float:
+        """Get the delay before the next attempt and move on to the next attempt.
+
+        Returns:
+            Delay (in seconds). It is random between half and the whole of the exponential delay.
+        """
+        delay: float = min(self.maximum, self.base * 2 ** self.attempt)
+        self.attempt += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self):
+        """Start over from the first attempt.
+        """
+        self.attempt = 0
+
+
+def is_network_error(error: BaseException) -> bool:
+    """Whether the error is caused by the connection rather than by the server response or the client.
+
+    Args:
+        error: Error raised by a network task.
+
+    Returns:
+        True for connection, timeout and transfer errors, False for example for an HTTP error status or
+        a malformed response.
+    """
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError,
+                              ConnectionError))
+
+
+class RestartPolicy:
+    """Restarts of a task that failed for a reason other than the network, with a backoff and a limit.
+
+    Such failures are not fixed by reconnecting, so restarting the task as soon as the connection is healthy
+    would repeat the failure on every probe.
+
+    Attributes:
+        max_failures: Number of failures in a row after which the task is not restarted.
+        backoff: Delays between restarts.
+        failures: Number of failures in a row.
+        retry_at: The moment from which the task can be restarted (in seconds of time.perf_counter).
+    """
+
+    def __init__(self, max_failures: int = 5, backoff: Optional[Backoff] = None):
+        """Initialization.
+
+        Args:
+            max_failures: Number of failures in a row after which the task is not restarted.
+            backoff: Delays between restarts.
+        """
+        self.max_failures: int = max_failures
+        self.backoff: Backoff = backoff if backoff is not None else Backoff(1, 30)
+        self.failures: int = 0
+        self.retry_at: float = 0
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the task has failed too many times to be restarted.
+        """
+        return self.failures >= self.max_failures
+
+    def register_failure(self):
+        """Take a failure into account and schedule the next restart.
+        """
+        self.failures += 1
+        self.retry_at = time.perf_counter() + self.backoff.get_delay()
+
+    def can_restart(self) -> bool:
+        """Whether the task can be restarted now.
+
+        Returns:
+            False while the backoff delay lasts or after too many failures.
+        """
+        return not self.exhausted and time.perf_counter() >= self.retry_at
+
+    def reset(self):
+        """Forget the failures, for example after the task succeeded.
+        """
+        self.failures = 0
+        self.retry_at = 0
+        self.backoff.reset()
+
+
+class HealthState(Enum):
+    """Connection state.
+    """
+    CONNECTING = 0
+    CONNECTED = 1
+    DEGRADED = 2
+    STALLED = 3
+    RECONNECTING = 4
+
+
+class ConnectionHealth:
+    """Connection monitor based on periodic probes.
+
+    Attributes:
+        host: Server address.
+        interval: Time between probes (in seconds).
+        timeout: Time after which a probe is considered lost (in seconds).
+        stall_after: Number of consecutive lost probes after which the connection is stalled.
+        degraded_rtt: Mean round-trip time (in seconds) above which the connection is degraded.
+        state: Current connection state.
+        rtt: Round-trip times of the latest successful probes (in seconds).
+        losses: Results of the latest probes (1 if lost, 0 otherwise).
+        backoff: Delays between probes while reconnecting.
+        consecutive_losses: Number of lost probes in a row.
+    """
+
+    def __init__(self, host: str, interval: float = 0.5, timeout: float = 1, stall_after: int = 2,
+                 degraded_rtt: float = 0.3):
+        """Initialization.
+
+        Args:
+            host: Server address.
+            interval: Time between probes (in seconds).
+            timeout: Time after which a probe is considered lost (in seconds).
+            stall_after: Number of consecutive lost probes after which the connection is stalled.
+            degraded_rtt: Mean round-trip time (in seconds) above which the connection is degraded.
+        """
+        self.host: str = host
+        self.interval: float = interval
+        self.timeout: float = timeout
+        self.stall_after: int = stall_after
+        self.degraded_rtt: float = degraded_rtt
+
+        self.state: HealthState = HealthState.CONNECTING
+        self.rtt: RingBuffer = RingBuffer(64)
+        self.losses: RingBuffer = RingBuffer(64)
+        self.backoff: Backoff = Backoff()
+        self.consecutive_losses: int = 0
+
+    def get_loss_rate(self) -> float:
+        """Get the share of lost probes.
+
+        Returns:
+            Loss rate [0; 1].
+        """
+        return self.losses.get_mean()
+
+    async def run(self):
+        """Probe the server until the task is cancelled.
+        """
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            while True:
+                rtt: Optional[float] = await self.probe(session)
+                self.register_probe(rtt)
+
+                if self.state in (HealthState.STALLED, HealthState.RECONNECTING):
+                    await asyncio.sleep(self.backoff.get_delay())
+                else:
+                    await asyncio.sleep(self.interval)
+
+    async def probe(self, session: aiohttp.ClientSession) -> Optional[float]:
+        """Send one probe.
+
+        Args:
+            session: Client session.
+
+        Returns:
+            Round-trip time (in seconds) or None if the probe is lost.
+        """
+        start: float = time.perf_counter()
+        try:
+            async with session.get(get_server_url(self.host, 'taste')) as response:
+                await response.read()
+                if response.status != 200:
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+        return time.perf_counter() - start
+
+    def register_probe(self, rtt: Optional[float]):
+        """Update the statistics and the state after the probe.
+
+        Args:
+            rtt: Round-trip time (in seconds) or None if the probe is lost.
+        """
+        self.losses.append(0 if rtt is not None else 1)
+
+        if rtt is None:
+            self.consecutive_losses += 1
+            if self.state == HealthState.STALLED:
+                self._set_state(HealthState.RECONNECTING)
+            elif self.state != HealthState.RECONNECTING and self.consecutive_losses >= self.stall_after:
+                self._set_state(HealthState.STALLED)
+            return
+
+        self.rtt.append(rtt)
+        self.consecutive_losses = 0
+        self.backoff.reset()
+        self._set_state(HealthState.DEGRADED if self.rtt.get_mean() > self.degraded_rtt else HealthState.CONNECTED)
+
+    def report_failure(self):
+        """Report a connection failure noticed outside of the probes, for example a closed channel.
+        """
+        if self.state not in (HealthState.STALLED, HealthState.RECONNECTING):
+            self._set_state(HealthState.STALLED)
+
+    def _set_state(self, state: HealthState):
+        """Change the connection state.
+
+        Args:
+            state: New state.
+        """
+        if state == self.state:
+            return
+        logging.info('Connection to %s: %s -> %s (rtt %.1f ms, loss %.0f%%).', self.host, self.state.name,
+                     state.name, self.rtt.get_mean() * 1000, self.get_loss_rate() * 100)
+        self.state = state
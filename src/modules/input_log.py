@@ -0,0 +1,249 @@
+"""A module for recording and replaying user input.
+
+Every frame the application reads the input into an InputFrame. The recorder writes the frames into a compact
+binary log, and the replay reads them back instead of the event queue, so a session can be repeated without
+a user and without a window. FrameCapture stores the frame hashes and frame times of a run to compare runs.
+
+Log format: the magic bytes and the version, then for every frame a fixed header followed by the key presses
+and the pressed mouse buttons of the frame.
+"""
+import hashlib
+import logging
+import struct
+from statistics import quantiles
+from typing import BinaryIO, Optional
+
+from pygame import Surface
+
+LOG_MAGIC: bytes = b'WSIL'
+LOG_VERSION: int = 1
+
+_LOG_HEADER: struct.Struct = struct.Struct('<4sB')
+# delta time, mouse position, mouse offset, mouse wheel, modifiers, pressed mouse buttons, flags,
+# number of keys, number of mouse buttons.
+_FRAME: struct.Struct = struct.Struct('<fhhhhhHBBBB')
+# key code, character code (-1 if the key has no character).
+_KEY: struct.Struct = struct.Struct('<ii')
+
+_MOUSE_MOVED: int = 1
+_QUIT: int = 2
+
+
+class InputFrame:
+    """Input of one frame.
+
+    Attributes:
+        delta_time: Time between frames (in seconds).
+        keys: Pressed keys in (key code, character code) format, the character code is -1 if there is none.
+        mouse_buttons: Mouse buttons pressed during the frame.
+        mouse_position: Mouse position.
+        mouse_pressed: Held mouse buttons (left, middle, right).
+        mouse_offset: Mouse offset from the last frame.
+        mouse_wheel: Vertical mouse wheel scroll.
+        is_mouse_move: Mouse movement flag.
+        key_modifiers: Bitmask of the held modifier keys.
+        quit: The flag that the window was closed.
+    """
+    __slots__ = ('delta_time', 'keys', 'mouse_buttons', 'mouse_position', 'mouse_pressed', 'mouse_offset',
+                 'mouse_wheel', 'is_mouse_move', 'key_modifiers', 'quit')
+
+    def __init__(self):
+        self.delta_time: float = 0
+        self.keys: list[tuple[int, int]] = []
+        self.mouse_buttons: list[int] = []
+        self.mouse_position: tuple[int, int] = (0, 0)
+        self.mouse_pressed: tuple[bool, bool, bool] = (False, False, False)
+        self.mouse_offset: tuple[int, int] = (0, 0)
+        self.mouse_wheel: int = 0
+        self.is_mouse_move: bool = False
+        self.key_modifiers: int = 0
+        self.quit: bool = False
+
+    def pack(self) -> bytes:
+        """Encode the frame.
+
+        Returns:
+            Frame record.
+        """
+        pressed: int = sum(1 << i for i, held in enumerate(self.mouse_pressed) if held)
+        flags: int = (_MOUSE_MOVED if self.is_mouse_move else 0) | (_QUIT if self.quit else 0)
+        keys: list[tuple[int, int]] = self.keys[:255]
+        buttons: list[int] = self.mouse_buttons[:255]
+        return b''.join([
+            _FRAME.pack(self.delta_time, *self.mouse_position, *self.mouse_offset, self.mouse_wheel,
+                        self.key_modifiers & 0xFFFF, pressed, flags, len(keys), len(buttons)),
+            *(_KEY.pack(*key) for key in keys),
+            bytes(buttons),
+        ])
+
+    @classmethod
+    def read(cls, file: BinaryIO) -> Optional['InputFrame']:
+        """Decode the next frame.
+
+        Args:
+            file: Log file.
+
+        Returns:
+            Frame or None at the end of the log.
+
+        Raises:
+            ValueError: If the log is truncated.
+        """
+        header: bytes = file.read(_FRAME.size)
+        if not header:
+            return None
+        if len(header) < _FRAME.size:
+            raise ValueError('Truncated input log.')
+
+        frame: InputFrame = cls()
+        (frame.delta_time, x, y, offset_x, offset_y, frame.mouse_wheel, frame.key_modifiers,
+         pressed, flags, keys, buttons) = _FRAME.unpack(header)
+        frame.mouse_position = (x, y)
+        frame.mouse_offset = (offset_x, offset_y)
+        frame.mouse_pressed = (bool(pressed & 1), bool(pressed & 2), bool(pressed & 4))
+        frame.is_mouse_move = bool(flags & _MOUSE_MOVED)
+        frame.quit = bool(flags & _QUIT)
+
+        body: bytes = file.read(keys * _KEY.size + buttons)
+        if len(body) < keys * _KEY.size + buttons:
+            raise ValueError('Truncated input log.')
+        frame.keys = [_KEY.unpack_from(body, i * _KEY.size) for i in range(keys)]
+        frame.mouse_buttons = list(body[keys * _KEY.size:])
+        return frame
+
+
+class InputRecorder:
+    """Writes the input of every frame into a log file.
+
+    Attributes:
+        path: Log path.
+        frames: Number of written frames.
+        _file: Log file.
+    """
+
+    def __init__(self, path: str):
+        """Initialization.
+
+        Args:
+            path: Log path. The file is overwritten.
+        """
+        self.path: str = path
+        self.frames: int = 0
+        self._file: BinaryIO = open(path, 'wb')  # pylint: disable=consider-using-with
+        self._file.write(_LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION))
+
+    def write(self, frame: InputFrame):
+        """Write a frame.
+
+        Args:
+            frame: Frame input.
+        """
+        self._file.write(frame.pack())
+        self.frames += 1
+
+    def close(self):
+        """Finish the log.
+        """
+        self._file.close()
+        logging.info('Recorded %d frames of input into %s.', self.frames, self.path)
+
+
+class InputReplay:
+    """Reads the input of every frame from a log file.
+
+    Attributes:
+        path: Log path.
+        delta_time: Time between frames used instead of the recorded one (in seconds), so that the replay
+            does not depend on the speed of the machine. The recorded time is used if None.
+        frames: Number of read frames.
+        _file: Log file.
+    """
+
+    def __init__(self, path: str, delta_time: Optional[float] = 1 / 60):
+        """Initialization.
+
+        Args:
+            path: Log path.
+            delta_time: Time between frames (in seconds). The recorded time is used if None.
+
+        Raises:
+            ValueError: If the file is not an input log of a supported version.
+        """
+        self.path: str = path
+        self.delta_time: Optional[float] = delta_time
+        self.frames: int = 0
+        self._file: BinaryIO = open(path, 'rb')  # pylint: disable=consider-using-with
+
+        header: bytes = self._file.read(_LOG_HEADER.size)
+        if len(header) < _LOG_HEADER.size or _LOG_HEADER.unpack(header) != (LOG_MAGIC, LOG_VERSION):
+            self._file.close()
+            raise ValueError(f'{path} is not an input log of version {LOG_VERSION}.')
+
+    def read(self) -> Optional[InputFrame]:
+        """Read the next frame.
+
+        Returns:
+            Frame input or None when the log is over.
+        """
+        frame: Optional[InputFrame] = InputFrame.read(self._file)
+        if frame is None:
+            return None
+        if self.delta_time is not None:
+            frame.delta_time = self.delta_time
+        self.frames += 1
+        return frame
+
+    def close(self):
+        """Close the log.
+        """
+        self._file.close()
+
+
+class FrameCapture:
+    """Collects the frame times and, optionally, the hashes of the rendered frames of a run.
+
+    Attributes:
+        hashes_path: Path of the file with one frame hash per line (None to skip hashing).
+        times_path: Path of the file with one frame time in milliseconds per line (None to skip saving).
+        hashes: Frame hashes.
+        times: Frame times (in seconds).
+    """
+
+    def __init__(self, hashes_path: Optional[str] = None, times_path: Optional[str] = None):
+        """Initialization.
+
+        Args:
+            hashes_path: Path of the file with one frame hash per line (None to skip hashing).
+            times_path: Path of the file with one frame time in milliseconds per line (None to skip saving).
+        """
+        self.hashes_path: Optional[str] = hashes_path
+        self.times_path: Optional[str] = times_path
+        self.hashes: list[str] = []
+        self.times: list[float] = []
+
+    def add(self, screen: Surface, frame_time: float):
+        """Add a rendered frame.
+
+        Args:
+            screen: The main surface.
+            frame_time: Time spent on the frame (in seconds).
+        """
+        self.times.append(frame_time)
+        if self.hashes_path is not None:
+            self.hashes.append(hashlib.blake2b(screen.get_view('2'), digest_size=16).hexdigest())
+
+    def close(self):
+        """Save the captured data and log the frame time distribution.
+        """
+        if self.hashes_path is not None:
+            with open(self.hashes_path, 'w', encoding='utf-8') as file:
+                file.write('\n'.join(self.hashes) + '\n')
+        if self.times_path is not None:
+            with open(self.times_path, 'w', encoding='utf-8') as file:
+                file.write('\n'.join(f'{frame_time * 1000:.3f}' for frame_time in self.times) + '\n')
+
+        if len(self.times) >= 2:
+            percentiles: list[float] = quantiles(self.times, n=100, method='inclusive')
+            logging.info('Frame times of %d frames: p50 %.2f ms, p95 %.2f ms, p99 %.2f ms, max %.2f ms.',
+                         len(self.times), percentiles[49] * 1000, percentiles[94] * 1000,
+                         percentiles[98] * 1000, max(self.times) * 1000)
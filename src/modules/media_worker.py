@@ -0,0 +1,390 @@
+"""A module for decoding media outside of the frame loop.
+
+Segments are decoded by a worker that runs in a thread or in a separate process, so that decoding does not
+compete with App.loop for the interpreter. Decoded frames are passed through a ring of frame slots in shared
+memory. The ring has a single writer (the worker) and a single reader (the UI), and every counter is written
+by one side only, so no locks are needed:
+
+* the write counter is increased by the worker after a frame is complete;
+* the read counter is increased by the UI after a frame is no longer used;
+* the sequence number of a slot is odd while the worker writes into it and even when the frame is complete.
+
+The UI wraps the frame slots as pygame surfaces once, so taking a frame does not copy it. The surfaces
+export the shared memory, so the UI must drop the frames it has taken before the ring is closed.
+
+Frames are raw RGB24 images: the default decoder splits the segment data into frames of the configured size.
+"""
+import logging
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Iterator, Optional, Union
+
+import pygame as pg
+
+from src.modules.health import Backoff, RestartPolicy
+
+Decoder = Callable[[bytes, int], Iterator[Union[bytes, memoryview]]]
+
+
+def decode_raw_frames(data: bytes, frame_bytes: int) -> Iterator[memoryview]:
+    """Split raw RGB24 data into frames. An incomplete last frame is dropped.
+
+    Args:
+        data: Segment data.
+        frame_bytes: Size of one frame (in bytes).
+
+    Returns:
+        Frames.
+    """
+    view: memoryview = memoryview(data)
+    for offset in range(0, len(data) - frame_bytes + 1, frame_bytes):
+        yield view[offset:offset + frame_bytes]
+
+
+class FrameRing:
+    """Ring of frame slots in shared memory.
+
+    Memory layout: the write counter, the read counter and the sequence numbers of the slots (unsigned 64-bit
+    integers), followed by the frame slots.
+
+    Attributes:
+        frame_size: Frame size in pixels.
+        frame_bytes: Size of one frame (in bytes).
+        slots: Number of frame slots.
+        memory: Shared memory block.
+        closed: Whether the ring is detached from the shared memory.
+        _counters: Counters of the ring.
+        _surfaces: Surfaces that wrap the frame slots (created by the reader on demand).
+    """
+
+    def __init__(self, frame_size: tuple[int, int], slots: int = 4, name: Optional[str] = None):
+        """Initialization.
+
+        Args:
+            frame_size: Frame size in pixels.
+            slots: Number of frame slots.
+            name: Name of an existing ring to attach to. A new ring is created if None.
+        """
+        self.frame_size: tuple[int, int] = frame_size
+        self.frame_bytes: int = frame_size[0] * frame_size[1] * 3
+        self.slots: int = slots
+        header: int = 8 * (2 + slots)
+        if name is None:
+            self.memory: SharedMemory = SharedMemory(create=True, size=header + slots * self.frame_bytes)
+            self.memory.buf[:header] = bytes(header)
+        elif sys.version_info >= (3, 13):
+            # The creator owns the block, an attached process must not remove it when it exits.
+            self.memory = SharedMemory(name=name, track=False)
+        else:
+            # Before Python 3.13 the block cannot be left untracked, but a child process shares the resource
+            # tracker of the creator, which removes the block only if the creator has not.
+            self.memory = SharedMemory(name=name)
+        self._counters: memoryview = self.memory.buf[:header].cast('Q')
+        self._surfaces: dict[int, pg.Surface] = {}
+        self.closed: bool = False
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block.
+        """
+        return self.memory.name
+
+    def __len__(self) -> int:
+        return self._counters[0] - self._counters[1]
+
+    def _get_offset(self, slot: int) -> int:
+        """Get the offset of a frame slot.
+
+        Args:
+            slot: Slot index.
+
+        Returns:
+            Offset (in bytes).
+        """
+        return 8 * (2 + self.slots) + slot * self.frame_bytes
+
+    def write(self, frame: Union[bytes, memoryview]) -> bool:
+        """Write a frame. Called by the worker.
+
+        Args:
+            frame: Frame data, shorter data is padded with black.
+
+        Returns:
+            Whether the frame is written. False if all slots are in use.
+        """
+        written: int = self._counters[0]
+        if written - self._counters[1] >= self.slots:
+            return False
+
+        slot: int = written % self.slots
+        offset: int = self._get_offset(slot)
+        size: int = min(len(frame), self.frame_bytes)
+        self._counters[2 + slot] = 2 * written + 1
+        self.memory.buf[offset:offset + size] = frame[:size]
+        if size < self.frame_bytes:
+            self.memory.buf[offset + size:offset + self.frame_bytes] = bytes(self.frame_bytes - size)
+        self._counters[2 + slot] = 2 * written + 2
+        self._counters[0] = written + 1
+        return True
+
+    def peek(self) -> Optional[pg.Surface]:
+        """Get the oldest unread frame without copying it. Called by the UI.
+
+        Returns:
+            Surface that wraps the frame slot, or None if there is no complete frame. It is valid until
+            release is called.
+        """
+        read: int = self._counters[1]
+        if read >= self._counters[0]:
+            return None
+        slot: int = read % self.slots
+        if self._counters[2 + slot] != 2 * read + 2:
+            return None
+
+        surface: Optional[pg.Surface] = self._surfaces.get(slot)
+        if surface is None:
+            offset: int = self._get_offset(slot)
+            surface = pg.image.frombuffer(self.memory.buf[offset:offset + self.frame_bytes], self.frame_size, 'RGB')
+            self._surfaces[slot] = surface
+        return surface
+
+    def release(self):
+        """Return the slot of the oldest unread frame to the worker. Called by the UI.
+        """
+        if self._counters[1] < self._counters[0]:
+            self._counters[1] += 1
+
+    def close(self, unlink: bool = False):
+        """Detach from the shared memory.
+
+        Frames taken with peek must be dropped by the caller before. A frame that is still referenced keeps
+        the memory mapped: the detaching is then left to the garbage collector and a warning is logged.
+
+        Args:
+            unlink: Whether to remove the block. Only the creator of the ring should remove it.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._surfaces.clear()
+        self._counters.release()
+        try:
+            self.memory.close()
+        except BufferError:
+            logging.warning('A frame of the ring %s is still referenced, the memory is unmapped when it is '
+                            'dropped.', self.memory.name)
+        if unlink:
+            self.memory.unlink()
+
+
+def run_worker(ring: Union[FrameRing, str], frame_size: tuple[int, int], slots: int, tasks: Any, stop: Any,
+               decoder: Decoder = decode_raw_frames):
+    """Decode segments from the task queue into the frame ring until stopped.
+
+    Args:
+        ring: Frame ring, or its name when the worker runs in another process.
+        frame_size: Frame size in pixels.
+        slots: Number of frame slots.
+        tasks: Queue of segment data.
+        stop: Event that stops the worker.
+        decoder: The function that splits segment data into frames.
+    """
+    owned: bool = isinstance(ring, str)
+    frame_ring: FrameRing = FrameRing(frame_size, slots, ring) if owned else ring
+    try:
+        while not stop.is_set():
+            try:
+                data: bytes = tasks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            for frame in decoder(data, frame_ring.frame_bytes):
+                while not frame_ring.write(frame):
+                    if stop.is_set():
+                        return
+                    time.sleep(0.002)
+    finally:
+        if owned:
+            frame_ring.close()
+
+
+class MediaWorker:
+    """Decoding worker that runs in a thread or in a separate process and is restarted if it crashes.
+
+    Restarts are delayed by an exponential backoff. A process worker that keeps crashing is replaced by
+    a thread worker, and a thread worker that keeps crashing is not restarted any more.
+
+    Attributes:
+        mode: "thread" or "process". It changes to "thread" when the process worker keeps crashing.
+        frame_size: Frame size in pixels.
+        decoder: The function that splits segment data into frames. In the process mode it must be
+            a module-level function.
+        ring: Frame ring.
+        restarts: Number of restarts after crashes.
+        restart_policy: Backoff and limit of the restarts after crashes in a row.
+        stable_time: Time after which a running worker is no longer considered crashing (in seconds).
+        _tasks: Queue of segment data.
+        _stop: Event that stops the worker.
+        _worker: Worker thread or process.
+        _started: The moment the worker was started (in seconds of time.perf_counter).
+        _crashed: Whether the crash of the current worker is already registered in the restart policy.
+    """
+
+    def __init__(self, frame_size: tuple[int, int], mode: str = 'process', slots: int = 4,
+                 decoder: Decoder = decode_raw_frames, restart_policy: Optional[RestartPolicy] = None,
+                 stable_time: float = 10):
+        """Initialization.
+
+        Args:
+            frame_size: Frame size in pixels.
+            mode: "thread" or "process".
+            slots: Number of frame slots.
+            decoder: The function that splits segment data into frames.
+            restart_policy: Backoff and limit of the restarts after crashes in a row.
+            stable_time: Time after which a running worker is no longer considered crashing (in seconds).
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in ('thread', 'process'):
+            raise ValueError(f'Unknown media worker mode: {mode}.')
+        self.mode: str = mode
+        self.frame_size: tuple[int, int] = frame_size
+        self.decoder: Decoder = decoder
+        self.ring: FrameRing = FrameRing(frame_size, slots)
+        self.restarts: int = 0
+        self.restart_policy: RestartPolicy = (restart_policy if restart_policy is not None
+                                              else RestartPolicy(3, Backoff(0.5, 8)))
+        self.stable_time: float = stable_time
+        self._tasks: Any = None
+        self._stop: Any = None
+        self._worker: Optional[Union[threading.Thread, multiprocessing.Process]] = None
+        self._started: float = 0
+        self._crashed: bool = False
+
+    def start(self):
+        """Start the worker.
+        """
+        if self.mode == 'thread':
+            self._tasks = queue.Queue()
+            self._stop = threading.Event()
+            self._worker = threading.Thread(
+                target=run_worker,
+                args=(self.ring, self.frame_size, self.ring.slots, self._tasks, self._stop, self.decoder),
+                name='media-worker', daemon=True)
+        else:
+            self._tasks = multiprocessing.Queue()
+            self._stop = multiprocessing.Event()
+            self._worker = multiprocessing.Process(
+                target=run_worker,
+                args=(self.ring.name, self.frame_size, self.ring.slots, self._tasks, self._stop, self.decoder),
+                name='media-worker', daemon=True)
+        self._worker.start()
+        self._started = time.perf_counter()
+        self._crashed = False
+        logging.info('The media worker is started in the %s mode.', self.mode)
+
+    def submit(self, data: bytes):
+        """Queue segment data for decoding. It is dropped if the worker has crashed too many times.
+
+        Args:
+            data: Segment data.
+        """
+        if self._tasks is not None:
+            self._tasks.put(data)
+
+    def check(self) -> bool:
+        """Restart the worker if it has crashed and its backoff delay has passed. Called every frame.
+
+        The segments that were queued for the crashed worker are passed to the new one, a frame it was
+        writing is written again by the new worker.
+
+        Returns:
+            Whether the worker was restarted.
+        """
+        if self._worker is None:
+            return False
+        if self._worker.is_alive():
+            if self.restart_policy.failures and time.perf_counter() - self._started >= self.stable_time:
+                self.restart_policy.reset()
+            return False
+
+        if not self._crashed:
+            self._crashed = True
+            self.restart_policy.register_failure()
+            logging.error('The media worker has stopped unexpectedly (exit code %s).',
+                          getattr(self._worker, 'exitcode', None))
+            if self.restart_policy.exhausted:
+                if self.mode == 'thread':
+                    logging.error('The media worker has crashed %d times in a row, it is not restarted.',
+                                  self.restart_policy.failures)
+                    self._worker = None
+                    self._discard_tasks()
+                    return False
+                logging.warning('The media worker process has crashed %d times in a row, falling back to '
+                                'the thread mode.', self.restart_policy.failures)
+                self.mode = 'thread'
+                self.restart_policy.reset()
+        if not self.restart_policy.can_restart():
+            return False
+
+        pending: list[bytes] = self._discard_tasks()
+        self.restarts += 1
+        self.start()
+        for data in pending:
+            self._tasks.put(data)
+        return True
+
+    def _discard_tasks(self) -> list[bytes]:
+        """Take the segments left in the queue of the stopped worker and close the queue.
+
+        A process queue is read until its feeder thread has flushed it, so that joining the feeder thread
+        does not block on a full pipe.
+
+        Returns:
+            Segment data that was not decoded.
+        """
+        pending: list[bytes] = []
+        if self._tasks is None:
+            return pending
+        process_queue: bool = not isinstance(self._tasks, queue.Queue)
+        while True:
+            try:
+                pending.append(self._tasks.get(timeout=0.05) if process_queue else self._tasks.get_nowait())
+            except queue.Empty:
+                break
+        if process_queue:
+            self._tasks.close()
+            self._tasks.join_thread()
+        self._tasks = None
+        return pending
+
+    def next_frame(self) -> Optional[pg.Surface]:
+        """Get the next decoded frame without copying it.
+
+        Returns:
+            Frame or None if no frame is ready. It is valid until release_frame is called.
+        """
+        return self.ring.peek()
+
+    def release_frame(self):
+        """Return the frame taken by next_frame to the worker.
+        """
+        self.ring.release()
+
+    def stop(self):
+        """Stop the worker and remove the frame ring.
+        """
+        worker: Optional[Union[threading.Thread, multiprocessing.Process]] = self._worker
+        self._worker = None
+        if worker is not None:
+            self._stop.set()
+            worker.join(1)
+            if isinstance(worker, multiprocessing.Process) and worker.is_alive():
+                worker.terminate()
+                worker.join(1)
+        self._discard_tasks()
+        self.ring.close(unlink=True)
@@ -0,0 +1,107 @@
+"""A module with the queue of inbound messages.
+
+Network tasks put messages into the queue of the scene, and the scene handles them once per frame.
+Messages with the same key replace each other, so a burst of updates causes one piece of work per frame.
+When the queue is full, the oldest droppable message is evicted. Control messages (play, pause, seek) are
+never dropped: they have a few keys only, so they cannot make the queue grow without a bound.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class MessageQueue:
+    """Bounded queue that coalesces messages by key.
+
+    Attributes:
+        maxsize: Maximum number of different keys in the queue.
+        received: Number of received messages.
+        coalesced: Number of messages replaced by a newer message with the same key.
+        overflowed: Number of messages dropped because the queue was full.
+        _messages: Pending messages in {key: message} format, in the order of the last update.
+        _control: Keys of the pending messages that must not be dropped.
+        _reported_overflow: Value of overflowed at the last report.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """Initialization.
+
+        Args:
+            maxsize: Maximum number of different keys in the queue.
+        """
+        self.maxsize: int = maxsize
+        self.received: int = 0
+        self.coalesced: int = 0
+        self.overflowed: int = 0
+        self._messages: OrderedDict[Hashable, Any] = OrderedDict()
+        self._control: set[Hashable] = set()
+        self._reported_overflow: int = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def put(self, key: Hashable, message: Any, control: bool = False) -> bool:
+        """Put a message into the queue. A pending message with the same key is replaced.
+
+        Args:
+            key: Message key.
+            message: Message.
+            control: Whether the message must not be dropped on overflow.
+
+        Returns:
+            False if the queue was full and a message was dropped (the oldest droppable one, or this one if all
+            pending messages are control messages), True otherwise.
+        """
+        self.received += 1
+        if control:
+            self._control.add(key)
+        if key in self._messages:
+            self.coalesced += 1
+            del self._messages[key]
+            self._messages[key] = message
+            return True
+
+        accepted: bool = True
+        if len(self._messages) >= self.maxsize and not control:
+            self.overflowed += 1
+            accepted = False
+            oldest: Optional[Hashable] = next(
+                (pending for pending in self._messages if pending not in self._control), None)
+            if oldest is None:
+                return False
+            del self._messages[oldest]
+        self._messages[key] = message
+        return accepted
+
+    def drain(self, handler: Callable[[Hashable, Any], None], budget: float) -> int:
+        """Handle pending messages in the order of arrival until the queue is empty or the time runs out.
+
+        Args:
+            handler: The function that is called for every message with its key.
+            budget: Time limit (in seconds). At least one message is handled per call.
+
+        Returns:
+            Number of handled messages.
+        """
+        if self.overflowed != self._reported_overflow:
+            logging.warning('The message queue overflowed, %s messages dropped.',
+                            self.overflowed - self._reported_overflow)
+            self._reported_overflow = self.overflowed
+
+        deadline: float = time.perf_counter() + budget
+        handled: int = 0
+        while self._messages:
+            key, message = self._messages.popitem(last=False)
+            self._control.discard(key)
+            handler(key, message)
+            handled += 1
+            if time.perf_counter() >= deadline:
+                break
+        return handled
+
+    def clear(self):
+        """Drop all pending messages.
+        """
+        self._messages.clear()
+        self._control.clear()
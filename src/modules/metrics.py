@@ -0,0 +1,366 @@
+"""A module for application metrics.
+
+The registry creates counters, gauges and histograms by name. A disabled registry hands out a shared metric
+that ignores all calls, so instrumented code costs one empty method call when metrics are off.
+
+Histograms keep log-linear buckets like HDR histograms: values are counted exactly up to 2^precision and
+with a relative error below 2^(1 - precision) above it, in constant memory per order of magnitude.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Optional, Union
+
+from aiohttp import web
+
+
+class Counter:
+    """Monotonically increasing value.
+
+    Attributes:
+        name: Metric name.
+        description: Metric description.
+        value: Current value.
+    """
+
+    def __init__(self, name: str, description: str = ''):
+        """Initialization.
+
+        Args:
+            name: Metric name.
+            description: Metric description.
+        """
+        self.name: str = name
+        self.description: str = description
+        self.value: float = 0
+
+    def inc(self, amount: float = 1):
+        """Increase the value.
+
+        Args:
+            amount: Increment.
+        """
+        self.value += amount
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the metric as a dictionary.
+
+        Returns:
+            Metric snapshot.
+        """
+        return {'type': 'counter', 'description': self.description, 'value': self.value}
+
+
+class Gauge(Counter):
+    """Value that can go up and down.
+    """
+
+    def set(self, value: float):
+        """Set the value.
+
+        Args:
+            value: New value.
+        """
+        self.value = value
+
+    def as_dict(self) -> dict[str, Any]:
+        return {'type': 'gauge', 'description': self.description, 'value': self.value}
+
+
+class Histogram:
+    """Distribution of values in log-linear buckets.
+
+    Attributes:
+        name: Metric name.
+        description: Metric description.
+        scale: Values are multiplied by the scale and rounded to integers, for example 1e6 to count seconds
+            in microseconds.
+        precision: Number of bits of the bucket mantissa.
+        buckets: Counts in {bucket index: count} format.
+        count: Number of values.
+        total: Sum of the values.
+        minimum: The smallest value.
+        maximum: The largest value.
+    """
+
+    def __init__(self, name: str, description: str = '', scale: float = 1e6, precision: int = 5):
+        """Initialization.
+
+        Args:
+            name: Metric name.
+            description: Metric description.
+            scale: Multiplier that turns the values into integers.
+            precision: Number of bits of the bucket mantissa.
+        """
+        self.name: str = name
+        self.description: str = description
+        self.scale: float = scale
+        self.precision: int = precision
+        self.buckets: dict[int, int] = {}
+        self.count: int = 0
+        self.total: float = 0
+        self.minimum: float = float('inf')
+        self.maximum: float = float('-inf')
+
+    def _get_index(self, value: int) -> int:
+        """Get the bucket of a scaled value.
+
+        Args:
+            value: Scaled value.
+
+        Returns:
+            Bucket index.
+        """
+        if value < 1 << self.precision:
+            return value
+        shift: int = value.bit_length() - self.precision
+        half: int = 1 << (self.precision - 1)
+        return (1 << self.precision) + (shift - 1) * half + (value >> shift) - half
+
+    def _get_lower_bound(self, index: int) -> int:
+        """Get the smallest scaled value of a bucket.
+
+        Args:
+            index: Bucket index.
+
+        Returns:
+            Scaled value.
+        """
+        if index < 1 << self.precision:
+            return index
+        half: int = 1 << (self.precision - 1)
+        shift, mantissa = divmod(index - (1 << self.precision), half)
+        return (mantissa + half) << (shift + 1)
+
+    def record(self, value: float):
+        """Add a value.
+
+        Args:
+            value: Value (negative values are counted as zero).
+        """
+        index: int = self._get_index(max(0, int(value * self.scale)))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def get_percentile(self, percentile: float) -> float:
+        """Get a percentile.
+
+        Args:
+            percentile: Percentile [0; 100].
+
+        Returns:
+            The lower bound of the bucket that contains the percentile (0 if there are no values).
+        """
+        if not self.count:
+            return 0
+        rank: float = self.count * percentile / 100
+        seen: int = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return self._get_lower_bound(index) / self.scale
+        return self.maximum
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the metric as a dictionary.
+
+        Returns:
+            Metric snapshot.
+        """
+        return {
+            'type': 'histogram',
+            'description': self.description,
+            'count': self.count,
+            'sum': self.total,
+            'min': self.minimum if self.count else 0,
+            'max': self.maximum if self.count else 0,
+            'p50': self.get_percentile(50),
+            'p90': self.get_percentile(90),
+            'p99': self.get_percentile(99),
+            'p999': self.get_percentile(99.9),
+        }
+
+
+class NullMetric:
+    """Metric of a disabled registry. All calls are ignored.
+    """
+
+    def inc(self, amount: float = 1):
+        """Ignore an increment.
+        """
+
+    def set(self, value: float):
+        """Ignore a value.
+        """
+
+    def record(self, value: float):
+        """Ignore a value.
+        """
+
+
+NULL_METRIC: NullMetric = NullMetric()
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class MetricsRegistry:
+    """Named metrics of the application.
+
+    Attributes:
+        enabled: Whether the metrics are collected.
+        metrics: Metrics in {name: metric} format.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """Initialization.
+
+        Args:
+            enabled: Whether the metrics are collected.
+        """
+        self.enabled: bool = enabled
+        self.metrics: dict[str, Metric] = {}
+
+    def _get(self, name: str, metric_type: type, *args: Any) -> Union[Metric, NullMetric]:
+        """Get a metric, creating it on the first use.
+
+        Args:
+            name: Metric name.
+            metric_type: Metric class.
+            *args: Metric arguments.
+
+        Returns:
+            Metric or the null metric if the registry is disabled.
+
+        Raises:
+            TypeError: If a metric with the name has another type.
+        """
+        if not self.enabled:
+            return NULL_METRIC
+        metric: Optional[Metric] = self.metrics.get(name)
+        if metric is None:
+            metric = metric_type(name, *args)
+            self.metrics[name] = metric
+        elif type(metric) is not metric_type:  # pylint: disable=unidiomatic-typecheck
+            raise TypeError(f'Metric {name} is a {type(metric).__name__}, not a {metric_type.__name__}.')
+        return metric
+
+    def counter(self, name: str, description: str = '') -> Union[Counter, NullMetric]:
+        """Get a counter.
+
+        Args:
+            name: Metric name.
+            description: Metric description.
+
+        Returns:
+            Counter.
+        """
+        return self._get(name, Counter, description)
+
+    def gauge(self, name: str, description: str = '') -> Union[Gauge, NullMetric]:
+        """Get a gauge.
+
+        Args:
+            name: Metric name.
+            description: Metric description.
+
+        Returns:
+            Gauge.
+        """
+        return self._get(name, Gauge, description)
+
+    def histogram(self, name: str, description: str = '', scale: float = 1e6) -> Union[Histogram, NullMetric]:
+        """Get a histogram.
+
+        Args:
+            name: Metric name.
+            description: Metric description.
+            scale: Multiplier that turns the values into integers.
+
+        Returns:
+            Histogram.
+        """
+        return self._get(name, Histogram, description, scale)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Get the values of all metrics.
+
+        Returns:
+            Snapshot in {'time': unix time, 'metrics': {name: metric}} format.
+        """
+        return {'time': time.time(), 'metrics': {name: metric.as_dict() for name, metric in self.metrics.items()}}
+
+
+class MetricsExporter:
+    """Periodically writes metric snapshots to a file and serves them over HTTP.
+
+    Attributes:
+        registry: Metrics registry.
+        path: Snapshot file path (None to skip writing).
+        port: Port of the local HTTP endpoint (None to skip serving).
+        interval: Time between snapshots (in seconds).
+    """
+
+    def __init__(self, registry: MetricsRegistry, path: Optional[str] = None, port: Optional[int] = None,
+                 interval: float = 10):
+        """Initialization.
+
+        Args:
+            registry: Metrics registry.
+            path: Snapshot file path (None to skip writing).
+            port: Port of the local HTTP endpoint (None to skip serving).
+            interval: Time between snapshots (in seconds).
+        """
+        self.registry: MetricsRegistry = registry
+        self.path: Optional[str] = path
+        self.port: Optional[int] = port
+        self.interval: float = interval
+
+    def write_snapshot(self):
+        """Write a snapshot to the file. The file is replaced at once, so readers never see a partial one.
+        """
+        temporary_path: str = f'{self.path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump(self.registry.snapshot(), file)
+        os.replace(temporary_path, self.path)
+
+    async def handle_metrics(self, _: web.Request) -> web.Response:
+        """Serve a snapshot.
+
+        Returns:
+            JSON response.
+        """
+        return web.json_response(self.registry.snapshot())
+
+    async def run(self):
+        """Export the metrics until cancelled.
+        """
+        runner: Optional[web.AppRunner] = None
+        if self.port is not None:
+            application: web.Application = web.Application()
+            application.router.add_get('/metrics', self.handle_metrics)
+            runner = web.AppRunner(application, access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, '127.0.0.1', self.port).start()
+            logging.info('Metrics are served at http://127.0.0.1:%d/metrics.', self.port)
+
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                if self.path is not None:
+                    try:
+                        self.write_snapshot()
+                    except OSError as error:
+                        logging.error('Failed to write metrics to %s: %s', self.path, error)
+        finally:
+            if self.path is not None:
+                try:
+                    self.write_snapshot()
+                except OSError as error:
+                    logging.error('Failed to write metrics to %s: %s', self.path, error)
+            if runner is not None:
+                await runner.cleanup()
@@ -0,0 +1,333 @@
+"""A module with the media clock of the Cinema playback and the drift correction.
+
+Small offsets from the shared party clock are corrected by slightly changing the playback rate, so the
+picture does not jump. Hard seeks are used only for large offsets.
+"""
+import logging
+import random
+import time
+from enum import Enum
+from statistics import median
+from typing import Optional
+
+from src.modules.health import ConnectionHealth, RingBuffer
+from src.modules.protocol import MessageType, SyncMessage
+
+
+class PlaybackClock:
+    """Media clock that defines which frame is presented.
+
+    Attributes:
+        position: Playback position (in seconds).
+        rate: Playback rate (1 is the normal speed).
+        playing: Playback flag.
+    """
+
+    def __init__(self):
+        self.position: float = 0
+        self.rate: float = 1
+        self.playing: bool = False
+
+    def advance(self, delta_time: float):
+        """Advance the clock by the frame time. Called every frame.
+
+        Args:
+            delta_time: Time between frames (in seconds).
+        """
+        if self.playing:
+            self.position += delta_time * self.rate
+
+    def seek(self, position: float):
+        """Jump to the position.
+
+        Args:
+            position: New playback position (in seconds).
+        """
+        self.position = position
+
+
+class Correction(Enum):
+    """The action taken by the drift corrector.
+    """
+    NONE = 0
+    RATE = 1
+    SEEK = 2
+
+
+class DriftHistogram:
+    """Histogram of absolute drift errors with exponential buckets.
+
+    Attributes:
+        bounds: Upper bounds of the buckets (in milliseconds), the last bucket is unbounded.
+        counts: Number of samples in every bucket.
+    """
+
+    def __init__(self, bounds: tuple[int, ...] = (10, 20, 40, 80, 160, 320, 640, 1280)):
+        """Initialization.
+
+        Args:
+            bounds: Upper bounds of the buckets (in milliseconds).
+        """
+        self.bounds: tuple[int, ...] = bounds
+        self.counts: list[int] = [0] * (len(bounds) + 1)
+
+    def add(self, error: float):
+        """Add a sample.
+
+        Args:
+            error: Drift error (in seconds).
+        """
+        error_ms: float = abs(error) * 1000
+        for i, bound in enumerate(self.bounds):
+            if error_ms < bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def format(self) -> str:
+        """Format the histogram for the log.
+
+        Returns:
+            String in "<10ms: n, <20ms: n, ..., >=1280ms: n" format.
+        """
+        parts: list[str] = [f'<{bound}ms: {count}' for bound, count in zip(self.bounds, self.counts)]
+        parts.append(f'>={self.bounds[-1]}ms: {self.counts[-1]}')
+        return ', '.join(parts)
+
+    def reset(self):
+        """Remove all samples.
+        """
+        self.counts = [0] * (len(self.bounds) + 1)
+
+
+class DriftCorrector:
+    """Keeps the playback clock close to the reference position of the party.
+
+    Attributes:
+        dead_zone: Error (in seconds) below which no correction is made.
+        seek_threshold: Error (in seconds) above which a hard seek is made.
+        max_rate_offset: Maximum deviation of the playback rate from 1.
+        gain: The rate offset per second of error.
+        log_interval: Time between writing the histogram to the log (in seconds).
+        histogram: Histogram of the drift errors since the last log entry.
+        seeks: Number of hard seeks.
+        _last_log: Time of the last log entry.
+    """
+
+    def __init__(self, dead_zone: float = 0.04, seek_threshold: float = 1, max_rate_offset: float = 0.05,
+                 gain: float = 0.5, log_interval: float = 30):
+        """Initialization.
+
+        Args:
+            dead_zone: Error (in seconds) below which no correction is made.
+            seek_threshold: Error (in seconds) above which a hard seek is made.
+            max_rate_offset: Maximum deviation of the playback rate from 1.
+            gain: The rate offset per second of error.
+            log_interval: Time between writing the histogram to the log (in seconds).
+        """
+        self.dead_zone: float = dead_zone
+        self.seek_threshold: float = seek_threshold
+        self.max_rate_offset: float = max_rate_offset
+        self.gain: float = gain
+        self.log_interval: float = log_interval
+
+        self.histogram: DriftHistogram = DriftHistogram()
+        self.seeks: int = 0
+        self._last_log: float = time.perf_counter()
+
+    def correct(self, clock: PlaybackClock, reference: float) -> Correction:
+        """Correct the clock towards the reference position.
+
+        Args:
+            clock: Playback clock.
+            reference: Reference position of the party (in seconds).
+
+        Returns:
+            The action taken.
+        """
+        error: float = reference - clock.position
+        self.histogram.add(error)
+        self._log_histogram()
+
+        if abs(error) >= self.seek_threshold:
+            logging.info('Drift of %.3f s, seeking to %.3f s.', error, reference)
+            clock.seek(reference)
+            clock.rate = 1
+            self.seeks += 1
+            return Correction.SEEK
+
+        if abs(error) <= self.dead_zone:
+            clock.rate = 1
+            return Correction.NONE
+
+        offset: float = max(-self.max_rate_offset, min(self.max_rate_offset, error * self.gain))
+        clock.rate = 1 + offset
+        return Correction.RATE
+
+    def _log_histogram(self):
+        """Write the histogram to the log once per log interval.
+        """
+        now: float = time.perf_counter()
+        if now - self._last_log < self.log_interval:
+            return
+        logging.info('Drift errors: %s (seeks: %s).', self.histogram.format(), self.seeks)
+        self.histogram.reset()
+        self._last_log = now
+
+
+class PartySync:
+    """Playback state of a party member: the media clock driven by the sync messages and the peer reports.
+
+    A peer report is extrapolated from the moment it was sent rather than the moment it was received, so
+    the time it waited in the batches of the server and in the message queue does not delay the reference.
+    The smallest difference between the receive time and the timestamp of the reports of a peer is the offset
+    of its clock plus its fastest delivery time. The delivery time is estimated separately and subtracted,
+    so the offset of the clock is what remains. When the server echoes the own reports back, their delivery
+    time is measured by the local clock alone: the echo takes the way of a peer report, through the batches
+    of the server, assuming the peer has a similar connection. Otherwise a report is taken to travel to the
+    server and from it in half of the fastest probe of the connection monitor each way.
+
+    Attributes:
+        clock: Media clock of the playback.
+        drift_corrector: Keeps the media clock in sync with the party.
+        peer: Identifier of this party member in its position reports.
+        report_interval: Time between the position reports (in seconds).
+        health: Connection monitor whose round-trip times give the delivery time of the reports if the server
+            does not echo them, None if the delivery time is unknown then and taken as 0.
+        delivery_times: Delivery times of the latest own reports echoed by the server (in seconds).
+        peers: The latest report of every peer and the moment it was sent in the local clock
+            in {peer: (message, time)} format (unix time).
+        clock_offsets: The smallest differences between the receive time and the timestamp of the reports
+            in {peer: difference} format (in seconds).
+        peer_timeout: Time after which a peer report is no longer used (in seconds).
+        sent: Number of the position reports made.
+        _since_report: Local time since the last position report (in seconds).
+    """
+
+    def __init__(self, peer: Optional[int] = None, report_interval: float = 1, peer_timeout: float = 3,
+                 dead_zone: float = 0.04, seek_threshold: float = 1, max_rate_offset: float = 0.05):
+        """Initialization.
+
+        Args:
+            peer: Identifier of this party member, a random one if not set.
+            report_interval: Time between the position reports (in seconds).
+            peer_timeout: Time after which a peer report is no longer used (in seconds).
+            dead_zone: Error (in seconds) below which the drift corrector makes no correction.
+            seek_threshold: Error (in seconds) above which the drift corrector makes a hard seek.
+            max_rate_offset: Maximum deviation of the playback rate from 1.
+        """
+        self.clock: PlaybackClock = PlaybackClock()
+        self.drift_corrector: DriftCorrector = DriftCorrector(dead_zone, seek_threshold, max_rate_offset)
+        self.peer: int = peer if peer is not None else random.randint(1, 2 ** 31 - 1)
+        self.report_interval: float = report_interval
+        self.health: Optional[ConnectionHealth] = None
+        self.delivery_times: RingBuffer = RingBuffer(16)
+        self.peers: dict[int, tuple[SyncMessage, float]] = {}
+        self.clock_offsets: dict[int, float] = {}
+        self.peer_timeout: float = peer_timeout
+        self.sent: int = 0
+        self._since_report: float = 0
+
+    def handle_message(self, message: SyncMessage):
+        """Apply a sync message.
+
+        Args:
+            message: Sync message.
+        """
+        if message.type == MessageType.PLAY:
+            self.clock.playing = True
+        elif message.type == MessageType.PAUSE:
+            self.clock.playing = False
+        elif message.type == MessageType.SEEK:
+            self.clock.seek(message.position / 1000)
+            self.peers.clear()
+        elif message.type == MessageType.POSITION and message.peer == self.peer:
+            self.delivery_times.append(max(time.time() - message.timestamp / 1000, 0))
+        elif message.type == MessageType.POSITION:
+            self.peers[message.peer] = (message, self.get_send_time(message))
+
+    def get_delivery_time(self) -> float:
+        """Get the fastest delivery time of a peer report.
+
+        Returns:
+            Delivery time (in seconds), 0 if there are neither echoed reports nor round-trip times yet.
+        """
+        if len(self.delivery_times) > 0:
+            return self.delivery_times.get_min()
+        if self.health is None:
+            return 0
+        # The report goes from the peer to the server and from the server to this member.
+        one_way: float = self.health.rtt.get_min() / 2
+        return one_way * 2
+
+    def get_send_time(self, message: SyncMessage) -> float:
+        """Get the moment the message was sent in the local clock.
+
+        Args:
+            message: Sync message received just now.
+
+        Returns:
+            Send time (unix time). It is the receive time if the message has no timestamp.
+        """
+        received_at: float = time.time()
+        if message.timestamp == 0:
+            return received_at
+
+        offset: float = received_at - message.timestamp / 1000
+        known_offset: Optional[float] = self.clock_offsets.get(message.peer)
+        if known_offset is None or offset < known_offset:
+            self.clock_offsets[message.peer] = known_offset = offset
+        return message.timestamp / 1000 + known_offset - self.get_delivery_time()
+
+    def get_reference_position(self) -> Optional[float]:
+        """Get the playback position of the party from the peer reports.
+
+        Returns:
+            Median of the reported positions extrapolated to the current time (in seconds),
+            or None if there are no reports or the playback is paused.
+        """
+        if not self.peers or not self.clock.playing:
+            return None
+
+        now: float = time.time()
+        for peer in [peer for peer, (_, sent_at) in self.peers.items() if now - sent_at > self.peer_timeout]:
+            del self.peers[peer]
+        if not self.peers:
+            return None
+
+        return median(message.position / 1000 + now - sent_at for message, sent_at in self.peers.values())
+
+    def advance(self, delta_time: float) -> Correction:
+        """Advance the clock by the frame time and correct it towards the party.
+
+        Args:
+            delta_time: Time between frames (in seconds).
+
+        Returns:
+            The action taken by the drift corrector.
+        """
+        self.clock.advance(delta_time)
+        reference: Optional[float] = self.get_reference_position()
+        if reference is None:
+            return Correction.NONE
+        return self.drift_corrector.correct(self.clock, reference)
+
+    def step(self, delta_time: float) -> Optional[SyncMessage]:
+        """Advance the clock and make the position report once per report interval. Called every frame
+        after the sync messages of the frame are handled, the caller sends the report to the party.
+
+        Args:
+            delta_time: Time between frames (in seconds).
+
+        Returns:
+            Position report or None if it is not due or the playback is paused.
+        """
+        self.advance(delta_time)
+        self._since_report += delta_time
+        if not self.clock.playing or self._since_report < self.report_interval:
+            return None
+
+        self._since_report = 0
+        self.sent += 1
+        return SyncMessage(MessageType.POSITION, self.peer, self.sent, int(self.clock.position * 1000),
+                           int(time.time() * 1000))
@@ -0,0 +1,236 @@
+"""A module for reusing transient objects.
+
+Surfaces and sprites that are created and thrown away often are returned to a pool instead and reused,
+which reduces the allocation churn and the work of the garbage collector.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Generic, TypeVar
+
+import pygame as pg
+from pygame import SRCALPHA, Surface
+
+ObjectT = TypeVar('ObjectT')
+
+
+class PoolStats:
+    """Allocation counters of a pool.
+
+    Attributes:
+        allocated: Number of objects created because the pool was empty.
+        reused: Number of objects taken from the pool.
+        released: Number of objects returned to the pool.
+        dropped: Number of returned objects thrown away because the pool was full.
+        evicted: Number of free objects thrown away to make room for newer ones.
+    """
+
+    def __init__(self):
+        self.allocated: int = 0
+        self.reused: int = 0
+        self.released: int = 0
+        self.dropped: int = 0
+        self.evicted: int = 0
+
+    def get_reuse_rate(self) -> float:
+        """Get the share of requests served from the pool.
+
+        Returns:
+            Reuse rate [0; 1].
+        """
+        requests: int = self.allocated + self.reused
+        return self.reused / requests if requests else 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the counters as a dictionary.
+
+        Returns:
+            Counters in {name: value} format.
+        """
+        return {
+            'allocated': self.allocated,
+            'reused': self.reused,
+            'released': self.released,
+            'dropped': self.dropped,
+            'evicted': self.evicted,
+            'reuse_rate': self.get_reuse_rate(),
+        }
+
+
+class SurfacePool:
+    """Pool of surfaces keyed by size and flags.
+
+    Besides the cap per key, the pool has a cap on the number and the memory of all free surfaces. When
+    it is exceeded, the oldest surfaces of the least recently used keys are evicted first, so sizes that
+    are no longer requested do not hold memory for the rest of the session.
+
+    Attributes:
+        max_per_key: Maximum number of free surfaces kept for one key.
+        max_surfaces: Maximum number of free surfaces kept for all keys.
+        max_bytes: Maximum memory of free surfaces kept for all keys (in bytes).
+        stats: Allocation counters.
+        free_surfaces: Number of free surfaces.
+        free_bytes: Memory of free surfaces (in bytes).
+        _free: Free surfaces in {(size, flags): [surface]} format, from the least recently used key.
+    """
+
+    def __init__(self, max_per_key: int = 8, max_surfaces: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """Initialization.
+
+        Args:
+            max_per_key: Maximum number of free surfaces kept for one key.
+            max_surfaces: Maximum number of free surfaces kept for all keys.
+            max_bytes: Maximum memory of free surfaces kept for all keys (in bytes).
+        """
+        self.max_per_key: int = max_per_key
+        self.max_surfaces: int = max_surfaces
+        self.max_bytes: int = max_bytes
+        self.stats: PoolStats = PoolStats()
+        self.free_surfaces: int = 0
+        self.free_bytes: int = 0
+        self._free: OrderedDict[tuple[tuple[int, int], int], list[Surface]] = OrderedDict()
+
+    def acquire(self, size: tuple[int, int], flags: int = SRCALPHA) -> Surface:
+        """Get a cleared surface.
+
+        Args:
+            size: Surface size.
+            flags: Surface flags. SRCALPHA surfaces are converted for fast alpha blitting.
+
+        Returns:
+            Surface.
+        """
+        key: tuple[tuple[int, int], int] = ((int(size[0]), int(size[1])), flags & SRCALPHA)
+        free: list[Surface] = self._free.get(key, [])
+        if free:
+            self.stats.reused += 1
+            surface: Surface = free.pop()
+            if not free:
+                del self._free[key]
+            self._forget(surface)
+            surface.fill((0, 0, 0, 0))
+            return surface
+
+        self.stats.allocated += 1
+        surface = Surface(size, flags, 32)
+        if flags & SRCALPHA and pg.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
+
+    def release(self, surface: Surface):
+        """Return a surface to the pool. It must not be used by the caller afterwards.
+
+        Args:
+            surface: Surface.
+        """
+        self.stats.released += 1
+        size: int = self._get_bytes(surface)
+        if size > self.max_bytes:
+            self.stats.dropped += 1
+            return
+        key: tuple[tuple[int, int], int] = (surface.get_size(), surface.get_flags() & SRCALPHA)
+        free: list[Surface] = self._free.setdefault(key, [])
+        self._free.move_to_end(key)
+        if len(free) >= self.max_per_key:
+            self.stats.dropped += 1
+            return
+        free.append(surface)
+        self.free_surfaces += 1
+        self.free_bytes += size
+        self._evict()
+
+    def clear(self):
+        """Drop all free surfaces.
+        """
+        self._free.clear()
+        self.free_surfaces = 0
+        self.free_bytes = 0
+
+    def _evict(self):
+        """Evict the oldest surfaces of the least recently used keys until the pool fits into its caps.
+        """
+        while self.free_surfaces > self.max_surfaces or self.free_bytes > self.max_bytes:
+            key, free = next(iter(self._free.items()))
+            if not free:
+                del self._free[key]
+                continue
+            self._forget(free.pop(0))
+            self.stats.evicted += 1
+            if not free:
+                del self._free[key]
+
+    def _forget(self, surface: Surface):
+        """Stop counting a surface that left the pool.
+
+        Args:
+            surface: Surface.
+        """
+        self.free_surfaces -= 1
+        self.free_bytes -= self._get_bytes(surface)
+
+    @staticmethod
+    def _get_bytes(surface: Surface) -> int:
+        """Get the pixel memory of a surface.
+
+        Args:
+            surface: Surface.
+
+        Returns:
+            Memory (in bytes).
+        """
+        return surface.get_pitch() * surface.get_height()
+
+
+class SpritePool(Generic[ObjectT]):
+    """Pool of objects of one kind, for example sprites.
+
+    Attributes:
+        factory: The function that creates a new object.
+        reset: The function that prepares a reused object, it is called with the acquire arguments.
+        max_size: Maximum number of free objects.
+        stats: Allocation counters.
+        _free: Free objects.
+    """
+
+    def __init__(self, factory: Callable[..., ObjectT], reset: Callable[..., None], max_size: int = 32):
+        """Initialization.
+
+        Args:
+            factory: The function that creates a new object, it is called with the acquire arguments.
+            reset: The function that prepares a reused object, it is called with the object and
+                the acquire arguments.
+            max_size: Maximum number of free objects.
+        """
+        self.factory: Callable[..., ObjectT] = factory
+        self.reset: Callable[..., None] = reset
+        self.max_size: int = max_size
+        self.stats: PoolStats = PoolStats()
+        self._free: list[ObjectT] = []
+
+    def acquire(self, *args: Any) -> ObjectT:
+        """Get an object.
+
+        Args:
+            *args: Arguments of the object.
+
+        Returns:
+            A reused or a new object.
+        """
+        if self._free:
+            self.stats.reused += 1
+            obj: ObjectT = self._free.pop()
+            self.reset(obj, *args)
+            return obj
+
+        self.stats.allocated += 1
+        return self.factory(*args)
+
+    def release(self, obj: ObjectT):
+        """Return an object to the pool. It must not be used by the caller afterwards.
+
+        Args:
+            obj: Object.
+        """
+        self.stats.released += 1
+        if len(self._free) >= self.max_size:
+            self.stats.dropped += 1
+            return
+        self._free.append(obj)
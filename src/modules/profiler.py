@@ -0,0 +1,286 @@
+"""A module for profiling a running session.
+
+The sampling profiler runs in a background thread and periodically takes the Python stacks of all threads
+with sys._current_frames. The frame loop does not call it: App only sets the current scene and frame phase,
+which are added to the stacks of the main thread. The result is written in the collapsed-stack format
+("frame;frame;frame count" per line) that flame graph tools read.
+
+The allocation tracker compares tracemalloc snapshots taken at scene switches. Python objects that survive
+a visit to a scene, including pygame surfaces, show up as blocks that grow with every visit.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from enum import Enum
+from types import CodeType, FrameType
+from typing import Optional
+
+
+class FramePhase(Enum):
+    """Part of the frame the main thread is in.
+    """
+    IDLE = 'idle'
+    INPUT = 'input'
+    MESSAGES = 'messages'
+    SCENE = 'scene'
+    ANIMATION = 'animation'
+    SPRITES = 'sprites'
+    VIEW = 'view'
+
+
+class SamplingProfiler:
+    """Statistical profiler of the Python stacks of all threads.
+
+    Attributes:
+        interval: Time between samples (in seconds).
+        max_depth: Maximum number of frames of a stack, the frames closest to the root are kept.
+        scene: Name of the current scene, set by App.
+        phase: Current frame phase, set by App.
+        samples: Number of stacks in {(thread, scene, phase, code objects): count} format.
+        sample_count: Number of samples taken.
+        sampler_time: CPU time spent by the sampling thread (in seconds).
+        started: The moment profiling started (in seconds of time.perf_counter).
+        _labels: Cached stack frame labels in {code object: label} format.
+        _thread_names: Cached thread names in {thread identifier: name} format.
+        _stop: Event that stops the sampling thread.
+        _thread: Sampling thread (None if the profiler is not running).
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 64):
+        """Initialization.
+
+        Args:
+            interval: Time between samples (in seconds).
+            max_depth: Maximum number of frames of a stack.
+        """
+        self.interval: float = interval
+        self.max_depth: int = max_depth
+        self.scene: str = ''
+        self.phase: FramePhase = FramePhase.IDLE
+        self.samples: dict[tuple[str, str, str, tuple[CodeType, ...]], int] = {}
+        self.sample_count: int = 0
+        self.sampler_time: float = 0
+        self.started: float = 0
+        self._labels: dict[CodeType, str] = {}
+        self._thread_names: dict[int, str] = {}
+        self._stop: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the profiler is sampling.
+        """
+        return self._thread is not None
+
+    def start(self):
+        """Clear the previous samples and start sampling.
+        """
+        if self._thread is not None:
+            return
+        self.samples.clear()
+        self.sample_count = 0
+        self.sampler_time = 0
+        self.started = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+        logging.info('The sampling profiler is started with a %.1f ms interval.', self.interval * 1000)
+
+    def stop(self):
+        """Stop sampling.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+        duration: float = time.perf_counter() - self.started
+        logging.info('The sampling profiler is stopped: %d samples in %.1f s, the sampler used %.2f%% of the CPU.',
+                     self.sample_count, duration, 100 * self.sampler_time / duration if duration else 0)
+
+    def _run(self):
+        """Take samples until stopped.
+        """
+        own_thread: int = threading.get_ident()
+        main_thread: Optional[int] = threading.main_thread().ident
+        while not self._stop.wait(self.interval):
+            started: float = time.thread_time()
+            self._sample(own_thread, main_thread)
+            self.sampler_time += time.thread_time() - started
+
+    def _sample(self, own_thread: int, main_thread: Optional[int]):
+        """Add the current stacks of all threads except the sampling one.
+
+        Args:
+            own_thread: Identifier of the sampling thread.
+            main_thread: Identifier of the main thread, whose stacks are tagged with the scene and the phase.
+        """
+        # The attributes are set by the main thread, reading them once keeps the tags of a sample consistent.
+        scene: str = self.scene
+        phase: str = self.phase.value
+        for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            if thread_id == own_thread:
+                continue
+            codes: list[CodeType] = []
+            current: Optional[FrameType] = frame
+            while current is not None:
+                codes.append(current.f_code)
+                current = current.f_back
+            codes.reverse()
+
+            name: Optional[str] = self._thread_names.get(thread_id)
+            if name is None:
+                self._thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                name = self._thread_names.get(thread_id, str(thread_id))
+            key: tuple[str, str, str, tuple[CodeType, ...]] = (
+                (name, scene, phase, tuple(codes[:self.max_depth])) if thread_id == main_thread else
+                (name, '', '', tuple(codes[:self.max_depth])))
+            self.samples[key] = self.samples.get(key, 0) + 1
+        self.sample_count += 1
+
+    def _get_label(self, code: CodeType) -> str:
+        """Get the label of a stack frame.
+
+        Args:
+            code: Code object of the frame.
+
+        Returns:
+            Label in "function (file:line)" format without the frame separator of the collapsed format.
+        """
+        label: Optional[str] = self._labels.get(code)
+        if label is None:
+            label = f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+            label = label.replace(';', ':')
+            self._labels[code] = label
+        return label
+
+    def get_collapsed(self) -> list[str]:
+        """Get the samples in the collapsed-stack format.
+
+        Returns:
+            Lines of the "thread;scene:name;phase:name;frame;frame count" format, sorted.
+        """
+        lines: list[str] = []
+        for (thread, scene, phase, codes), count in self.samples.items():
+            frames: list[str] = [thread.replace(';', ':')]
+            if phase:
+                frames.append(f'scene:{scene or "none"}')
+                frames.append(f'phase:{phase}')
+            frames.extend(self._get_label(code) for code in codes)
+            lines.append(f'{";".join(frames)} {count}')
+        lines.sort()
+        return lines
+
+    def write(self, path: str):
+        """Write the samples in the collapsed-stack format.
+
+        Args:
+            path: File path.
+        """
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            for line in self.get_collapsed():
+                file.write(f'{line}\n')
+        logging.info('The profile is written to %s.', path)
+
+
+class AllocationTracker:
+    """Differences of tracemalloc snapshots between scene switches.
+
+    Attributes:
+        path: Report file path, the differences are appended to it.
+        frames: Number of frames stored for each allocation.
+        limit: Number of the largest differences in a report.
+        _snapshot: The snapshot of the previous switch.
+    """
+
+    def __init__(self, path: str, frames: int = 8, limit: int = 25):
+        """Initialization.
+
+        Args:
+            path: Report file path.
+            frames: Number of frames stored for each allocation.
+            limit: Number of the largest differences in a report.
+        """
+        self.path: str = path
+        self.frames: int = frames
+        self.limit: int = limit
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the allocations are traced.
+        """
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        """Start tracing the allocations. They slow the application down while traced.
+        """
+        if tracemalloc.is_tracing():
+            return
+        tracemalloc.start(self.frames)
+        self._snapshot = self._take_snapshot()
+        logging.info('Tracing the allocations, the scene switch reports are written to %s.', self.path)
+
+    def stop(self):
+        """Stop tracing the allocations.
+        """
+        if not tracemalloc.is_tracing():
+            return
+        tracemalloc.stop()
+        self._snapshot = None
+        logging.info('Tracing the allocations is stopped.')
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        """Take a snapshot without the allocations of the import system and of tracemalloc itself.
+
+        Returns:
+            Snapshot.
+        """
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+
+    def on_scene_change(self, previous: str, current: str):
+        """Report the allocations that appeared since the previous switch.
+
+        Args:
+            previous: Name of the scene that was left.
+            current: Name of the scene that was entered.
+        """
+        if not tracemalloc.is_tracing():
+            return
+        snapshot: tracemalloc.Snapshot = self._take_snapshot()
+        if self._snapshot is None:
+            self._snapshot = snapshot
+            return
+
+        differences: list[tracemalloc.StatisticDiff] = snapshot.compare_to(self._snapshot, 'traceback')
+        self._snapshot = snapshot
+        growth: int = sum(difference.size_diff for difference in differences)
+        logging.info('Allocations from %s to %s: %+d bytes.', previous or 'none', current, growth)
+
+        try:
+            directory: str = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(f'# {time.strftime("%Y-%m-%d %H:%M:%S")} {previous or "none"} -> {current}: '
+                           f'{growth:+d} bytes\n')
+                for difference in differences[:self.limit]:
+                    file.write(f'{difference.size_diff:+d} bytes, {difference.count_diff:+d} blocks '
+                               f'({difference.size} bytes in {difference.count} blocks)\n')
+                    for line in difference.traceback.format(most_recent_first=True):
+                        file.write(f'    {line}\n')
+                file.write('\n')
+        except OSError as error:
+            logging.error('Failed to write the allocation report to %s: %s', self.path, error)
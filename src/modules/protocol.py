@@ -0,0 +1,239 @@
+"""A module with the binary format of the playback sync messages.
+
+Frame layout (little-endian):
+    header: version (uint8), messages count (uint8), payload length (uint16)
+    payload: messages, each message is a type (uint8) followed by the varint fields
+             peer, sequence, position (ms) and timestamp (ms).
+
+Several messages are batched into one frame. Decoding writes the fields into preallocated message
+objects, so receiving a frame does not create new message objects.
+
+The server listens on SERVER_PORT, unless its address is given with another port.
+"""
+import struct
+from enum import IntEnum
+from typing import Iterable, Optional
+
+PROTOCOL_VERSION: int = 1
+HEADER: struct.Struct = struct.Struct('<BBH')
+MAX_MESSAGES_IN_FRAME: int = 255
+SERVER_PORT: int = 22020
+
+
+def get_server_url(host: str, path: str) -> str:
+    """Make the URL of a server endpoint.
+
+    Args:
+        host: Server address, optionally with the port after a colon.
+        path: Endpoint path.
+
+    Returns:
+        URL with SERVER_PORT if the address has no port.
+    """
+    if ':' not in host:
+        host = f'{host}:{SERVER_PORT}'
+    return f'http://{host}/{path.lstrip("/")}'
+
+
+class MessageType(IntEnum):
+    """Type of the sync message.
+    """
+    PLAY = 1
+    PAUSE = 2
+    SEEK = 3
+    HEARTBEAT = 4
+    POSITION = 5
+
+
+MESSAGE_TYPES: dict[int, MessageType] = {int(message_type): message_type for message_type in MessageType}
+
+
+class SyncMessage:
+    """The playback sync message.
+
+    Attributes:
+        type: Message type.
+        peer: Sender identifier.
+        sequence: Sequence number of the message from the sender.
+        position: Playback position (in milliseconds).
+        timestamp: Sender clock at the moment of sending (in milliseconds).
+    """
+    __slots__ = ('type', 'peer', 'sequence', 'position', 'timestamp')
+
+    def __init__(self, message_type: MessageType = MessageType.HEARTBEAT, peer: int = 0, sequence: int = 0,
+                 position: int = 0, timestamp: int = 0):
+        """Initialization.
+
+        Args:
+            message_type: Message type.
+            peer: Sender identifier.
+            sequence: Sequence number of the message from the sender.
+            position: Playback position (in milliseconds).
+            timestamp: Sender clock at the moment of sending (in milliseconds).
+        """
+        self.type: MessageType = message_type
+        self.peer: int = peer
+        self.sequence: int = sequence
+        self.position: int = position
+        self.timestamp: int = timestamp
+
+    @property
+    def key(self) -> tuple[int, ...]:
+        """Coalescing key of the message. Only the latest message with the same key has to be handled:
+        the latest play/pause and seek of the party and the latest report of every peer.
+        """
+        if self.type in (MessageType.PLAY, MessageType.PAUSE):
+            return (MessageType.PLAY,)
+        if self.type == MessageType.SEEK:
+            return (MessageType.SEEK,)
+        return self.type, self.peer
+
+    @property
+    def is_control(self) -> bool:
+        """Whether the message changes the playback state of the party (play, pause or seek).
+        """
+        return self.type in (MessageType.PLAY, MessageType.PAUSE, MessageType.SEEK)
+
+    def copy(self) -> 'SyncMessage':
+        """Copy the message. Decoded messages are reused, so they must be copied before being stored.
+
+        Returns:
+            A copy of the message.
+        """
+        return SyncMessage(self.type, self.peer, self.sequence, self.position, self.timestamp)
+
+    def as_dict(self) -> dict[str, int]:
+        """Get the message as a dictionary (JSON representation).
+
+        Returns:
+            Message in {field: value} format.
+        """
+        return {
+            'type': int(self.type),
+            'peer': self.peer,
+            'sequence': self.sequence,
+            'position': self.position,
+            'timestamp': self.timestamp,
+        }
+
+
+def write_varint(buffer: bytearray, value: int):
+    """Write an unsigned integer in the varint format (7 bits per byte).
+
+    Args:
+        buffer: Output buffer.
+        value: Non-negative integer.
+
+    Raises:
+        ValueError: If the value is negative.
+    """
+    if value < 0:
+        raise ValueError(f'Varint value must be non-negative, got {value}.')
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def encode_frame(messages: Iterable[SyncMessage]) -> bytes:
+    """Pack messages into one frame.
+
+    Args:
+        messages: Messages to send (at most MAX_MESSAGES_IN_FRAME).
+
+    Returns:
+        Frame data.
+
+    Raises:
+        ValueError: If there are too many messages or the payload is too large.
+    """
+    buffer: bytearray = bytearray(HEADER.size)
+    count: int = 0
+    for message in messages:
+        buffer.append(message.type)
+        write_varint(buffer, message.peer)
+        write_varint(buffer, message.sequence)
+        write_varint(buffer, message.position)
+        write_varint(buffer, message.timestamp)
+        count += 1
+
+    payload_length: int = len(buffer) - HEADER.size
+    if count > MAX_MESSAGES_IN_FRAME or payload_length > 0xFFFF:
+        raise ValueError(f'The frame is too large: {count} messages, {payload_length} bytes.')
+
+    HEADER.pack_into(buffer, 0, PROTOCOL_VERSION, count, payload_length)
+    return bytes(buffer)
+
+
+class FrameDecoder:
+    """Frame decoder into preallocated messages.
+
+    Attributes:
+        messages: Preallocated messages. After decoding, the first messages contain the frame data.
+        _fields: Varint fields of the message being decoded.
+    """
+
+    def __init__(self, capacity: int = MAX_MESSAGES_IN_FRAME):
+        """Initialization.
+
+        Args:
+            capacity: Maximum number of messages in the frame.
+        """
+        self.messages: list[SyncMessage] = [SyncMessage() for _ in range(capacity)]
+        self._fields: list[int] = [0, 0, 0, 0]
+
+    def decode(self, data: bytes | memoryview) -> int:
+        """Decode the frame. The decoded messages are valid until the next call.
+
+        Args:
+            data: Frame data.
+
+        Returns:
+            Number of decoded messages.
+
+        Raises:
+            ValueError: If the frame is malformed or has an unsupported version.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError('The frame is shorter than the header.')
+
+        version, count, payload_length = HEADER.unpack_from(data, 0)
+        if version != PROTOCOL_VERSION:
+            raise ValueError(f'Unsupported protocol version {version}.')
+        if len(data) != HEADER.size + payload_length:
+            raise ValueError('The frame length does not match the header.')
+        if count > len(self.messages):
+            raise ValueError(f'The frame contains {count} messages, capacity is {len(self.messages)}.')
+
+        # The varint reading is inlined and the fields are collected in a reused list, so decoding creates
+        # no intermediate objects besides the field values.
+        fields: list[int] = self._fields
+        end: int = len(data)
+        offset: int = HEADER.size
+        for i in range(count):
+            message: SyncMessage = self.messages[i]
+            if offset >= end:
+                raise ValueError('Truncated message.')
+            message_type: Optional[MessageType] = MESSAGE_TYPES.get(data[offset])
+            if message_type is None:
+                raise ValueError(f'Unknown message type {data[offset]}.')
+            offset += 1
+            for field in range(4):
+                value: int = 0
+                shift: int = 0
+                while True:
+                    if offset >= end:
+                        raise ValueError('Truncated varint.')
+                    byte: int = data[offset]
+                    offset += 1
+                    value |= (byte & 0x7F) << shift
+                    if byte < 0x80:
+                        break
+                    shift += 7
+                fields[field] = value
+            message.type = message_type
+            message.peer, message.sequence, message.position, message.timestamp = fields
+
+        if offset != end:
+            raise ValueError(f'{end - offset} bytes of trailing data after the last message.')
+        return count
@@ -0,0 +1,423 @@
+"""A module for simulating a party without a display.
+
+The stand-in server implements the endpoints the client uses: the taste check and the sync channel. It starts
+the party when launched, sends every joining client the current position, and relays the position reports of
+the clients in batches, like the server of the party. The reports are relayed to their senders as well, so
+the clients measure their delivery time.
+
+A simulated client connects like the Intro scene and keeps its playback in sync like the Cinema scene: it
+receives the sync frames with SyncChannel into a MessageQueue, probes the server with a ConnectionHealth,
+drains the queue once per frame and steps a PartySync, sending its position reports. The stream is not
+downloaded. Clients run in one asyncio loop, optionally split across processes, and record the error of
+their playback position against the party position of the server.
+"""
+import asyncio
+import logging
+import random
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+import aiohttp
+from aiohttp import web
+
+from src.modules.health import ConnectionHealth
+from src.modules.message_queue import MessageQueue
+from src.modules.metrics import Histogram
+from src.modules.playback_clock import PartySync
+from src.modules.protocol import (MAX_MESSAGES_IN_FRAME, FrameDecoder, MessageType, SyncMessage, encode_frame,
+                                  get_server_url)
+from src.modules.sync_channel import SyncChannel
+
+
+class StandInServer:
+    """Local stand-in for the server of the party.
+
+    Attributes:
+        started: The moment the party started playing (unix time).
+        broadcast_interval: Time between relaying the position reports (in seconds).
+        reports: Position reports received since the last broadcast in {peer: message} format.
+        clients: Connections of the clients.
+        messages_sent: Number of sent messages.
+        decoder: Frame decoder.
+        port: The port the server listens on, 0 until it is listening.
+    """
+
+    def __init__(self, started: float, broadcast_interval: float = 0.1):
+        """Initialization.
+
+        Args:
+            started: The moment the party started playing (unix time).
+            broadcast_interval: Time between relaying the position reports (in seconds).
+        """
+        self.started: float = started
+        self.broadcast_interval: float = broadcast_interval
+        self.reports: dict[int, SyncMessage] = {}
+        self.clients: set[web.WebSocketResponse] = set()
+        self.messages_sent: int = 0
+        self.decoder: FrameDecoder = FrameDecoder()
+        self.port: int = 0
+
+    def get_position(self) -> float:
+        """Get the playback position of the party.
+
+        Returns:
+            Position (in seconds).
+        """
+        return time.time() - self.started
+
+    async def handle_taste(self, _: web.Request) -> web.Response:
+        """Answer the connection check of the Intro scene.
+
+        Returns:
+            JSON response.
+        """
+        return web.json_response({'delicious': True})
+
+    async def handle_sync(self, request: web.Request) -> web.WebSocketResponse:
+        """Serve the sync channel of a client.
+
+        Args:
+            request: Connection request.
+
+        Returns:
+            WebSocket response.
+        """
+        websocket: web.WebSocketResponse = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.clients.add(websocket)
+        await websocket.send_bytes(encode_frame([
+            SyncMessage(MessageType.SEEK, position=int(self.get_position() * 1000)),
+            SyncMessage(MessageType.PLAY),
+        ]))
+        try:
+            async for frame in websocket:
+                if frame.type != aiohttp.WSMsgType.BINARY:
+                    continue
+                try:
+                    count: int = self.decoder.decode(frame.data)
+                except ValueError as error:
+                    logging.warning('Malformed sync frame: %s', error)
+                    continue
+                for i in range(count):
+                    message: SyncMessage = self.decoder.messages[i]
+                    if message.type == MessageType.POSITION:
+                        self.reports[message.peer] = message.copy()
+        finally:
+            self.clients.discard(websocket)
+        return websocket
+
+    async def broadcast(self):
+        """Relay the new position reports to every client.
+        """
+        reports: dict[int, SyncMessage] = self.reports
+        self.reports = {}
+        if not reports:
+            return
+        messages: list[SyncMessage] = list(reports.values())
+        frames: list[tuple[bytes, int]] = [
+            (encode_frame(messages[offset:offset + MAX_MESSAGES_IN_FRAME]),
+             len(messages[offset:offset + MAX_MESSAGES_IN_FRAME]))
+            for offset in range(0, len(messages), MAX_MESSAGES_IN_FRAME)]
+        for websocket in list(self.clients):
+            for frame, count in frames:
+                if websocket.closed:
+                    break
+                try:
+                    await websocket.send_bytes(frame)
+                except ConnectionError:
+                    break
+                self.messages_sent += count
+
+    async def run(self, port: int = 0):
+        """Serve until cancelled.
+
+        Args:
+            port: Server port, 0 to listen on a free port chosen by the system.
+        """
+        application: web.Application = web.Application()
+        application.router.add_get('/taste', self.handle_taste)
+        application.router.add_get('/sync', self.handle_sync)
+        runner: web.AppRunner = web.AppRunner(application, access_log=None)
+        await runner.setup()
+        listener: socket.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind(('127.0.0.1', port))
+        await web.SockSite(runner, listener).start()
+        self.port = listener.getsockname()[1]
+        logging.info('The stand-in server is listening on 127.0.0.1:%d.', self.port)
+        try:
+            while True:
+                await asyncio.sleep(self.broadcast_interval)
+                await self.broadcast()
+        finally:
+            await runner.cleanup()
+
+
+def run_server(started: float, broadcast_interval: float, ready: Any, port: Any):
+    """Run the stand-in server in its own process, so it does not take the CPU time of the clients.
+
+    Args:
+        started: The moment the party started playing (unix time).
+        broadcast_interval: Time between relaying the position reports (in seconds).
+        ready: Event that is set once the server is listening.
+        port: Shared integer value with the server port, 0 to listen on a free port. It is set to
+            the port the server listens on before the event is set, so a restarted server keeps it.
+    """
+    async def serve():
+        server: StandInServer = StandInServer(started, broadcast_interval)
+        task: asyncio.Task = asyncio.create_task(server.run(port.value))
+        while server.port == 0 and not task.done():
+            await asyncio.sleep(0.01)
+        if task.done():
+            await task
+        port.value = server.port
+        ready.set()
+        await task
+
+    asyncio.run(serve())
+
+
+class ClientChannel(SyncChannel):
+    """Sync channel that counts the received frames and the time of decoding them.
+
+    Attributes:
+        frames: Number of received frames.
+        cpu_time: CPU time of decoding the frames (in seconds).
+    """
+
+    def __init__(self, host: str, queue: MessageQueue):
+        super().__init__(host, queue)
+        self.frames: int = 0
+        self.cpu_time: float = 0
+
+    def receive(self, data: bytes):
+        started: float = time.thread_time()
+        super().receive(data)
+        self.cpu_time += time.thread_time() - started
+        self.frames += 1
+
+
+class SimulatedClient:
+    """Party member without a display.
+
+    Attributes:
+        peer: Peer identifier.
+        host: Server address with the port.
+        frame_rate: Number of frames per second.
+        clock_rate: Speed of the local clock relative to real time, to simulate clocks that drift.
+        message_budget: Time limit for handling inbound messages per frame (in seconds).
+        party: Playback state of the client.
+        messages: Inbound sync messages.
+        channel: Sync channel.
+        health: Connection monitor, its round-trip times give the delivery time of the reports.
+        errors: Histogram of the absolute sync errors (in seconds).
+        cpu_time: CPU time of the frames of the client (in seconds).
+        connected: Whether the taste check has passed.
+    """
+
+    def __init__(self, peer: int, host: str, frame_rate: float = 60, clock_rate: float = 1,
+                 report_interval: float = 1, message_budget: float = 0.004, dead_zone: float = 0.04,
+                 seek_threshold: float = 1):
+        """Initialization.
+
+        Args:
+            peer: Peer identifier.
+            host: Server address with the port.
+            frame_rate: Number of frames per second.
+            clock_rate: Speed of the local clock relative to real time.
+            report_interval: Time between position reports (in seconds).
+            message_budget: Time limit for handling inbound messages per frame (in seconds).
+            dead_zone: Error (in seconds) below which the drift corrector makes no correction.
+            seek_threshold: Error (in seconds) above which the drift corrector makes a hard seek.
+        """
+        self.peer: int = peer
+        self.host: str = host
+        self.frame_rate: float = frame_rate
+        self.clock_rate: float = clock_rate
+        self.message_budget: float = message_budget
+        self.party: PartySync = PartySync(peer, report_interval, dead_zone=dead_zone, seek_threshold=seek_threshold)
+        self.party.drift_corrector.log_interval = float('inf')
+        self.messages: MessageQueue = MessageQueue()
+        self.channel: ClientChannel = ClientChannel(host, self.messages)
+        self.health: ConnectionHealth = ConnectionHealth(host, interval=report_interval)
+        self.party.health = self.health
+        self.errors: Histogram = Histogram('sync_error_seconds', 'Absolute sync error of the client.')
+        self.cpu_time: float = 0
+        self.connected: bool = False
+
+    async def can_connect(self) -> bool:
+        """Make the connection check of the Intro scene.
+
+        Returns:
+            Whether the server answered.
+        """
+        async with aiohttp.ClientSession() as session:
+            async with session.get(get_server_url(self.host, 'taste')) as response:
+                return (await response.json())['delicious']
+
+    async def run(self, started: float, duration: float, warmup: float = 2):
+        """Play until the time runs out.
+
+        Args:
+            started: The moment the party started playing (unix time).
+            duration: Running time (in seconds).
+            warmup: Time after joining during which the errors are not recorded (in seconds).
+        """
+        self.connected = await self.can_connect()
+        if not self.connected:
+            return
+
+        channel_task: asyncio.Task = asyncio.create_task(self.channel.run())
+        health_task: asyncio.Task = asyncio.create_task(self.health.run())
+        joined: float = time.perf_counter()
+        last_frame: float = joined
+        try:
+            while time.perf_counter() - joined < duration:
+                await asyncio.sleep(1 / self.frame_rate)
+                now: float = time.perf_counter()
+                work_started: float = time.thread_time()
+
+                self.messages.drain(lambda _, message: self.party.handle_message(message), self.message_budget)
+                report: Optional[SyncMessage] = self.party.step((now - last_frame) * self.clock_rate)
+                last_frame = now
+                if self.party.clock.playing and now - joined >= warmup:
+                    self.errors.record(abs(self.party.clock.position - (time.time() - started)))
+                self.cpu_time += time.thread_time() - work_started
+                if report is not None:
+                    await self.channel.send([report])
+        finally:
+            channel_task.cancel()
+            health_task.cancel()
+            await asyncio.gather(channel_task, health_task, return_exceptions=True)
+
+    def get_stats(self, duration: float) -> dict[str, Any]:
+        """Get the results of the client.
+
+        Args:
+            duration: Running time (in seconds).
+
+        Returns:
+            Results in {name: value} format, times in milliseconds and rates per second.
+        """
+        return {
+            'peer': self.peer,
+            'connected': self.connected,
+            'error_p50_ms': self.errors.get_percentile(50) * 1000,
+            'error_p95_ms': self.errors.get_percentile(95) * 1000,
+            'error_max_ms': (self.errors.maximum if self.errors.count else 0) * 1000,
+            'received_per_second': self.messages.received / duration,
+            'frames_per_second': self.channel.frames / duration,
+            'sent_per_second': self.party.sent / duration,
+            'cpu_ms_per_second': (self.cpu_time + self.channel.cpu_time) / duration * 1000,
+            'seeks': self.party.drift_corrector.seeks,
+            'overflowed': self.messages.overflowed,
+        }
+
+
+async def run_clients(peers: list[int], host: str, started: float, duration: float, frame_rate: float = 60,
+                      clock_error: float = 0.005, report_interval: float = 1, join_time: float = 1,
+                      seed: int = 0, dead_zone: float = 0.04, seek_threshold: float = 1) -> list[dict[str, Any]]:
+    """Run clients in the current asyncio loop.
+
+    Args:
+        peers: Peer identifiers of the clients.
+        host: Server address with the port.
+        started: The moment the party started playing (unix time).
+        duration: Running time of every client (in seconds).
+        frame_rate: Number of frames per second of every client.
+        clock_error: Maximum deviation of the client clock rates from 1.
+        report_interval: Time between position reports (in seconds).
+        join_time: Time over which the joins of the clients are spread (in seconds).
+        seed: Seed of the clock rates and the join delays.
+        dead_zone: Error (in seconds) below which the drift corrector makes no correction.
+        seek_threshold: Error (in seconds) above which the drift corrector makes a hard seek.
+
+    Returns:
+        Results of the clients.
+    """
+    generator: random.Random = random.Random(seed)
+    clients: list[SimulatedClient] = [
+        SimulatedClient(peer, host, frame_rate=frame_rate, clock_rate=1 + generator.uniform(-clock_error, clock_error),
+                        report_interval=report_interval, dead_zone=dead_zone, seek_threshold=seek_threshold)
+        for peer in peers]
+
+    async def join(client: SimulatedClient, delay: float):
+        await asyncio.sleep(delay)
+        try:
+            await client.run(started, duration)
+        except (aiohttp.ClientError, OSError) as error:
+            logging.error('Simulated client %d failed: %s', client.peer, error)
+
+    await asyncio.gather(*(join(client, generator.uniform(0, join_time)) for client in clients))
+    return [client.get_stats(duration) for client in clients]
+
+
+def run_clients_process(peers: list[int], host: str, started: float, duration: float, options: dict[str, Any]) \
+        -> tuple[list[dict[str, Any]], float]:
+    """Run clients in a process of the pool.
+
+    Args:
+        peers: Peer identifiers of the clients.
+        host: Server address with the port.
+        started: The moment the party started playing (unix time).
+        duration: Running time of every client (in seconds).
+        options: Other arguments of run_clients.
+
+    Returns:
+        Results of the clients and the CPU time of the process (in seconds).
+    """
+    cpu_started: float = time.process_time()
+    stats: list[dict[str, Any]] = asyncio.run(run_clients(peers, host, started, duration, **options))
+    return stats, time.process_time() - cpu_started
+
+
+async def simulate_party(clients: int, host: str, started: float, duration: float, processes: int = 1,
+                         **options: Any) -> dict[str, Any]:
+    """Run a party of simulated clients against a running stand-in server.
+
+    Args:
+        clients: Number of clients.
+        host: Server address with the port.
+        started: The moment the party started playing (unix time).
+        duration: Running time of every client (in seconds).
+        processes: Number of processes to split the clients across (1 to run them in the current loop).
+        **options: Other arguments of run_clients.
+
+    Returns:
+        Summary in {name: value} format with the results of every client under "client_stats".
+    """
+    peers: list[int] = list(range(1, clients + 1))
+    stats: list[dict[str, Any]] = []
+    cpu_time: float = 0
+    if processes <= 1:
+        cpu_started: float = time.process_time()
+        stats = await run_clients(peers, host, started, duration, **options)
+        cpu_time = time.process_time() - cpu_started
+    else:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(processes) as executor:
+            results: list[tuple[list[dict[str, Any]], float]] = await asyncio.gather(*(
+                loop.run_in_executor(executor, run_clients_process, peers[i::processes], host, started,
+                                     duration, dict(options, seed=options.get('seed', 0) + i))
+                for i in range(processes)))
+        for process_stats, process_cpu_time in results:
+            stats.extend(process_stats)
+            cpu_time += process_cpu_time
+
+    connected: list[dict[str, Any]] = [client for client in stats if client['connected']]
+    p95: list[float] = sorted(client['error_p95_ms'] for client in connected) or [0]
+    return {
+        'clients': len(stats),
+        'connected': len(connected),
+        'error_p95_median_ms': p95[len(p95) // 2],
+        'error_p95_worst_ms': p95[-1],
+        'error_max_ms': max((client['error_max_ms'] for client in connected), default=0),
+        'received_per_second': sum(client['received_per_second'] for client in connected) / max(1, len(connected)),
+        'cpu_ms_per_second': sum(client['cpu_ms_per_second'] for client in connected) / max(1, len(connected)),
+        'process_cpu_ms_per_second': cpu_time / duration * 1000 / max(1, len(stats)),
+        'seeks': sum(client['seeks'] for client in connected),
+        'overflowed': sum(client['overflowed'] for client in connected),
+        'client_stats': stats,
+    }
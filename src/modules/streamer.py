@@ -0,0 +1,140 @@
+"""A module for downloading the stream segments.
+
+The streamer keeps the buffer of the Cinema playback pipeline filled. The rendition of each segment is
+chosen by the adaptive bitrate controller before the segment download starts.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+import aiohttp
+
+from src.modules.abr import AbrController, Manifest, Rendition
+from src.modules.protocol import get_server_url
+
+
+class Segment:
+    """A downloaded segment of the stream.
+
+    Attributes:
+        index: Segment index.
+        rendition: The rendition of the segment.
+        data: Segment data.
+    """
+
+    def __init__(self, index: int, rendition: Rendition, data: bytes):
+        """Initialization.
+
+        Args:
+            index: Segment index.
+            rendition: The rendition of the segment.
+            data: Segment data.
+        """
+        self.index: int = index
+        self.rendition: Rendition = rendition
+        self.data: bytes = data
+
+
+class Streamer:
+    """Segment downloader driven by the adaptive bitrate controller.
+
+    Attributes:
+        host: Server address.
+        max_buffer: Buffer level (in seconds) at which downloading is paused.
+        manifest: Server manifest (None until loaded).
+        controller: Adaptive bitrate controller (None until the manifest is loaded).
+        segments: Downloaded segments that have not been played yet.
+        buffer_level: Duration of the buffered media (in seconds).
+        stalled: Playback stall flag.
+        _next_segment: Index of the next segment to download.
+    """
+
+    def __init__(self, host: str, max_buffer: float = 40):
+        """Initialization.
+
+        Args:
+            host: Server address.
+            max_buffer: Buffer level (in seconds) at which downloading is paused.
+        """
+        self.host: str = host
+        self.max_buffer: float = max_buffer
+
+        self.manifest: Optional[Manifest] = None
+        self.controller: Optional[AbrController] = None
+
+        self.segments: deque[Segment] = deque()
+        self.buffer_level: float = 0
+        self.stalled: bool = False
+        self._next_segment: int = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether all segments of the stream are downloaded.
+        """
+        return self.manifest is not None and self._next_segment >= self.manifest.segments_count
+
+    async def run(self):
+        """Download the manifest and then the segments until the end of the stream.
+
+        After a connection failure the method can be called again, downloading continues from the next segment.
+
+        Raises:
+            aiohttp.ClientResponseError: The server answered with an error status, so an error page is not stored
+                as a segment.
+            ValueError: The manifest is malformed.
+        """
+        async with aiohttp.ClientSession(raise_for_status=True) as session:
+            if self.manifest is None:
+                async with session.get(get_server_url(self.host, 'manifest')) as response:
+                    self.manifest = Manifest.from_json(await response.json(), self.host)
+                self.controller = AbrController(self.manifest)
+                logging.info('The manifest with %s renditions is loaded.', len(self.manifest.renditions))
+
+            while self._next_segment < self.manifest.segments_count:
+                if self.buffer_level >= self.max_buffer:
+                    await asyncio.sleep(self.manifest.segment_duration / 2)
+                    continue
+                await self._download_segment(session)
+
+    async def _download_segment(self, session: aiohttp.ClientSession):
+        """Download the next segment in the rendition selected by the controller. The decision is recorded
+        by the controller only after the segment is received.
+
+        Args:
+            session: Client session.
+        """
+        rendition: Rendition = self.controller.select(self.buffer_level)
+
+        start: float = time.perf_counter()
+        async with session.get(rendition.get_segment_url(self._next_segment)) as response:
+            data: bytes = await response.read()
+        self.controller.on_segment_downloaded(len(data), time.perf_counter() - start)
+
+        self.segments.append(Segment(self._next_segment, rendition, data))
+        self.buffer_level += self.manifest.segment_duration
+        self._next_segment += 1
+
+    def advance(self, delta_time: float):
+        """Consume the buffer by the played time. Called every frame.
+
+        Args:
+            delta_time: Time between frames (in seconds).
+        """
+        if self.controller is None:
+            return
+
+        if self.buffer_level <= 0:
+            if not self.stalled and 0 < self._next_segment < self.manifest.segments_count:
+                self.stalled = True
+                self.controller.on_rebuffer()
+            if self.stalled:
+                self.controller.add_rebuffer_time(delta_time)
+            return
+
+        self.stalled = False
+        self.buffer_level = max(0.0, self.buffer_level - delta_time)
+        played_segments: int = len(self.segments) - int(-(-self.buffer_level // self.manifest.segment_duration))
+        for _ in range(max(0, played_segments)):
+            self.segments.popleft()
@@ -0,0 +1,263 @@
+"""A module for subtitles.
+
+SRT and WebVTT files are parsed into cues sorted by start time. During linear playback the active cues are
+kept up to date by moving a cursor forward from the previous position: the cues that started are added and
+the ones that ended are dropped. After a seek they are found in a centered interval tree, so a cue shown for
+the whole film does not make the lookup scan all the cues after it. The upcoming cues are found with a binary
+search over the start times.
+"""
+import logging
+import re
+from bisect import bisect_right
+from typing import Optional
+
+TIMESTAMP: re.Pattern = re.compile(r'(?:(\d+):)?(\d{1,2}):(\d{2})[,.](\d{1,3})')
+TAG: re.Pattern = re.compile(r'<[^>]*>')
+
+
+class Cue:
+    """A subtitle cue.
+
+    Attributes:
+        index: Position of the cue in the sorted index.
+        start: Start time (in seconds).
+        end: End time (in seconds).
+        text: Text without markup tags.
+    """
+    __slots__ = ('index', 'start', 'end', 'text')
+
+    def __init__(self, start: float, end: float, text: str):
+        """Initialization.
+
+        Args:
+            start: Start time (in seconds).
+            end: End time (in seconds).
+            text: Text without markup tags.
+        """
+        self.index: int = -1
+        self.start: float = start
+        self.end: float = end
+        self.text: str = text
+
+    def __repr__(self) -> str:
+        return f'Cue({self.start}, {self.end}, {self.text!r})'
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """Parse an SRT or WebVTT timestamp.
+
+    Args:
+        timestamp: Timestamp like 01:02:03,456 or 02:03.456.
+
+    Returns:
+        Time in seconds.
+
+    Raises:
+        ValueError: If the timestamp is malformed.
+    """
+    match: Optional[re.Match] = TIMESTAMP.fullmatch(timestamp.strip())
+    if match is None:
+        raise ValueError(f'Malformed timestamp: {timestamp!r}')
+    hours, minutes, seconds, fraction = match.groups()
+    return int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds) + int(fraction.ljust(3, '0')) / 1000
+
+
+def parse_subtitles(content: str) -> list[Cue]:
+    """Parse SRT or WebVTT subtitles. Blocks without timing (headers, notes, styles) are skipped.
+
+    Args:
+        content: File content.
+
+    Returns:
+        Cues in file order.
+    """
+    cues: list[Cue] = []
+    for block in re.split(r'\n\s*\n', content.replace('\r\n', '\n').replace('\r', '\n')):
+        lines: list[str] = block.strip('\n').split('\n')
+        for i, line in enumerate(lines):
+            if '-->' not in line:
+                continue
+            start, end = line.split('-->', 1)
+            try:
+                cue: Cue = Cue(parse_timestamp(start), parse_timestamp(end.strip().split(' ', 1)[0]),
+                               TAG.sub('', ' '.join(text.strip() for text in lines[i + 1:] if text.strip())))
+            except ValueError as error:
+                logging.warning('Subtitle cue is skipped: %s', error)
+                break
+            if cue.text and cue.end > cue.start:
+                cues.append(cue)
+            break
+    return cues
+
+
+def load_subtitles(path: str) -> 'SubtitleIndex':
+    """Load a subtitle file.
+
+    Args:
+        path: The path to the SRT or WebVTT file.
+
+    Returns:
+        Subtitle index.
+    """
+    with open(path, encoding='utf-8-sig') as file:
+        return SubtitleIndex(parse_subtitles(file.read()))
+
+
+class IntervalNode:
+    """A node of the centered interval tree of the cues.
+
+    Attributes:
+        center: The time the cues of the node are shown at (in seconds).
+        by_start: Cues shown at the center, sorted by start time.
+        by_end: The same cues sorted by end time, from the latest.
+        left: Subtree of the cues that end by the center.
+        right: Subtree of the cues that start after the center.
+    """
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, center: float, cues: list[Cue]):
+        """Initialization.
+
+        Args:
+            center: The time the cues of the node are shown at (in seconds).
+            cues: Cues shown at the center, sorted by start time.
+        """
+        self.center: float = center
+        self.by_start: list[Cue] = cues
+        self.by_end: list[Cue] = sorted(cues, key=lambda cue: cue.end, reverse=True)
+        self.left: Optional[IntervalNode] = None
+        self.right: Optional[IntervalNode] = None
+
+
+def build_interval_tree(cues: list[Cue]) -> Optional[IntervalNode]:
+    """Build a centered interval tree. Its depth is logarithmic, because the center of every node is the
+    start of its median cue and both subtrees get at most half of the cues.
+
+    Args:
+        cues: Cues sorted by start time.
+
+    Returns:
+        Root node or None if there are no cues.
+    """
+    if not cues:
+        return None
+    center: float = cues[len(cues) // 2].start
+    left: list[Cue] = []
+    right: list[Cue] = []
+    middle: list[Cue] = []
+    for cue in cues:
+        if cue.end <= center:
+            left.append(cue)
+        elif cue.start > center:
+            right.append(cue)
+        else:
+            middle.append(cue)
+    node: IntervalNode = IntervalNode(center, middle)
+    node.left = build_interval_tree(left)
+    node.right = build_interval_tree(right)
+    return node
+
+
+class SubtitleIndex:
+    """Cues sorted by start time with a lookup of the active ones.
+
+    Attributes:
+        cues: Cues sorted by start time.
+        starts: Start times of the cues.
+        root: Centered interval tree of the cues, a lookup takes O(log n + k) time for k active cues
+            however long the cues are.
+        max_step: The largest number of cues the cursor moves over in one lookup, the tree is used
+            for longer moves.
+        _position: Position of the previous lookup (in seconds).
+        _next: The first cue that starts after the previous position.
+        _active: Cues shown at the previous position, sorted by start time.
+    """
+
+    def __init__(self, cues: list[Cue], max_step: int = 8):
+        """Initialization.
+
+        Args:
+            cues: Cues in any order.
+            max_step: The largest number of cues the cursor moves over in one lookup.
+        """
+        self.cues: list[Cue] = sorted(cues, key=lambda cue: (cue.start, cue.end))
+        self.starts: list[float] = []
+        for index, cue in enumerate(self.cues):
+            cue.index = index
+            self.starts.append(cue.start)
+        self.root: Optional[IntervalNode] = build_interval_tree(self.cues)
+        self.max_step: int = max_step
+
+        self._position: float = float('inf')
+        self._next: int = 0
+        self._active: list[Cue] = []
+
+    def __len__(self) -> int:
+        return len(self.cues)
+
+    def get_active(self, position: float) -> list[Cue]:
+        """Get the cues shown at the position.
+
+        Args:
+            position: Media position (in seconds).
+
+        Returns:
+            Active cues sorted by start time.
+        """
+        if self._position <= position and (self._next + self.max_step >= len(self.starts)
+                                           or self.starts[self._next + self.max_step] > position):
+            active: list[Cue] = [cue for cue in self._active if cue.end > position]
+            while self._next < len(self.cues) and self.starts[self._next] <= position:
+                cue: Cue = self.cues[self._next]
+                if cue.end > position:
+                    active.append(cue)
+                self._next += 1
+        else:
+            active = self._find_active(position)
+            self._next = bisect_right(self.starts, position)
+        self._position = position
+        self._active = active
+        return list(active)
+
+    def _find_active(self, position: float) -> list[Cue]:
+        """Find the cues shown at the position in the interval tree.
+
+        Args:
+            position: Media position (in seconds).
+
+        Returns:
+            Active cues sorted by start time.
+        """
+        active: list[Cue] = []
+        node: Optional[IntervalNode] = self.root
+        while node is not None:
+            if position < node.center:
+                # Every cue of the node ends after the center, so it is active if it has started.
+                for cue in node.by_start:
+                    if cue.start > position:
+                        break
+                    active.append(cue)
+                node = node.left
+            else:
+                # Every cue of the node has started by the center, so it is active if it has not ended.
+                for cue in node.by_end:
+                    if cue.end <= position:
+                        break
+                    active.append(cue)
+                node = node.right
+        if len(active) > 1:
+            active.sort(key=lambda cue: cue.index)
+        return active
+
+    def get_upcoming(self, position: float, horizon: float) -> list[Cue]:
+        """Get the cues that start soon.
+
+        Args:
+            position: Media position (in seconds).
+            horizon: How far ahead to look (in seconds).
+
+        Returns:
+            Cues that start after the position within the horizon.
+        """
+        high: int = bisect_right(self.starts, position)
+        return self.cues[high:bisect_right(self.starts, position + horizon, high)]
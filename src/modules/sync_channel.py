@@ -0,0 +1,78 @@
+"""A module for the playback sync channel.
+
+The channel is a WebSocket connection to the server that carries binary sync frames.
+Received messages are put into the message queue of the scene instead of being applied immediately.
+"""
+import logging
+from typing import Iterable, Optional
+
+import aiohttp
+
+from src.modules.message_queue import MessageQueue
+from src.modules.protocol import FrameDecoder, SyncMessage, encode_frame, get_server_url
+
+
+class SyncChannel:
+    """WebSocket connection for the playback sync messages.
+
+    Attributes:
+        host: Server address.
+        queue: The queue into which received messages are put.
+        decoder: Frame decoder.
+        _websocket: Current connection (None if not connected).
+    """
+
+    def __init__(self, host: str, queue: MessageQueue):
+        """Initialization.
+
+        Args:
+            host: Server address.
+            queue: The queue into which received messages are put.
+        """
+        self.host: str = host
+        self.queue: MessageQueue = queue
+        self.decoder: FrameDecoder = FrameDecoder()
+        self._websocket: Optional[aiohttp.ClientWebSocketResponse] = None
+
+    async def run(self):
+        """Receive frames until the connection is closed.
+        """
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(get_server_url(self.host, 'sync')) as websocket:
+                self._websocket = websocket
+                logging.info('The sync channel is connected to %s.', self.host)
+                try:
+                    async for frame in websocket:
+                        if frame.type == aiohttp.WSMsgType.BINARY:
+                            self.receive(frame.data)
+                        elif frame.type == aiohttp.WSMsgType.ERROR:
+                            break
+                finally:
+                    self._websocket = None
+        logging.info('The sync channel is closed.')
+
+    def receive(self, data: bytes):
+        """Decode the frame and put its messages into the queue.
+
+        Args:
+            data: Frame data.
+        """
+        try:
+            count: int = self.decoder.decode(data)
+        except ValueError as error:
+            logging.warning('Malformed sync frame: %s', error)
+            return
+
+        for i in range(count):
+            message: SyncMessage = self.decoder.messages[i]
+            self.queue.put(message.key, message.copy(), message.is_control)
+
+    async def send(self, messages: Iterable[SyncMessage]):
+        """Send messages in one frame.
+
+        Args:
+            messages: Messages to send.
+        """
+        if self._websocket is None or self._websocket.closed:
+            return
+        await self._websocket.send_bytes(encode_frame(messages))
@@ -0,0 +1,311 @@
+"""A module for seek bar thumbnails.
+
+A background job walks the stream at fixed intervals, downloads the segments of the lowest rendition,
+downscales one frame per interval and packs it into a sprite sheet. The sheet and the timestamp index are
+saved to disk, so thumbnails are generated once per stream. Hover previews are looked up by binary search.
+
+The job is low-priority: it pauses while the playback needs the network or the CPU, and limits its own
+CPU time to a configurable share. It downloads and decodes the segments itself, so it does not need the media
+worker, but it expects the same format: raw RGB24 frames of a known size. A segment that fails to download
+is retried with a backoff a few times and then skipped, its thumbnails are generated next time. Reading and
+writing the saved sheet run in a thread.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from bisect import bisect_right
+from typing import Callable, Optional
+
+import aiohttp
+import pygame as pg
+
+from src.modules.abr import Manifest, Rendition
+from src.modules.health import Backoff
+
+
+class ThumbnailSheet:
+    """Thumbnails packed into one surface, with their timestamps.
+
+    Attributes:
+        thumbnail_size: Size of one thumbnail.
+        columns: Number of thumbnails in a row of the sheet.
+        surface: Sprite sheet.
+        timestamps: Media positions of the thumbnails (in seconds), sorted.
+        _cells: Sheet cells of the thumbnails, in the order of the timestamps.
+    """
+
+    def __init__(self, thumbnail_size: tuple[int, int], capacity: int, columns: int = 16):
+        """Initialization.
+
+        Args:
+            thumbnail_size: Size of one thumbnail.
+            capacity: Maximum number of thumbnails.
+            columns: Number of thumbnails in a row of the sheet.
+        """
+        self.thumbnail_size: tuple[int, int] = thumbnail_size
+        self.columns: int = columns
+        rows: int = max(1, -(-capacity // columns))
+        self.surface: pg.Surface = pg.Surface((columns * thumbnail_size[0], rows * thumbnail_size[1]))
+        self.timestamps: list[float] = []
+        self._cells: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __contains__(self, timestamp: float) -> bool:
+        index: int = bisect_right(self.timestamps, timestamp) - 1
+        return index >= 0 and self.timestamps[index] == timestamp
+
+    def _get_rect(self, cell: int) -> pg.Rect:
+        """Get the area of a sheet cell.
+
+        Args:
+            cell: Cell index.
+
+        Returns:
+            Area of the cell.
+        """
+        return pg.Rect((cell % self.columns) * self.thumbnail_size[0], (cell // self.columns) * self.thumbnail_size[1],
+                       *self.thumbnail_size)
+
+    def add(self, timestamp: float, frame: pg.Surface):
+        """Downscale a frame into the next free cell.
+
+        Args:
+            timestamp: Media position of the frame (in seconds).
+            frame: Frame.
+        """
+        cell: int = len(self._cells)
+        self.surface.blit(pg.transform.smoothscale(frame, self.thumbnail_size), self._get_rect(cell))
+        index: int = bisect_right(self.timestamps, timestamp)
+        self.timestamps.insert(index, timestamp)
+        self._cells.insert(index, cell)
+
+    def get(self, position: float) -> Optional[pg.Surface]:
+        """Get the thumbnail for a media position.
+
+        Args:
+            position: Media position (in seconds).
+
+        Returns:
+            The thumbnail of the closest earlier timestamp (a subsurface of the sheet), or None if there is none.
+        """
+        index: int = bisect_right(self.timestamps, position) - 1
+        if index < 0:
+            return None
+        return self.surface.subsurface(self._get_rect(self._cells[index]))
+
+    def save(self, path: str):
+        """Save the sheet as an image and the index as JSON next to it.
+
+        Args:
+            path: Path of the sheet image without the extension.
+        """
+        pg.image.save(self.surface, f'{path}.png')
+        with open(f'{path}.json', 'w', encoding='utf-8') as file:
+            json.dump({'thumbnail_size': self.thumbnail_size, 'columns': self.columns,
+                       'timestamps': self.timestamps, 'cells': self._cells}, file)
+
+    def load(self, path: str) -> bool:
+        """Load a saved sheet with the same layout.
+
+        Args:
+            path: Path of the sheet image without the extension.
+
+        Returns:
+            Whether the sheet was loaded.
+        """
+        try:
+            with open(f'{path}.json', encoding='utf-8') as file:
+                index: dict = json.load(file)
+            surface: pg.Surface = pg.image.load(f'{path}.png')
+        except (OSError, ValueError, pg.error):
+            return False
+        if (tuple(index['thumbnail_size']) != self.thumbnail_size or index['columns'] != self.columns or
+                surface.get_size() != self.surface.get_size()):
+            return False
+
+        self.surface.blit(surface, (0, 0))
+        self.timestamps = [float(timestamp) for timestamp in index['timestamps']]
+        self._cells = [int(cell) for cell in index['cells']]
+        return True
+
+
+class ThumbnailJob:
+    """Background generation of the thumbnails of a stream.
+
+    Segments are expected to be raw RGB24 frames of frame_size, like the media worker decodes them.
+
+    Attributes:
+        manifest: Stream manifest.
+        sheet: Thumbnails.
+        interval: Media time between thumbnails (in seconds).
+        frame_size: Size of the decoded frames.
+        frame_rate: Number of frames per second of media time.
+        cpu_budget: Maximum share of the CPU time used by the job (0; 1].
+        should_yield: The function that tells the job to wait, for example while the playback buffer is low.
+        max_attempts: Number of attempts to download a segment before its thumbnails are skipped.
+        backoff: Delays between the download attempts.
+        path: Path of the saved sheet without the extension.
+    """
+
+    def __init__(self, manifest: Manifest, frame_size: tuple[int, int], frame_rate: float, interval: float = 10,
+                 thumbnail_size: tuple[int, int] = (160, 90), cpu_budget: float = 0.1,
+                 should_yield: Optional[Callable[[], bool]] = None, max_attempts: int = 3,
+                 cache_directory: str = os.path.join('cache', 'thumbnails')):
+        """Initialization.
+
+        Args:
+            manifest: Stream manifest.
+            frame_size: Size of the decoded frames.
+            frame_rate: Number of frames per second of media time.
+            interval: Media time between thumbnails (in seconds).
+            thumbnail_size: Size of one thumbnail.
+            cpu_budget: Maximum share of the CPU time used by the job (0; 1].
+            should_yield: The function that tells the job to wait.
+            max_attempts: Number of attempts to download a segment before its thumbnails are skipped.
+            cache_directory: Directory of the saved sheets.
+
+        Raises:
+            ValueError: If the CPU budget is not in (0; 1].
+        """
+        if not 0 < cpu_budget <= 1:
+            raise ValueError(f'The CPU budget of the thumbnail job must be in (0; 1], got {cpu_budget}.')
+        self.manifest: Manifest = manifest
+        self.interval: float = interval
+        self.frame_size: tuple[int, int] = frame_size
+        self.frame_rate: float = frame_rate
+        self.cpu_budget: float = cpu_budget
+        self.should_yield: Callable[[], bool] = should_yield if should_yield is not None else lambda: False
+        self.max_attempts: int = max_attempts
+        self.backoff: Backoff = Backoff()
+
+        duration: float = manifest.segments_count * manifest.segment_duration
+        self.sheet: ThumbnailSheet = ThumbnailSheet(thumbnail_size, int(duration // interval) + 1)
+
+        rendition: Rendition = self._get_rendition()
+        key: str = hashlib.sha1(f'{rendition.url}|{duration}|{interval}|{frame_size}'.encode()).hexdigest()[:16]
+        self.path: str = os.path.join(cache_directory, key)
+
+    def _save(self):
+        """Save the sheet to the cache directory.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.sheet.save(self.path)
+
+    def _get_rendition(self) -> Rendition:
+        """Get the cheapest rendition.
+
+        Returns:
+            Rendition with the lowest bitrate.
+        """
+        return min(self.manifest.renditions, key=lambda rendition: rendition.bitrate)
+
+    def get_timestamps(self) -> list[float]:
+        """Get the media positions of all thumbnails.
+
+        Returns:
+            Positions (in seconds).
+        """
+        duration: float = self.manifest.segments_count * self.manifest.segment_duration
+        return [i * self.interval for i in range(int(duration // self.interval) + 1)
+                if i * self.interval < duration]
+
+    async def _download_segment(self, session: aiohttp.ClientSession, rendition: Rendition,
+                                index: int) -> Optional[bytes]:
+        """Download a segment, retrying with a backoff after errors.
+
+        Args:
+            session: Client session.
+            rendition: The rendition of the segment.
+            index: Segment index.
+
+        Returns:
+            Segment data or None if every attempt failed.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with session.get(rendition.get_segment_url(index)) as response:
+                    response.raise_for_status()
+                    data: bytes = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                if attempt == self.max_attempts:
+                    logging.warning('Skipping the thumbnails of segment %d after %d failed downloads: %s', index,
+                                    attempt, error)
+                    return None
+                delay: float = self.backoff.get_delay()
+                logging.warning('Failed to download segment %d for the thumbnails, retrying in %.1f s: %s', index,
+                                delay, error)
+                await asyncio.sleep(delay)
+                continue
+            self.backoff.reset()
+            return data
+        return None
+
+    def _get_frame(self, data: bytes, offset: float) -> Optional[pg.Surface]:
+        """Get a frame from raw segment data.
+
+        Args:
+            data: Segment data.
+            offset: Position of the frame inside the segment (in seconds).
+
+        Returns:
+            Frame or None if the segment is too short.
+        """
+        frame_bytes: int = self.frame_size[0] * self.frame_size[1] * 3
+        start: int = int(offset * self.frame_rate) * frame_bytes
+        if start + frame_bytes > len(data):
+            return None
+        return pg.image.frombuffer(data[start:start + frame_bytes], self.frame_size, 'RGB')
+
+    async def _pace(self, busy: float):
+        """Sleep long enough to keep the CPU share of the job within the budget, and while told to yield.
+
+        The job runs on the event loop, so the duration of a step without awaits is the CPU time taken from
+        the frame loop.
+
+        Args:
+            busy: Duration of the last step (in seconds).
+        """
+        await asyncio.sleep(busy * (1 - self.cpu_budget) / self.cpu_budget)
+        while self.should_yield():
+            await asyncio.sleep(0.5)
+
+    async def run(self):
+        """Generate the missing thumbnails and save the sheet. Can be cancelled at any moment.
+        """
+        if await asyncio.to_thread(self.sheet.load, self.path):
+            logging.info('Loaded %d thumbnails from %s.', len(self.sheet), self.path)
+
+        missing: list[float] = [timestamp for timestamp in self.get_timestamps() if timestamp not in self.sheet]
+        if not missing:
+            return
+
+        rendition: Rendition = self._get_rendition()
+        segment_index: int = -1
+        data: bytes = b''
+        added: int = 0
+        try:
+            async with aiohttp.ClientSession() as session:
+                for timestamp in missing:
+                    await self._pace(0)
+                    index: int = int(timestamp // self.manifest.segment_duration)
+                    if index != segment_index:
+                        # The thumbnails of a skipped segment are not found in its empty data.
+                        data = await self._download_segment(session, rendition, index) or b''
+                        segment_index = index
+
+                    started: float = time.perf_counter()
+                    frame: Optional[pg.Surface] = self._get_frame(
+                        data, timestamp - index * self.manifest.segment_duration)
+                    if frame is not None:
+                        self.sheet.add(timestamp, frame)
+                        added += 1
+                    await self._pace(time.perf_counter() - started)
+        finally:
+            if added:
+                await asyncio.to_thread(self._save)
+                logging.info('Saved %d thumbnails to %s.', len(self.sheet), self.path)
@@ -0,0 +1,183 @@
+"""A module with array-backed storage of sprite transforms.
+
+Positions, sizes and visibility flags of many lightweight objects are kept in contiguous NumPy arrays
+indexed by slot, so moving, culling and hit-testing them is vectorized instead of looping over objects.
+
+NumPy is an optional dependency: it is only needed when a TransformStore is created.
+"""
+from typing import Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TransformStore:
+    """Contiguous storage of positions, sizes and visibility flags.
+
+    Attributes:
+        positions: Array of shape (capacity, 2) with the top-left corners.
+        sizes: Array of shape (capacity, 2) with the sizes.
+        visible: Visibility flags.
+        alive: Flags of the occupied slots.
+        _free: Released slots available for reuse.
+        _next: The first slot that has never been used.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialization.
+
+        Args:
+            capacity: Initial number of slots. The storage grows when it runs out of slots.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        if np is None:
+            raise ImportError('TransformStore requires NumPy, install it with "pip install numpy".')
+
+        self.positions: np.ndarray = np.zeros((capacity, 2), dtype=np.float32)
+        self.sizes: np.ndarray = np.zeros((capacity, 2), dtype=np.float32)
+        self.visible: np.ndarray = np.zeros(capacity, dtype=bool)
+        self.alive: np.ndarray = np.zeros(capacity, dtype=bool)
+        self._free: list[int] = []
+        self._next: int = 0
+
+    def __len__(self) -> int:
+        return self._next - len(self._free)
+
+    def allocate(self, position: tuple[float, float], size: tuple[float, float], visible: bool = True) -> int:
+        """Occupy a slot.
+
+        Args:
+            position: Top-left corner.
+            size: Size.
+            visible: Visibility flag.
+
+        Returns:
+            Slot index.
+        """
+        if self._free:
+            slot: int = self._free.pop()
+        else:
+            if self._next == len(self.alive):
+                self._grow()
+            slot = self._next
+            self._next += 1
+
+        self.positions[slot] = position
+        self.sizes[slot] = size
+        self.visible[slot] = visible
+        self.alive[slot] = True
+        return slot
+
+    def release(self, slot: int):
+        """Free a slot for reuse.
+
+        Args:
+            slot: Slot index.
+        """
+        if not self.alive[slot]:
+            return
+        self.alive[slot] = False
+        self.visible[slot] = False
+        self._free.append(slot)
+
+    def _grow(self):
+        """Double the capacity of the arrays.
+        """
+        extra: int = max(1, len(self.alive))
+        self.positions = np.concatenate([self.positions, np.zeros((extra, 2), dtype=np.float32)])
+        self.sizes = np.concatenate([self.sizes, np.zeros((extra, 2), dtype=np.float32)])
+        self.visible = np.concatenate([self.visible, np.zeros(extra, dtype=bool)])
+        self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+
+    def move(self, offset: tuple[float, float], slots: Optional[Sequence[int]] = None):
+        """Move objects.
+
+        Args:
+            offset: Offset.
+            slots: Slots to move. All occupied slots are moved if None.
+        """
+        if slots is None:
+            self.positions[:self._next][self.alive[:self._next]] += offset
+        else:
+            self.positions[np.asarray(slots)] += offset
+
+    def cull(self, viewport: tuple[float, float, float, float]) -> 'np.ndarray':
+        """Find the visible objects that intersect the viewport.
+
+        Args:
+            viewport: Viewport rect (x, y, width, height).
+
+        Returns:
+            Array of slot indexes.
+        """
+        positions: np.ndarray = self.positions[:self._next]
+        sizes: np.ndarray = self.sizes[:self._next]
+        mask: np.ndarray = (self.alive[:self._next] & self.visible[:self._next] &
+                            (sizes[:, 0] > 0) & (sizes[:, 1] > 0) &
+                            (positions[:, 0] < viewport[0] + viewport[2]) &
+                            (positions[:, 0] + sizes[:, 0] > viewport[0]) &
+                            (positions[:, 1] < viewport[1] + viewport[3]) &
+                            (positions[:, 1] + sizes[:, 1] > viewport[1]))
+        return np.flatnonzero(mask)
+
+    def hit_test(self, point: tuple[float, float]) -> 'np.ndarray':
+        """Find the visible objects that contain the point.
+
+        Args:
+            point: Point (x, y).
+
+        Returns:
+            Array of slot indexes.
+        """
+        return self.cull((point[0], point[1], 1, 1))
+
+
+class Transform:
+    """Handle of one slot in the transform store.
+
+    Attributes:
+        store: Transform store.
+        slot: Slot index.
+    """
+    __slots__ = ('store', 'slot')
+
+    def __init__(self, store: TransformStore, position: tuple[float, float], size: tuple[float, float]):
+        """Initialization.
+
+        Args:
+            store: Transform store.
+            position: Top-left corner.
+            size: Size.
+        """
+        self.store: TransformStore = store
+        self.slot: int = store.allocate(position, size)
+
+    @property
+    def position(self) -> tuple[float, float]:
+        """Top-left corner.
+        """
+        x, y = self.store.positions[self.slot]
+        return float(x), float(y)
+
+    @position.setter
+    def position(self, position: tuple[float, float]):
+        self.store.positions[self.slot] = position
+
+    @property
+    def visible(self) -> bool:
+        """Visibility flag.
+        """
+        return bool(self.store.visible[self.slot])
+
+    @visible.setter
+    def visible(self, visible: bool):
+        self.store.visible[self.slot] = visible
+
+    def release(self):
+        """Free the slot. The handle must not be used afterwards.
+        """
+        self.store.release(self.slot)
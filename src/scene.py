@@ -1,9 +1,11 @@
 """The application's stage module.
 """
 import logging
-from typing import TYPE_CHECKING, TypeVar, Optional
+from typing import TYPE_CHECKING, TypeVar, Optional, Any, Hashable
 from abc import ABC, abstractmethod
 
+from src.modules.message_queue import MessageQueue
+
 if TYPE_CHECKING:
     from src.app import App
     from src.sprite import Sprite
@@ -17,6 +19,8 @@ class Scene(ABC):
     Attributes:
         app (App): The main class of the application.
         sprites (dict[str, Sprite]): A dictionary with the sprite id as its key and the sprite itself as its value.
+        messages (MessageQueue): Inbound messages from network tasks, handled once per frame.
+        _draw_order (list[Sprite] | None): Sprites sorted by layer (None if the order has to be rebuilt).
     """
 
     def __init__(self, app: 'App'):
@@ -27,6 +31,8 @@ class Scene(ABC):
         """
         self.app: 'App' = app
         self.sprites: dict[str, 'Sprite'] = {}
+        self.messages: MessageQueue = MessageQueue()
+        self._draw_order: Optional[list['Sprite']] = None
 
     def get_sprite(self, uuid: str) -> Optional[SpriteT]:
         """Returns a sprite by its unique identifier.
@@ -59,22 +65,45 @@ class Scene(ABC):
         """
         if uuid in self.sprites:
             del self.sprites[uuid]
+            self._draw_order = None
         else:
             logging.warning('Attempt to delete a non-existent sprite "%s".', uuid)
 
-    def add_sprite(self, uuid: str, obj: SpriteT) -> SpriteT:
+    def add_sprite(self, uuid: str, obj: SpriteT, layer: int = 0) -> SpriteT:
         """Adds a new sprite to the scene.
 
         Args:
             uuid: The unique identifier of the sprite.
             obj: Object to add.
+            layer: Drawing layer. Sprites with a higher layer are drawn on top,
+                sprites of the same layer are drawn in the order of addition.
 
         Returns:
             Added sprite (same as in the obj parameter).
         """
+        obj.layer = layer
         self.sprites[uuid] = obj
+        self._draw_order = None
         return obj
 
+    def get_draw_order(self) -> list['Sprite']:
+        """Returns the sprites in the drawing order.
+
+        Returns:
+            List of sprites sorted by layer.
+        """
+        if self._draw_order is None:
+            self._draw_order = sorted(self.sprites.values(), key=lambda sprite: sprite.layer)
+        return self._draw_order
+
+    def handle_message(self, key: Hashable, message: Any):
+        """Handles an inbound message. Called once per frame for every pending message key.
+
+        Args:
+            key: Message key.
+            message: The latest message with this key.
+        """
+
     @abstractmethod
     async def boot(self):
         """It starts when the scene is registered.
@@ -1,30 +1,324 @@
 """A scene module with a cinema.
 """
-from typing import TYPE_CHECKING, Optional
+import asyncio
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Optional, Any, Hashable
 from asyncio import Task
 
+from pygame import Vector2, Surface
+
 from src.scene import Scene
+from src.modules import (Streamer, SyncChannel, SyncMessage, MessageType, ConnectionHealth, HealthState,
+                         RestartPolicy, is_network_error, PartySync, SubtitleIndex, load_subtitles, MediaWorker,
+                         ThumbnailJob)
+from src.sprites import Waiting, CompletionStatus, Subtitles, Video, SeekBar
 
 if TYPE_CHECKING:
     from src.app import App
 
 
+HEALTH_STATUSES: dict[HealthState, CompletionStatus] = {
+    HealthState.CONNECTING: CompletionStatus.HOLD,
+    HealthState.CONNECTED: CompletionStatus.SUCCESS,
+    HealthState.DEGRADED: CompletionStatus.ATTENTION,
+    HealthState.STALLED: CompletionStatus.ERROR,
+    HealthState.RECONNECTING: CompletionStatus.WORKING,
+}
+
+
 class Cinema(Scene):
     """A class with a cinema.
+
+    Attributes:
+        host: Server address.
+        health: Connection monitor.
+        health_task: The task of the connection monitor.
+        connection_task: The task of downloading the stream.
+        streamer: Segment downloader of the playback pipeline.
+        stream_restarts: Restarts of the stream downloading after failures that are not network errors,
+            such as an error status or a malformed manifest.
+        sync_task: The task of receiving the sync messages.
+        sync_channel: The sync channel with the party.
+        sync_restarts: Restarts of the sync channel after failures that are not network errors.
+        party: Media clock of the playback kept in sync with the party. Its position reports are sent
+            through the sync channel.
+        media_worker: Decoder of the downloaded segments. It runs in a thread or a process selected by
+            the WATCHSYNC_MEDIA_WORKER environment variable ("thread" for an unknown mode), and is not used
+            if the variable is not set.
+            The video is shown only while it is used.
+        frame_size: Size of the decoded frames.
+        frame_rate: Number of frames per second of media time.
+        thumbnail_task: The task of generating the seek bar thumbnails. The job decodes the segments itself,
+            so the thumbnails are generated with or without the media worker. Its CPU share is set by the
+            WATCHSYNC_THUMBNAIL_CPU_BUDGET environment variable.
+        subtitles_task: The task of loading the subtitles passed by the Intro scene.
+        _frame_time: Media time since the last shown frame (in seconds).
+        _submitted_segment: Index of the last segment sent to the decoder.
     """
 
     def __init__(self, app: 'App'):
         super().__init__(app)
+        self.host: Optional[str] = None
+        self.health: Optional[ConnectionHealth] = None
+        self.health_task: Optional[Task] = None
+
         self.connection_task: Optional[Task] = None
+        self.streamer: Optional[Streamer] = None
+        self.stream_restarts: RestartPolicy = RestartPolicy()
+
+        self.sync_task: Optional[Task] = None
+        self.sync_channel: Optional[SyncChannel] = None
+        self.sync_restarts: RestartPolicy = RestartPolicy()
+        self.party: PartySync = PartySync()
+
+        self.media_worker: Optional[MediaWorker] = None
+        self.frame_size: tuple[int, int] = (640, 360)
+        self.frame_rate: float = 25
+        self.thumbnail_task: Optional[Task] = None
+        self.subtitles_task: Optional[Task] = None
+        self._frame_time: float = 0
+        self._submitted_segment: int = -1
 
     async def boot(self):
-        pass
+        self.add_sprite('connection_status', Waiting(self.app, Vector2(1760, 10), (150, 30),
+                                                     CompletionStatus.HOLD))
+        self.add_sprite('subtitles', Subtitles(self.app, Vector2(160, 740), (1600, 220)), layer=1)
+        self.add_sprite('seek_bar', SeekBar(self.app, Vector2(160, 960), 1600, callback=self.seek), layer=2)
 
     async def update(self):
-        pass
+        rate: float = self.party.clock.rate
+        report: Optional[SyncMessage] = self.party.step(self.app.delta_time)
+        if report is not None and self.sync_channel is not None:
+            await self.sync_channel.send([report])
+        if self.streamer is not None and self.party.clock.playing:
+            self.streamer.advance(self.app.delta_time * rate)
+
+        subtitles: Subtitles = self.get_sprite('subtitles')
+        subtitles.position_time = self.party.clock.position
+
+        seek_bar: SeekBar = self.get_sprite('seek_bar')
+        seek_bar.position_time = self.party.clock.position
+
+        if self.media_worker is not None:
+            self.update_media()
+        self.update_thumbnails()
+
+        await self.update_connection_task()
+        self.update_health()
+
+    def update_media(self):
+        """Send the downloaded segments to the decoder and show the frames at the media clock rate.
+        """
+        self.media_worker.check()
+
+        if self.streamer is not None:
+            for segment in self.streamer.segments:
+                if segment.index > self._submitted_segment:
+                    self.media_worker.submit(segment.data)
+                    self._submitted_segment = segment.index
+
+        if not self.party.clock.playing:
+            return
+        self._frame_time += self.app.delta_time * self.party.clock.rate
+        frame: Optional[Surface] = None
+        while self._frame_time >= 1 / self.frame_rate:
+            if frame is not None:
+                self.media_worker.release_frame()
+            frame = self.media_worker.next_frame()
+            if frame is None:
+                self._frame_time = 0
+                break
+            self._frame_time -= 1 / self.frame_rate
+        if frame is not None:
+            video: Video = self.get_sprite('video')
+            video.set_frame(frame)
+            self.media_worker.release_frame()
+
+    def update_thumbnails(self):
+        """Start generating the seek bar thumbnails once the manifest is loaded.
+        """
+        if self.thumbnail_task is not None or self.streamer is None or self.streamer.manifest is None:
+            return
+
+        streamer: Streamer = self.streamer
+
+        def should_yield() -> bool:
+            return streamer.stalled or streamer.buffer_level < streamer.controller.reservoir
+
+        try:
+            job: ThumbnailJob = ThumbnailJob(
+                streamer.manifest, self.frame_size, self.frame_rate,
+                cpu_budget=float(os.environ.get('WATCHSYNC_THUMBNAIL_CPU_BUDGET', 0.1)), should_yield=should_yield)
+        except ValueError as error:
+            logging.warning('WATCHSYNC_THUMBNAIL_CPU_BUDGET is ignored: %s', error)
+            job = ThumbnailJob(streamer.manifest, self.frame_size, self.frame_rate, should_yield=should_yield)
+        self.thumbnail_task = asyncio.create_task(job.run())
+
+        seek_bar: SeekBar = self.get_sprite('seek_bar')
+        seek_bar.duration = streamer.manifest.segments_count * streamer.manifest.segment_duration
+        seek_bar.thumbnails = job.sheet
+
+    async def seek(self, position: float):
+        """Seek the playback and tell the party about it.
+
+        Args:
+            position: Media position (in seconds).
+        """
+        self.party.clock.seek(position)
+        self.party.peers.clear()
+        if self.sync_channel is not None:
+            await self.sync_channel.send([SyncMessage(MessageType.SEEK, position=int(position * 1000))])
+
+    def update_health(self):
+        """Show the connection state and restart the failed tasks when the connection is restored.
+        """
+        if self.health is None:
+            return
+
+        connection_status: Waiting = self.get_sprite('connection_status')
+        connection_status.completion_status = HEALTH_STATUSES[self.health.state]
+
+        if self.health.state not in (HealthState.CONNECTED, HealthState.DEGRADED):
+            return
+        if self.connection_task is None and not self.streamer.finished and self.stream_restarts.can_restart():
+            logging.info('Resuming stream downloading.')
+            self.connection_task = asyncio.create_task(self.streamer.run())
+        if self.sync_task is None and self.sync_restarts.can_restart():
+            logging.info('Reconnecting the sync channel.')
+            self.sync_task = asyncio.create_task(self.sync_channel.run())
+
+    async def update_connection_task(self):
+        """Update the tasks of downloading the stream and of the sync channel.
+
+        Only network errors are reported to the connection monitor. Other failures are not fixed by reconnecting,
+        so the task is restarted with a backoff and given up after several failures in a row.
+        """
+        if self.connection_task and self.connection_task.done():
+            error: Optional[BaseException] = (None if self.connection_task.cancelled() else
+                                              self.connection_task.exception())
+            if error is None:
+                logging.info('Stream downloading is finished: %s', self.streamer.controller.metrics.as_dict())
+                self.stream_restarts.reset()
+            else:
+                self.handle_task_failure('Stream downloading', error, self.stream_restarts)
+            self.connection_task = None
+
+        if self.sync_task and self.sync_task.done():
+            error: Optional[BaseException] = None if self.sync_task.cancelled() else self.sync_task.exception()
+            if error is None:
+                # The server closed the channel after it had worked.
+                self.sync_restarts.reset()
+                self.health.report_failure()
+            else:
+                self.handle_task_failure('The sync channel', error, self.sync_restarts)
+            self.sync_task = None
+
+    def handle_task_failure(self, name: str, error: BaseException, restarts: RestartPolicy):
+        """Report a network error to the connection monitor or schedule a delayed restart of the task.
+
+        Args:
+            name: Task name for the log.
+            error: Error of the task.
+            restarts: Restarts of the task.
+        """
+        if is_network_error(error):
+            logging.error('%s failed: %s', name, error)
+            self.health.report_failure()
+            return
+
+        restarts.register_failure()
+        if restarts.exhausted:
+            logging.error('%s failed %d times in a row, giving up: %s', name, restarts.failures, error)
+        else:
+            logging.error('%s failed, restarting in %.1f s: %s', name,
+                          restarts.retry_at - time.perf_counter(), error)
+
+    def handle_message(self, key: Hashable, message: Any):
+        self.party.handle_message(message)
 
     async def enter(self):
-        pass
+        self.host = self.app.transmitted_data.get('host')
+        if self.host is None:
+            logging.error('The Cinema scene was opened without a server address.')
+            return
+
+        self.health = ConnectionHealth(self.host)
+        self.health_task = asyncio.create_task(self.health.run())
+        self.party.health = self.health
+
+        self.streamer = Streamer(self.host)
+        self.connection_task = asyncio.create_task(self.streamer.run())
+
+        self.sync_channel = SyncChannel(self.host, self.messages)
+        self.sync_task = asyncio.create_task(self.sync_channel.run())
+
+        media_mode: Optional[str] = os.environ.get('WATCHSYNC_MEDIA_WORKER')
+        if media_mode:
+            try:
+                self.media_worker = MediaWorker(self.frame_size, media_mode)
+            except ValueError as error:
+                logging.warning('WATCHSYNC_MEDIA_WORKER is ignored, decoding in a thread: %s', error)
+                self.media_worker = MediaWorker(self.frame_size, 'thread')
+            self.media_worker.start()
+            self.add_sprite('video', Video(self.app, Vector2(320, 120), (1280, 720)), layer=-1)
+
+        subtitles_path: Optional[str] = self.app.transmitted_data.get('subtitles')
+        if subtitles_path is not None:
+            self.subtitles_task = asyncio.create_task(self.load_subtitles(subtitles_path))
+
+    async def load_subtitles(self, path: str):
+        """Load the subtitles without blocking the frame loop.
+
+        Args:
+            path: The path to the SRT or WebVTT file.
+        """
+        try:
+            index: SubtitleIndex = await asyncio.to_thread(load_subtitles, path)
+        except (OSError, UnicodeDecodeError) as error:
+            logging.error('Failed to load subtitles %s: %s', path, error)
+            return
+        logging.info('Loaded %d subtitle cues from %s.', len(index), path)
+        subtitles: Subtitles = self.get_sprite('subtitles')
+        subtitles.set_index(index)
 
     async def exit(self):
-        pass
+        if self.health_task is not None:
+            self.health_task.cancel()
+            self.health_task = None
+        self.health = None
+
+        if self.connection_task is not None:
+            self.connection_task.cancel()
+            self.connection_task = None
+        self.streamer = None
+        self.stream_restarts.reset()
+
+        if self.sync_task is not None:
+            self.sync_task.cancel()
+            self.sync_task = None
+        self.sync_channel = None
+        self.sync_restarts.reset()
+
+        if self.thumbnail_task is not None:
+            self.thumbnail_task.cancel()
+            self.thumbnail_task = None
+        if self.subtitles_task is not None:
+            self.subtitles_task.cancel()
+            self.subtitles_task = None
+        seek_bar: SeekBar = self.get_sprite('seek_bar')
+        seek_bar.duration = 0
+        seek_bar.thumbnails = None
+
+        if self.media_worker is not None:
+            self.media_worker.stop()
+            self.media_worker = None
+            self.remove_sprite('video')
+        self._frame_time = 0
+        self._submitted_segment = -1
+
+        self.messages.clear()
+        self.party = PartySync()
+        subtitles: Subtitles = self.get_sprite('subtitles')
+        subtitles.set_index(None)
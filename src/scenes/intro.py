@@ -1,6 +1,8 @@
 """A scene module with an intro.
 """
 import asyncio
+import os
+import time
 from typing import TYPE_CHECKING, Optional
 from asyncio import Task
 
@@ -9,7 +11,7 @@ import aiohttp
 from pygame import Vector2
 
 from src.scene import Scene
-
+from src.modules import get_server_url
 from src.sprites import Text, Button, InBlockText, TextAlign, Input, TextSettings, Waiting, CompletionStatus
 
 if TYPE_CHECKING:
@@ -18,6 +20,9 @@ if TYPE_CHECKING:
 
 class Intro(Scene):
     """A class with an intro.
+
+    The Cinema scene is opened with the checked server address and the path of the subtitles set by the
+    WATCHSYNC_SUBTITLES environment variable, if any.
     """
 
     def __init__(self, app: 'App'):
@@ -49,8 +54,12 @@ class Intro(Scene):
         connect_button.disabled = True
         server_url_input.disabled = True
 
-        self.add_sprite('connect_waiting', Waiting(self.app, Vector2(760, 645), (400, 30),
-                                                   CompletionStatus.WORKING))
+        waiting: Optional[Waiting] = self.sprites.get('connect_waiting')
+        if waiting is None:
+            self.add_sprite('connect_waiting', Waiting(self.app, Vector2(760, 645), (400, 30),
+                                                       CompletionStatus.WORKING))
+        else:
+            waiting.completion_status = CompletionStatus.WORKING
 
         self.taste_connection_task = asyncio.create_task(self.can_connect(host))
 
@@ -71,18 +80,27 @@ class Intro(Scene):
                 return
 
             waiting.completion_status = CompletionStatus.SUCCESS
-            await self.app.change_scene('Cinema')
+            server_url_input: Input = self.get_sprite('server_url_input')
+            await self.app.change_scene('Cinema', {'host': server_url_input.text.text,
+                                                   'subtitles': os.environ.get('WATCHSYNC_SUBTITLES')})
 
-    @staticmethod
-    async def can_connect(host: str) -> bool:
+    async def can_connect(self, host: str) -> bool:
         """Make a get request.
 
         Returns:
             Response data.
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f'http://{host}:22020/taste') as response:
-                return (await response.json())['delicious']
+        started: float = time.perf_counter()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(get_server_url(host, 'taste')) as response:
+                    return (await response.json())['delicious']
+        except Exception:
+            self.app.metrics.counter('taste_request_failures', 'Failed requests to the taste endpoint.').inc()
+            raise
+        finally:
+            self.app.metrics.histogram('taste_request_seconds', 'Latency of the taste endpoint.').record(
+                time.perf_counter() - started)
 
     @staticmethod
     def is_valid_ip(ip_str):
@@ -1,26 +1,35 @@
 """A module for working with game sprites. Provides basic functionality.
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 from abc import ABC, abstractmethod
 
-from pygame import Surface, sprite, Rect, SRCALPHA, Vector2
+from pygame import Surface, sprite, Rect, Vector2
 
 if TYPE_CHECKING:
     from src.app import App
+    from src.sprites.container import Container
 
 
 class Sprite(sprite.Sprite, ABC):
     """An abstract base class for game sprites.
 
+    Every update_view of a subclass calls mark_dirty, which invalidates the cached images of the containers
+    above it.
+
     Attributes:
         app (App): The main class of the application.
         image (Surface): Graphical representation of a sprite.
         position (Vector2): Determining the sprite position.
-
+        layer (int): Drawing layer. Sprites with a higher layer are drawn on top.
+        parent (Container | None): The container the sprite belongs to.
+        _draw_item (tuple[Surface, Rect] | None): Cached image and screen rect for the render pass.
+        _draw_x (float): Horizontal position for which the draw item was built.
+        _draw_y (float): Vertical position for which the draw item was built.
+        _draw_factors (tuple[float, float]): Window scale for which the draw item was built.
     """
 
-    def __init__(self, app: 'App', size: tuple[int, int], position: Vector2 = Vector2(0, 0)):
+    def __init__(self, app: 'App', size: tuple[int, int], position: Optional[Vector2] = None):
         """Initializes the sprite.
 
         Args:
@@ -30,14 +39,55 @@ class Sprite(sprite.Sprite, ABC):
         """
         super().__init__()
         self.app: 'App' = app
-        self.image: Surface = Surface(size, SRCALPHA, 32).convert_alpha()
-        self.position: Vector2 = position
+        self.image: Surface = app.surface_pool.acquire(size)
+        self.position: Vector2 = position if position is not None else Vector2(0, 0)
+        self.layer: int = 0
+        self.parent: Optional['Container'] = None
+
+        self._draw_item: Optional[tuple[Surface, Rect]] = None
+        self._draw_x: float = 0
+        self._draw_y: float = 0
+        self._draw_factors: tuple[float, float] = (0, 0)
+
+    def mark_dirty(self):
+        """Reports that the image of the sprite has changed.
+        """
+        if self.parent is not None:
+            self.parent.invalidate()
+
+    def get_draw_item(self, x_factor: float, y_factor: float) -> tuple[Surface, Rect]:
+        """Returns the image and its screen rect. They are rebuilt only when the position,
+        the image or the window scale changes.
+
+        Args:
+            x_factor: Horizontal window scale.
+            y_factor: Vertical window scale.
+
+        Returns:
+            Tuple of the image and the screen rect.
+        """
+        draw_item: Optional[tuple[Surface, Rect]] = self._draw_item
+        position: Vector2 = self.position
+        # The fields are compared one by one, so an unchanged sprite costs no allocation per frame.
+        if (draw_item is not None and draw_item[0] is self.image and position.x == self._draw_x
+                and position.y == self._draw_y and self._draw_factors[0] == x_factor
+                and self._draw_factors[1] == y_factor):
+            return draw_item
+
+        self._draw_x = position.x
+        self._draw_y = position.y
+        if self._draw_factors[0] != x_factor or self._draw_factors[1] != y_factor:
+            self._draw_factors = (x_factor, y_factor)
+        self._draw_item = (self.image, Rect(position.x * x_factor, position.y * y_factor,
+                                            self.image.get_width(), self.image.get_height()))
+        return self._draw_item
 
     @abstractmethod
     def update_view(self):
-        """Updates the graphical representation of the sprite.
+        """Updates the graphical representation of the sprite. Implementations call mark_dirty.
         """
-        self.image = Surface(self.image.get_size(), SRCALPHA, 32).convert_alpha()
+        self.app.surface_pool.release(self.image)
+        self.image = self.app.surface_pool.acquire(self.image.get_size())
 
     @abstractmethod
     async def update(self):
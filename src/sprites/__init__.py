@@ -1,6 +1,14 @@
 from .text import Text, TextAlign, InBlockText, TextSettings
+from .glyph_atlas import GlyphAtlas, AtlasText
+from .widget import WidgetState, is_under_mouse
 from .button import Button
 from .lag_machine import LagMachine
 from .image import Image
 from .waiting import Waiting, CompletionStatus
 from .input import Input
+from .container import Container
+from .particles import ParticleField
+from .subtitles import Subtitles
+from .virtual_list import VirtualList
+from .video import Video
+from .seek_bar import SeekBar
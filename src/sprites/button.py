@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, Callable, Optional, Union, Any, Coroutine
 import pygame as pg
 from pygame import Vector2
 
-from src.sprites import InBlockText
+from src.sprites import InBlockText, WidgetState, is_under_mouse
 
 from src.sprite import Sprite
 
@@ -16,14 +16,26 @@ if TYPE_CHECKING:
 class Button(Sprite):
     """The class that implements the button.
 
+    The images of all states are rendered once and only swapped when the state changes, so mouse
+    movement that does not change the state costs no rendering.
+
     Attributes:
         text: The text that is displayed on the button.
         placeholder: An image that can be inserted into the button.
-        disabled: A flag indicating whether the button is working.
         callback: The function that is called when interacting with the button.
         context: The context in which the button is called. It will be passed to the function when the button is clicked.
+        state: Current visual state.
+        _disabled: A flag indicating whether the button is working.
+        _state_images: Pre-rendered images in {state: image} format.
     """
 
+    STATE_COLORS: dict[WidgetState, tuple[int, int, int]] = {
+        WidgetState.NORMAL: (32, 32, 32),
+        WidgetState.HOVER: (23, 23, 23),
+        WidgetState.PRESSED: (58, 58, 58),
+        WidgetState.DISABLED: (32, 32, 32),
+    }
+
     def __init__(self, app: 'App', position: Vector2, size: tuple[int, int], text: Optional[InBlockText] = None,
                  callback: Optional[Callable[[Optional[str]], Coroutine[Any, Any, None]]] = None,
                  context: Optional[str] = None,
@@ -44,37 +56,92 @@ class Button(Sprite):
         super().__init__(app, size, position)
         self.text: InBlockText = text
         self.placeholder: Callable[[], pg.Surface] | None = placeholder
-        self.disabled: bool = disabled
+        self._disabled: bool = disabled
 
         self.callback: Optional[Callable[[Optional[str]], Coroutine[Any, Any, None]]] = callback
         self.context: Optional[str] = context
 
+        self.state: WidgetState = WidgetState.DISABLED if disabled else WidgetState.NORMAL
+        self._state_images: dict[WidgetState, pg.Surface] = {}
+
+        # The initial image becomes the image of the initial state.
+        self._state_images[self.state] = self.image
         text.correct_position(size)
         self.update_view()
 
+    @property
+    def disabled(self) -> bool:
+        """A flag indicating whether the button is working.
+        """
+        return self._disabled
+
+    @disabled.setter
+    def disabled(self, disabled: bool):
+        self._disabled = disabled
+        self._set_state(self._get_state())
+
     def update_view(self):
-        if (self.position.x <= pg.mouse.get_pos()[0] <= self.position.x + self.image.get_size()[0] and
-                self.position.y <= pg.mouse.get_pos()[1] <= self.position.y + self.image.get_size()[1]):
-            self.image.fill((58, 58, 58) if pg.mouse.get_pressed()[0] else (23, 23, 23))
-        else:
-            self.image.fill((32, 32, 32))
+        """Renders the images of all states. Must be called when the text or the placeholder changes.
+        """
+        self.mark_dirty()
+        for state in self.STATE_COLORS:
+            image: Optional[pg.Surface] = self._state_images.get(state)
+            if image is None:
+                image = self.app.surface_pool.acquire(self.image.get_size())
+                self._state_images[state] = image
+            self._render_state(image, state)
+        self.image = self._state_images[self.state]
+
+    def _render_state(self, image: pg.Surface, state: WidgetState):
+        """Renders the image of one state.
 
-        self.image.blit(self.text.image, self.text.position)
-        pg.draw.rect(self.image, (78, 78, 78), pg.Rect(
-            0, 0, self.image.get_size()[0], self.image.get_size()[1]
-        ), 3)
+        Args:
+            image: Target image.
+            state: Visual state.
+        """
+        image.fill(self.STATE_COLORS[state])
+
+        if state == WidgetState.DISABLED:
+            text: pg.Surface = self.text.image.copy()
+            text.set_alpha(128)
+            image.blit(text, self.text.position)
+        else:
+            image.blit(self.text.image, self.text.position)
+        pg.draw.rect(image, (78, 78, 78), pg.Rect(0, 0, image.get_size()[0], image.get_size()[1]), 3)
 
         if self.placeholder is not None:
             placeholder: pg.Surface = self.placeholder()
-            self.image.blit(placeholder, (3, 3))
+            image.blit(placeholder, (3, 3))
+
+    def _get_state(self) -> WidgetState:
+        """Gets the state from the mouse and the disable flag.
+
+        Returns:
+            Visual state.
+        """
+        if self._disabled:
+            return WidgetState.DISABLED
+        if not is_under_mouse(self):
+            return WidgetState.NORMAL
+        return WidgetState.PRESSED if self.app.mouse_pressed[0] else WidgetState.HOVER
+
+    def _set_state(self, state: WidgetState):
+        """Switches to the pre-rendered image of the state.
+
+        Args:
+            state: Visual state.
+        """
+        if state == self.state:
+            return
+        self.state = state
+        self.image = self._state_images[state]
+        self.mark_dirty()
 
     async def update(self):
-        if (self.app.is_mouse_move or self.app.omitted_mouse_buttons) and not self.disabled:
-            self.update_view()
+        if (self.app.is_mouse_move or self.app.omitted_mouse_buttons) and not self._disabled:
+            self._set_state(self._get_state())
 
-            if (self.position.x <= pg.mouse.get_pos()[0] <= self.position.x + self.image.get_size()[0] and
-                    self.position.y <= pg.mouse.get_pos()[1] <= self.position.y + self.image.get_size()[1] and
-                    pg.mouse.get_pressed()[0] and self.app.omitted_mouse_buttons):
+            if self.state == WidgetState.PRESSED and self.app.omitted_mouse_buttons:
                 await self._call_func()
 
     async def _call_func(self):
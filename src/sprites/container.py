@@ -0,0 +1,138 @@
+"""A module that adds a container of sprites.
+
+The container renders its children into one cached image. While the children do not change, the whole
+subtree is drawn as a single image.
+"""
+import asyncio
+from typing import TYPE_CHECKING, Optional, TypeVar
+
+from pygame import Vector2
+
+from src.sprite import Sprite
+
+if TYPE_CHECKING:
+    from src.app import App
+
+SpriteT = TypeVar('SpriteT', bound=Sprite)
+
+
+class Container(Sprite):
+    """A node of the scene graph that groups sprites and caches their composite image.
+
+    Children keep screen positions, so their interaction (mouse hit tests) works as usual. The container
+    draws them relative to its own position and clips them by its size.
+
+    Attributes:
+        children: A dictionary with the child id as its key and the child itself as its value.
+        _draw_order: Children sorted by layer (None if the order has to be rebuilt).
+        _positions: Child positions relative to the container at the moment of the last rendering.
+        _dirty: The flag that the cached image has to be rendered again.
+    """
+
+    def __init__(self, app: 'App', position: Vector2, size: tuple[int, int]):
+        """Initialization.
+
+        Args:
+            app: The main class of the application.
+            position: The position of the sprite on the screen.
+            size: Container size.
+        """
+        super().__init__(app, size, position)
+        self.children: dict[str, Sprite] = {}
+        self._draw_order: Optional[list[Sprite]] = None
+        self._positions: dict[str, tuple[float, float]] = {}
+        self._dirty: bool = True
+
+    def add_child(self, uuid: str, obj: SpriteT, layer: int = 0) -> SpriteT:
+        """Adds a child sprite.
+
+        Args:
+            uuid: The unique identifier of the child.
+            obj: Object to add.
+            layer: Drawing layer inside the container.
+
+        Returns:
+            Added sprite (same as in the obj parameter).
+        """
+        obj.layer = layer
+        obj.parent = self
+        self.children[uuid] = obj
+        self._draw_order = None
+        self.invalidate()
+        return obj
+
+    def remove_child(self, uuid: str):
+        """Removes a child sprite.
+
+        Args:
+            uuid: The unique identifier of the child.
+        """
+        obj: Optional[Sprite] = self.children.pop(uuid, None)
+        if obj is None:
+            return
+        obj.parent = None
+        self._positions.pop(uuid, None)
+        self._draw_order = None
+        self.invalidate()
+
+    def get_child(self, uuid: str) -> Optional[Sprite]:
+        """Returns a child by its unique identifier.
+
+        Args:
+            uuid: The unique identifier of the child.
+
+        Returns:
+            Sprite or None if the child does not exist.
+        """
+        return self.children.get(uuid)
+
+    def move(self, offset: Vector2):
+        """Moves the container together with its children.
+
+        Args:
+            offset: Offset.
+        """
+        self.position += offset
+        for child in self.children.values():
+            child.position += offset
+
+    def _get_relative_position(self, child: Sprite) -> tuple[float, float]:
+        """Get the child position relative to the container.
+
+        Args:
+            child: Child sprite.
+
+        Returns:
+            Relative position.
+        """
+        return child.position.x - self.position.x, child.position.y - self.position.y
+
+    def invalidate(self):
+        """Marks the cached image as outdated. Called by the children when they change.
+        """
+        self._dirty = True
+
+    def update_view(self):
+        self.mark_dirty()
+        if self._draw_order is None:
+            self._draw_order = sorted(self.children.values(), key=lambda child: child.layer)
+
+        self.image.fill((0, 0, 0, 0))
+        self.image.blits([(child.image, self._get_relative_position(child)) for child in self._draw_order],
+                         doreturn=False)
+
+        for uuid, child in self.children.items():
+            self._positions[uuid] = self._get_relative_position(child)
+        self._dirty = False
+
+    async def update(self):
+        await asyncio.gather(*[child.update() for child in list(self.children.values())])
+
+        if not self._dirty:
+            for uuid, child in self.children.items():
+                if self._positions.get(uuid) != self._get_relative_position(child):
+                    self._dirty = True
+                    break
+
+        if self._dirty:
+            self.update_view()
@@ -0,0 +1,252 @@
+"""A module for drawing rapidly changing text from a glyph atlas.
+
+The characters are rasterized once per (font, size, color) into one surface. Strings are drawn with a
+single batched blit of atlas areas, so changing the text every frame does not render or allocate surfaces.
+Characters outside the initial set are appended on first use, the surface grows geometrically, so adding
+characters one by one costs amortized constant time. Characters that cannot be rendered, such as control
+characters, are drawn as the replacement character.
+"""
+import os.path
+from typing import TYPE_CHECKING, Optional
+
+import pygame as pg
+from pygame import SRCALPHA, Vector2
+
+from src.sprite import Sprite
+from src.sprites.text import get_font, TextAlign
+
+if TYPE_CHECKING:
+    from src.app import App
+
+DEFAULT_CHARSET: str = ''.join(chr(code) for code in range(32, 127))
+REPLACEMENT_CHARACTER: str = '\ufffd'
+
+
+class GlyphAtlas:
+    """Pre-rendered characters of one font, size and color in one surface.
+
+    Attributes:
+        font_path: Font path.
+        font_size: Font size.
+        color: Font color.
+        surface: Surface with all characters in one row. It is wider than the characters to leave room for
+            the new ones.
+        rects: Areas of the characters on the surface.
+        height: Line height.
+        _width: Width of the surface taken by the characters.
+    """
+
+    _atlases: dict[tuple[str, int, tuple[int, ...]], 'GlyphAtlas'] = {}
+
+    def __init__(self, font_path: str, font_size: int, color: tuple[int, ...], charset: str = DEFAULT_CHARSET):
+        """Initialization.
+
+        Args:
+            font_path: Font path.
+            font_size: Font size.
+            color: Font color.
+            charset: Characters to rasterize in advance. Other characters are added on first use.
+        """
+        self.font_path: str = font_path
+        self.font_size: int = font_size
+        self.color: tuple[int, ...] = color
+
+        self.surface: pg.Surface = pg.Surface((0, 0), SRCALPHA, 32)
+        self.rects: dict[str, pg.Rect] = {}
+        self.height: int = get_font(font_path, font_size).get_height()
+        self._width: int = 0
+
+        self._add(REPLACEMENT_CHARACTER + charset)
+
+    @classmethod
+    def get(cls, font_path: str = os.path.join('assets', 'fonts', 'MainFont.ttf'), font_size: int = 16,
+            color: tuple[int, ...] = (255, 255, 255)) -> 'GlyphAtlas':
+        """Get the shared atlas for the font, size and color. It is created on first use.
+
+        Args:
+            font_path: Font path.
+            font_size: Font size.
+            color: Font color.
+
+        Returns:
+            Glyph atlas.
+        """
+        key: tuple[str, int, tuple[int, ...]] = (font_path, font_size, tuple(color))
+        if key not in cls._atlases:
+            cls._atlases[key] = cls(font_path, font_size, tuple(color))
+        return cls._atlases[key]
+
+    def _add(self, charset: str):
+        """Rasterize the new characters and append them to the atlas surface.
+
+        Args:
+            charset: Characters to add. The known ones are skipped, the ones that cannot be rendered
+                are mapped to the replacement character.
+        """
+        font: pg.font.Font = get_font(self.font_path, self.font_size)
+        glyphs: list[tuple[str, pg.Surface]] = []
+        replaced: list[str] = []
+        for symbol in dict.fromkeys(charset):
+            if symbol in self.rects:
+                continue
+            if not symbol.isprintable():
+                replaced.append(symbol)
+                continue
+            try:
+                glyphs.append((symbol, font.render(symbol, True, self.color)))
+            except (pg.error, ValueError, UnicodeError):
+                replaced.append(symbol)
+
+        if glyphs:
+            self._append(glyphs)
+        for symbol in replaced:
+            self.rects[symbol] = self.rects[REPLACEMENT_CHARACTER]
+
+    def _append(self, glyphs: list[tuple[str, pg.Surface]]):
+        """Append the rendered characters to the atlas surface.
+
+        Args:
+            glyphs: Characters and their images.
+        """
+        width: int = self._width + sum(glyph.get_width() for _, glyph in glyphs)
+        if width > self.surface.get_width():
+            self._grow(width)
+        for symbol, glyph in glyphs:
+            self.surface.blit(glyph, (self._width, 0))
+            self.rects[symbol] = pg.Rect(self._width, 0, glyph.get_width(), self.height)
+            self._width += glyph.get_width()
+
+    def _grow(self, width: int):
+        """Replace the atlas surface with a wider one, keeping the rasterized characters.
+
+        Args:
+            width: The smallest width of the new surface. The width is at least doubled.
+        """
+        surface: pg.Surface = pg.Surface((max(width, 2 * self.surface.get_width()), self.height),
+                                         SRCALPHA, 32).convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        surface.blit(self.surface, (0, 0), special_flags=pg.BLEND_RGBA_MAX)
+        self.surface = surface
+
+    def get_rect(self, symbol: str) -> pg.Rect:
+        """Get the area of the character on the atlas surface.
+
+        Args:
+            symbol: Character.
+
+        Returns:
+            Character area.
+        """
+        rect: Optional[pg.Rect] = self.rects.get(symbol)
+        if rect is None:
+            self._add(symbol)
+            rect = self.rects[symbol]
+        return rect
+
+    def measure(self, text: str) -> int:
+        """Measure the width of the text.
+
+        Args:
+            text: Text.
+
+        Returns:
+            Width in pixels.
+        """
+        return sum(self.get_rect(symbol).width for symbol in text)
+
+    def draw(self, target: pg.Surface, text: str, position: tuple[float, float],
+             sequence: Optional[list[list]] = None):
+        """Draw the text with one batched blit.
+
+        Args:
+            target: The surface to draw on.
+            text: Text.
+            position: Position of the top-left corner of the text.
+            sequence: Reusable blit sequence. If it is passed, its items are updated in place instead of
+                being created, so repeated drawing does not allocate.
+        """
+        if sequence is None:
+            sequence = []
+        if len(sequence) > len(text):
+            del sequence[len(text):]
+        while len(sequence) < len(text):
+            sequence.append([self.surface, [0, 0], None])
+
+        x: float = position[0]
+        for item, symbol in zip(sequence, text):
+            rect: pg.Rect = self.get_rect(symbol)
+            item[0] = self.surface
+            item[1][0] = x
+            item[1][1] = position[1]
+            item[2] = rect
+            x += rect.width
+
+        target.blits(sequence, doreturn=False)
+
+
+class AtlasText(Sprite):
+    """Text sprite for rapidly changing strings, such as timecodes and counters.
+
+    The sprite surface is reused while the text fits into it, and the text is drawn from the glyph atlas.
+
+    Attributes:
+        text: Displayed text.
+        atlas: Glyph atlas of the font.
+        align: Text align relative to the position.
+        anchor: The position passed on initialization, the text is aligned relative to it.
+    """
+
+    def __init__(self, app: 'App', position: Vector2, text: str, font_size: int = 16,
+                 color: tuple[int, int, int, int] | tuple[int, int, int] = (255, 255, 255),
+                 align: TextAlign = TextAlign.CENTER,
+                 font_path: str = os.path.join('assets', 'fonts', 'MainFont.ttf')):
+        """Initialization.
+
+        Args:
+            app: The main class of the application.
+            position: The position of the sprite on the screen.
+            text: Displayed text.
+            font_size: Font size.
+            color: Font color.
+            align: Text align.
+            font_path: Font path.
+        """
+        self.atlas: GlyphAtlas = GlyphAtlas.get(font_path, font_size, color)
+        super().__init__(app, (max(1, self.atlas.measure(text)), self.atlas.height), position)
+        self.text: str = text
+        self.align: TextAlign = align
+        self.anchor: Vector2 = Vector2(position)
+        self._sequence: list[list] = []
+
+        self.update_view()
+
+    def set_text(self, text: str):
+        """Change the text. Nothing is redrawn if the text is the same.
+
+        Args:
+            text: New text.
+        """
+        if text == self.text:
+            return
+        self.text = text
+        self.update_view()
+
+    def update_view(self):
+        self.mark_dirty()
+        width: int = self.atlas.measure(self.text)
+        if width > self.image.get_width():
+            self.image = pg.Surface((width, self.atlas.height), SRCALPHA, 32).convert_alpha()
+        else:
+            self.image.fill((0, 0, 0, 0))
+        self.atlas.draw(self.image, self.text, (0, 0), self._sequence)
+
+        self.position.x = self.anchor.x
+        self.position.y = self.anchor.y
+        if self.align == TextAlign.CENTER:
+            self.position.x -= width / 2
+            self.position.y -= self.atlas.height / 2
+        elif self.align == TextAlign.RIGHT:
+            self.position.x -= width
+
+    async def update(self):
+        pass
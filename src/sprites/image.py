@@ -50,6 +50,7 @@ class Image(Sprite):
         """
         self._scale = scale
         self.image = pg.transform.scale(self._origin, scale)
+        self.mark_dirty()
         return self
 
     def rotate(self, angle: float) -> Self:
@@ -63,6 +64,7 @@ class Image(Sprite):
         """
         self._angle = angle
         self.image = pg.transform.rotate(pg.transform.scale(self._origin, self._scale), angle)
+        self.mark_dirty()
         return self
 
     def get_angle(self) -> float:
@@ -4,7 +4,7 @@ from enum import Enum
 import pygame as pg
 from pygame import Vector2
 
-from src.sprites import TextSettings, InBlockText
+from src.sprites import TextSettings, InBlockText, GlyphAtlas, WidgetState, is_under_mouse
 
 from src.sprite import Sprite
 
@@ -24,19 +24,118 @@ class InputFormatting(Enum):
         Returns:
             Formatted string.
         """
-        action: dict[Self, Callable[[chr], chr]] = {
-            InputFormatting.NO_FORMATTING: lambda s: s,
-            InputFormatting.ONLY_DIGITS: lambda s: s if 48 <= ord(s) <= 57 else '',
-            InputFormatting.NORMALIZED: lambda s: '_' if s == ' ' else s.lower()
-        }
-        new_line: str = ''
-        for symbol in line:
-            new_line += action[formatting](symbol)
+        action: Callable[[str], str] = _FORMATTING_ACTIONS[formatting]
+        return ''.join(map(action, line))
+
+
+_FORMATTING_ACTIONS: dict[InputFormatting, Callable[[str], str]] = {
+    InputFormatting.NO_FORMATTING: lambda s: s,
+    InputFormatting.ONLY_DIGITS: lambda s: s if 48 <= ord(s) <= 57 else '',
+    InputFormatting.NORMALIZED: lambda s: '_' if s == ' ' else s.lower()
+}
+
+
+class TextBuffer:
+    """Editing model of a single-line text with a cursor and a selection.
+
+    Attributes:
+        text: Current text.
+        cursor: Cursor position (index of the character after the cursor).
+        anchor: The position where the selection starts. Equal to the cursor if nothing is selected.
+    """
+
+    def __init__(self, text: str = ''):
+        """Initialization.
+
+        Args:
+            text: Initial text. The cursor is placed at its end.
+        """
+        self.text: str = text
+        self.cursor: int = len(text)
+        self.anchor: int = len(text)
+
+    def has_selection(self) -> bool:
+        """Whether some text is selected.
+        """
+        return self.cursor != self.anchor
+
+    def get_selection(self) -> tuple[int, int]:
+        """Get the selection bounds.
+
+        Returns:
+            Start and end indexes of the selection.
+        """
+        return min(self.cursor, self.anchor), max(self.cursor, self.anchor)
+
+    def get_selected_text(self) -> str:
+        """Get the selected text.
+
+        Returns:
+            Selected text (empty if nothing is selected).
+        """
+        start, end = self.get_selection()
+        return self.text[start:end]
+
+    def insert(self, text: str):
+        """Insert a text at the cursor, replacing the selection.
+
+        Args:
+            text: Inserted text.
+        """
+        start, end = self.get_selection()
+        self.text = self.text[:start] + text + self.text[end:]
+        self.cursor = self.anchor = start + len(text)
+
+    def delete_backward(self):
+        """Delete the selection or the character before the cursor.
+        """
+        if not self.has_selection() and self.cursor > 0:
+            self.anchor = self.cursor - 1
+        self.insert('')
 
-        return new_line
+    def delete_forward(self):
+        """Delete the selection or the character after the cursor.
+        """
+        if not self.has_selection() and self.cursor < len(self.text):
+            self.anchor = self.cursor + 1
+        self.insert('')
+
+    def move(self, position: int, select: bool = False):
+        """Move the cursor.
+
+        Args:
+            position: New cursor position. It is limited by the text bounds.
+            select: Whether to extend the selection instead of resetting it.
+        """
+        self.cursor = max(0, min(len(self.text), position))
+        if not select:
+            self.anchor = self.cursor
+
+    def select_all(self):
+        """Select the whole text.
+        """
+        self.anchor = 0
+        self.cursor = len(self.text)
 
 
 class Input(Sprite):
+    """Single-line text input with a cursor, a selection and horizontal scrolling.
+
+    Only the characters that fit into the input are measured and drawn, so the cost of one keystroke
+    does not depend on the length of the text. The background of every state is rendered once, and the
+    input is redrawn only when its state, text or cursor changes.
+
+    Attributes:
+        text: Text settings. Its text attribute always contains the current text.
+        placeholder: The text that is displayed instead of the void.
+        buffer: Editing model.
+        scroll: Index of the first visible character.
+        _disabled: Disable flag.
+        _backgrounds: Pre-rendered backgrounds in {state: image} format.
+    """
+
+    PADDING: int = 10
+
     def __init__(self, app: 'App', position: Vector2, size: tuple[int, int], text: TextSettings,
                  placeholder: Optional[InBlockText], formatting: InputFormatting = InputFormatting.NO_FORMATTING,
                  default: str = '', limit: int = 0, disabled: bool = False):
@@ -59,42 +158,266 @@ class Input(Sprite):
 
         self.limit: int = limit
         self.formatting: InputFormatting = formatting
-        self.disabled: bool = disabled
+        self._disabled: bool = disabled
 
         self.selected: bool = False
+        self._backgrounds: dict[WidgetState, pg.Surface] = {
+            state: self._render_background(size, color) for state, color in (
+                (WidgetState.NORMAL, (32, 32, 32)),
+                (WidgetState.FOCUSED, (58, 58, 58)),
+                (WidgetState.DISABLED, (58, 58, 58)),
+            )
+        }
 
+        self.buffer: TextBuffer = TextBuffer(default)
         self.text.text = default
+        self.scroll: int = 0
+        self._atlas: GlyphAtlas = GlyphAtlas.get(text.font_path, text.font_size, text.color)
 
-        text.correct_position(size)
         placeholder.correct_position(size)
 
-        self.text.update_view()
         self.update_view()
 
+    @property
+    def disabled(self) -> bool:
+        """Disable flag.
+        """
+        return self._disabled
+
+    @disabled.setter
+    def disabled(self, disabled: bool):
+        if disabled == self._disabled:
+            return
+        self._disabled = disabled
+        self.update_view()
+
+    @property
+    def state(self) -> WidgetState:
+        """Current visual state.
+        """
+        if self._disabled:
+            return WidgetState.DISABLED
+        return WidgetState.FOCUSED if self.selected else WidgetState.NORMAL
+
+    @staticmethod
+    def _render_background(size: tuple[int, int], color: tuple[int, int, int]) -> pg.Surface:
+        """Renders the background of a state.
+
+        Args:
+            size: Input size.
+            color: Fill color.
+
+        Returns:
+            Background image.
+        """
+        background: pg.Surface = pg.Surface(size)
+        background.fill(color)
+        pg.draw.rect(background, (78, 78, 78), pg.Rect(0, 0, size[0], size[1]), 3)
+        return background
+
     def update_view(self):
-        self.text.correct_position((self.image.get_size()[0], self.image.get_size()[1]))
-        self.text.update_view()
+        self.mark_dirty()
+        self.image.blit(self._backgrounds[self.state], (0, 0))
+
+        if self.buffer.text == '':
+            self.image.blit(self.placeholder.image, self.placeholder.position)
+        else:
+            self._draw_visible_text()
+
+        if self.selected and not self.disabled:
+            x: int = self.PADDING + self._measure(self.scroll, self.buffer.cursor)
+            pg.draw.line(self.image, self.text.color, (x, self.PADDING),
+                         (x, self.image.get_size()[1] - self.PADDING), 2)
+
+    def _draw_visible_text(self):
+        """Draw the characters that fit into the input, starting from the first visible one.
+        """
+        width: int = self.image.get_size()[0] - self.PADDING
+        y: int = int((self.image.get_size()[1] - self._atlas.height) / 2)
+        selection_start, selection_end = self.buffer.get_selection()
+
+        end: int = self.scroll
+        x: int = self.PADDING
+        while end < len(self.buffer.text):
+            glyph_width: int = self._get_glyph_width(self.buffer.text[end])
+            if x + glyph_width > width:
+                break
+            if selection_start <= end < selection_end:
+                self.image.fill((78, 78, 120), pg.Rect(x, y, glyph_width, self._atlas.height))
+            x += glyph_width
+            end += 1
+
+        self._atlas.draw(self.image, self.buffer.text[self.scroll:end], (self.PADDING, y))
+
+    def _get_glyph_width(self, symbol: str) -> int:
+        """Get the width of the character.
+
+        Args:
+            symbol: Character.
+
+        Returns:
+            Width in pixels.
+        """
+        return self._atlas.get_rect(symbol).width
+
+    def _measure(self, start: int, end: int) -> int:
+        """Measure the width of the characters.
+
+        Args:
+            start: Index of the first character.
+            end: Index after the last character.
+
+        Returns:
+            Width in pixels.
+        """
+        return sum(self._get_glyph_width(self.buffer.text[i]) for i in range(start, end))
+
+    def _fits(self, start: int, end: int, width: int) -> bool:
+        """Check whether the characters fit into the width. Stops measuring as soon as the width is exceeded.
+
+        Args:
+            start: Index of the first character.
+            end: Index after the last character.
+            width: Available width in pixels.
+
+        Returns:
+            Whether the characters fit.
+        """
+        for i in range(start, end):
+            width -= self._get_glyph_width(self.buffer.text[i])
+            if width < 0:
+                return False
+        return True
+
+    def _scroll_to_cursor(self):
+        """Move the visible window so that the cursor is inside it.
+        """
+        cursor: int = self.buffer.cursor
+        if cursor < self.scroll:
+            self.scroll = cursor
+            return
+
+        width: int = self.image.get_size()[0] - 2 * self.PADDING
+        if self._fits(self.scroll, cursor, width):
+            return
+
+        scroll: int = cursor
+        visible_width: int = 0
+        while scroll > 0:
+            glyph_width: int = self._get_glyph_width(self.buffer.text[scroll - 1])
+            if visible_width + glyph_width > width:
+                break
+            visible_width += glyph_width
+            scroll -= 1
+        self.scroll = scroll
 
-        self.image.fill((58, 58, 58) if self.selected or self.disabled else (32, 32, 32))
+    def _get_index_at(self, x: float) -> int:
+        """Get the cursor position closest to the point.
 
-        self.image.blit(self.placeholder.image if self.text.text == '' else self.text.image,
-                        self.placeholder.position if self.text.text == '' else self.text.position)
+        Args:
+            x: Horizontal coordinate relative to the input.
+
+        Returns:
+            Cursor position.
+        """
+        offset: float = self.PADDING
+        for index in range(self.scroll, len(self.buffer.text)):
+            glyph_width: int = self._get_glyph_width(self.buffer.text[index])
+            if x < offset + glyph_width / 2:
+                return index
+            offset += glyph_width
+        return len(self.buffer.text)
+
+    def insert(self, text: str):
+        """Insert a text at the cursor. Only the inserted characters are formatted.
+
+        Args:
+            text: Inserted text.
+        """
+        text = InputFormatting.formatting(self.formatting, text)
+        if self.limit > 0:
+            start, end = self.buffer.get_selection()
+            text = text[:max(0, self.limit - len(self.buffer.text) + end - start)]
+        if text == '' and not self.buffer.has_selection():
+            return
+        self.buffer.insert(text)
+
+    def _handle_keys(self) -> bool:
+        """Apply the pressed keys to the text.
 
-        pg.draw.rect(self.image, (78, 78, 78), pg.Rect(
-            0, 0, self.image.get_size()[0], self.image.get_size()[1]
-        ), 3)
+        Returns:
+            Whether the text or the cursor has changed.
+        """
+        changed: bool = False
+        control: bool = bool(self.app.key_modifiers & pg.KMOD_CTRL)
+        shift: bool = bool(self.app.key_modifiers & pg.KMOD_SHIFT)
+
+        for key in self.app.omitted_keys:
+            changed = True
+            if key == pg.K_BACKSPACE:
+                self.buffer.delete_backward()
+            elif key == pg.K_DELETE:
+                self.buffer.delete_forward()
+            elif key == pg.K_LEFT:
+                self.buffer.move(self.buffer.cursor - 1, shift)
+            elif key == pg.K_RIGHT:
+                self.buffer.move(self.buffer.cursor + 1, shift)
+            elif key == pg.K_HOME:
+                self.buffer.move(0, shift)
+            elif key == pg.K_END:
+                self.buffer.move(len(self.buffer.text), shift)
+            elif control and key == pg.K_a:
+                self.buffer.select_all()
+            elif control and key == pg.K_v:
+                self.insert(self._get_clipboard())
+            elif control and key == pg.K_c and self.buffer.has_selection():
+                self._set_clipboard(self.buffer.get_selected_text())
+            else:
+                changed = False
+
+        if not control:
+            for key in self.app.omitted_buttons:
+                if 32 <= key <= 126:
+                    self.insert(chr(key))
+                    changed = True
+
+        return changed
+
+    @staticmethod
+    def _get_clipboard() -> str:
+        """Get the text from the clipboard.
+
+        Returns:
+            Clipboard text without line breaks (empty if the clipboard is unavailable).
+        """
+        try:
+            return pg.scrap.get_text().replace('\r', '').replace('\n', '')
+        except pg.error:
+            return ''
+
+    @staticmethod
+    def _set_clipboard(text: str):
+        """Put the text into the clipboard.
+
+        Args:
+            text: Copied text.
+        """
+        try:
+            pg.scrap.put_text(text)
+        except pg.error:
+            pass
 
     async def update(self):
         if 1 in self.app.omitted_mouse_buttons:
-            self.selected = (self.position.x <= pg.mouse.get_pos()[0] <= self.position.x + self.image.get_size()[0] and
-                             self.position.y <= pg.mouse.get_pos()[1] <= self.position.y + self.image.get_size()[1])
-            self.update_view()
+            selected: bool = is_under_mouse(self)
+            cursor: tuple[int, int] = (self.buffer.cursor, self.buffer.anchor)
+            if selected:
+                self.buffer.move(self._get_index_at(self.app.mouse_position[0] - self.position.x))
+            if selected != self.selected or cursor != (self.buffer.cursor, self.buffer.anchor):
+                self.selected = selected
+                self.update_view()
 
-        if self.selected and not self.disabled:
-            for key in self.app.omitted_buttons:
-                if 32 <= key <= 126 and not self.disabled and (len(self.text.text) < self.limit or self.limit <= 0):
-                    self.text.text = InputFormatting.formatting(self.formatting, self.text.text + chr(key))
-                    self.update_view()
-                if key == 8:
-                    self.text.text = self.text.text[:-1]
-                    self.update_view()
+        if self.selected and not self.disabled and self._handle_keys():
+            self.text.text = self.buffer.text
+            self._scroll_to_cursor()
+            self.update_view()
@@ -9,7 +9,7 @@ import pygame as pg
 from pygame import Vector2
 
 from src.sprite import Sprite
-from src.sprites import Text
+from src.sprites import GlyphAtlas
 
 if TYPE_CHECKING:
     from src.app import App
@@ -28,12 +28,16 @@ class LagMachine(Sprite):
         """
         super().__init__(app, (50, 50), position)
         self._calculation_generator = self._calculate_harmonic_series()
+        self._atlas: GlyphAtlas = GlyphAtlas.get()
+        self._sequence: list[list] = []
 
     def update_view(self):
+        self.mark_dirty()
         self.image.fill((32, 32, 32))
 
-        text: Text = Text(self.app, Vector2(25, 25), next(self._calculation_generator))
-        self.image.blit(text.image, text.position)
+        text: str = next(self._calculation_generator)
+        self._atlas.draw(self.image, text, (25 - self._atlas.measure(text) / 2, 25 - self._atlas.height / 2),
+                         self._sequence)
 
         pg.draw.rect(self.image, (78, 78, 78), pg.Rect(
             0, 0, self.image.get_size()[0], self.image.get_size()[1]
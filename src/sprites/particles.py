@@ -0,0 +1,86 @@
+"""A module that adds a field of particles.
+
+Particles are not separate sprites: their transforms live in a TransformStore, so thousands of them are
+moved and culled with vectorized operations and drawn with one batched blit.
+"""
+from typing import TYPE_CHECKING
+
+import pygame as pg
+from pygame import Vector2
+
+from src.sprite import Sprite
+from src.modules.transform_store import TransformStore, np
+
+if TYPE_CHECKING:
+    from src.app import App
+
+
+class ParticleField(Sprite):
+    """Sprite that draws many identical particles, for example a burst of reactions.
+
+    Attributes:
+        particle: The image of one particle.
+        store: Particle transforms.
+        velocities: Particle velocities in pixels per second, indexed by slot.
+        lifetimes: Remaining particle lifetimes (in seconds), indexed by slot.
+    """
+
+    def __init__(self, app: 'App', position: Vector2, size: tuple[int, int], particle: pg.Surface,
+                 capacity: int = 1024):
+        """Initialization.
+
+        Args:
+            app: The main class of the application.
+            position: The position of the sprite on the screen.
+            size: The size of the field. Particles outside of it are not drawn.
+            particle: The image of one particle.
+            capacity: Initial number of particle slots.
+        """
+        super().__init__(app, size, position)
+        self.particle: pg.Surface = particle
+        self.store: TransformStore = TransformStore(capacity)
+        self.velocities: np.ndarray = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetimes: np.ndarray = np.zeros(capacity, dtype=np.float32)
+
+    def emit(self, position: tuple[float, float], velocity: tuple[float, float], lifetime: float) -> int:
+        """Add a particle.
+
+        Args:
+            position: Position relative to the field.
+            velocity: Velocity in pixels per second.
+            lifetime: Lifetime (in seconds).
+
+        Returns:
+            Particle slot.
+        """
+        slot: int = self.store.allocate(position, self.particle.get_size())
+        if slot >= len(self.velocities):
+            extra: int = len(self.store.alive) - len(self.velocities)
+            self.velocities = np.concatenate([self.velocities, np.zeros((extra, 2), dtype=np.float32)])
+            self.lifetimes = np.concatenate([self.lifetimes, np.zeros(extra, dtype=np.float32)])
+        self.velocities[slot] = velocity
+        self.lifetimes[slot] = lifetime
+        return slot
+
+    def update_view(self):
+        self.mark_dirty()
+        self.image.fill((0, 0, 0, 0))
+        slots: np.ndarray = self.store.cull((0, 0, self.image.get_width(), self.image.get_height()))
+        if len(slots) == 0:
+            return
+        self.image.blits([(self.particle, position) for position in self.store.positions[slots].tolist()],
+                         doreturn=False)
+
+    async def update(self):
+        if len(self.store) == 0:
+            return
+
+        count: int = len(self.store.alive)
+        alive: np.ndarray = self.store.alive
+        self.store.positions[alive] += self.velocities[:count][alive] * self.app.delta_time
+        self.lifetimes[:count][alive] -= self.app.delta_time
+
+        for slot in np.flatnonzero(alive & (self.lifetimes[:count] <= 0)).tolist():
+            self.store.release(slot)
+
+        self.update_view()
@@ -0,0 +1,122 @@
+"""A module that adds the seek bar.
+"""
+from bisect import bisect_right
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Optional
+
+import pygame as pg
+from pygame import Vector2
+
+from src.sprite import Sprite
+from src.modules.thumbnails import ThumbnailSheet
+
+if TYPE_CHECKING:
+    from src.app import App
+
+
+class SeekBar(Sprite):
+    """Playback progress bar with a thumbnail preview of the hovered position.
+
+    The bar is drawn at the bottom of the sprite and the preview above it. The preview is placed at the
+    position of its thumbnail rather than under the mouse, so the sprite is redrawn only when the progress
+    moves by a pixel or the hovered thumbnail changes.
+
+    Attributes:
+        duration: Media duration (in seconds), 0 if unknown.
+        position_time: Current media position (in seconds).
+        thumbnails: Preview thumbnails (None if there are none).
+        callback: The function that is called with the clicked media position.
+        bar_height: Height of the bar.
+        _view_key: Progress and thumbnail index for which the image was rendered.
+    """
+
+    def __init__(self, app: 'App', position: Vector2, width: int, preview_size: tuple[int, int] = (160, 90),
+                 callback: Optional[Callable[[float], Coroutine[Any, Any, None]]] = None, bar_height: int = 12):
+        """Initialization.
+
+        Args:
+            app: The main class of the application.
+            position: The position of the sprite on the screen.
+            width: Bar width.
+            preview_size: Size of the preview above the bar.
+            callback: The function that is called with the clicked media position.
+            bar_height: Height of the bar.
+        """
+        super().__init__(app, (width, preview_size[1] + 8 + bar_height), position)
+        self.duration: float = 0
+        self.position_time: float = 0
+        self.thumbnails: Optional[ThumbnailSheet] = None
+        self.callback: Optional[Callable[[float], Coroutine[Any, Any, None]]] = callback
+        self.bar_height: int = bar_height
+        self._view_key: tuple = ()
+
+    def _get_bar_rect(self) -> pg.Rect:
+        """Get the bar area relative to the sprite.
+
+        Returns:
+            Bar area.
+        """
+        return pg.Rect(0, self.image.get_height() - self.bar_height, self.image.get_width(), self.bar_height)
+
+    def _get_hover_x(self) -> Optional[int]:
+        """Get the hovered point of the bar.
+
+        Returns:
+            Horizontal coordinate relative to the sprite, or None if the bar is not hovered.
+        """
+        x: float = self.app.mouse_position[0] - self.position.x
+        y: float = self.app.mouse_position[1] - self.position.y
+        return int(x) if self._get_bar_rect().collidepoint(x, y) else None
+
+    def _get_time_at(self, x: int) -> float:
+        """Get the media position of a point of the bar.
+
+        Args:
+            x: Horizontal coordinate relative to the sprite.
+
+        Returns:
+            Media position (in seconds).
+        """
+        return self.duration * x / self.image.get_width()
+
+    def _get_preview_index(self) -> int:
+        """Get the thumbnail of the hovered point of the bar.
+
+        Returns:
+            Index of the thumbnail timestamp, or -1 if no thumbnail is shown.
+        """
+        hover_x: Optional[int] = self._get_hover_x()
+        if hover_x is None or self.thumbnails is None or self.duration <= 0:
+            return -1
+        return bisect_right(self.thumbnails.timestamps, self._get_time_at(hover_x)) - 1
+
+    def update_view(self):
+        self.mark_dirty()
+        self.image.fill((0, 0, 0, 0))
+        track: pg.Rect = self._get_bar_rect()
+        pg.draw.rect(self.image, (58, 58, 58), track)
+        if self.duration > 0:
+            progress: pg.Rect = track.copy()
+            progress.width = int(track.width * min(1.0, self.position_time / self.duration))
+            pg.draw.rect(self.image, (200, 200, 200), progress)
+
+        index: int = self._get_preview_index()
+        if index < 0:
+            return
+        timestamp: float = self.thumbnails.timestamps[index]
+        preview: pg.Surface = self.thumbnails.get(timestamp)
+        center: int = int(self.image.get_width() * timestamp / self.duration)
+        x: int = max(0, min(self.image.get_width() - preview.get_width(), center - preview.get_width() // 2))
+        self.image.blit(preview, (x, 0))
+        pg.draw.rect(self.image, (78, 78, 78), pg.Rect(x, 0, preview.get_width(), preview.get_height()), 2)
+
+    async def update(self):
+        hover_x: Optional[int] = self._get_hover_x()
+        progress: int = int(self.image.get_width() * self.position_time / self.duration) if self.duration > 0 else 0
+        view_key: tuple = (progress, self._get_preview_index())
+        if view_key != self._view_key:
+            self._view_key = view_key
+            self.update_view()
+
+        if (hover_x is not None and self.app.omitted_mouse_buttons and self.duration > 0 and
+                self.callback is not None):
+            await self.callback(self._get_time_at(hover_x))
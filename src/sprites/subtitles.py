@@ -0,0 +1,148 @@
+"""A module that adds the subtitles sprite.
+
+Cues are rendered into Text sprites a few seconds before they are shown, within a time budget per frame,
+and the Text sprites of the finished cues are returned to a pool and reused for the next ones.
+"""
+import os.path
+import time
+from typing import TYPE_CHECKING, Optional
+
+from pygame import Vector2
+
+from src.sprite import Sprite
+from src.sprites import Text, TextAlign
+from src.modules.pool import SpritePool
+from src.modules.subtitles import SubtitleIndex, Cue
+
+if TYPE_CHECKING:
+    from src.app import App
+
+
+class Subtitles(Sprite):
+    """Sprite that shows the active cues of a subtitle index, centered at the bottom of its area.
+
+    Attributes:
+        index: Subtitle index (None if there are no subtitles).
+        position_time: Media position the subtitles are shown for (in seconds).
+        font_size: Font size.
+        font_path: Font path.
+        lookahead: How long before its start a cue is rendered (in seconds).
+        render_budget: Time limit for rendering cues per frame (in seconds).
+        rendered: Rendered cues in {cue index: text} format.
+        _pool: Pool of Text sprites.
+        _active: Indexes of the cues that are shown now.
+    """
+
+    def __init__(self, app: 'App', position: Vector2, size: tuple[int, int], font_size: int = 32,
+                 font_path: str = os.path.join('assets', 'fonts', 'MainFont.ttf'), lookahead: float = 5,
+                 render_budget: float = 0.002):
+        """Initialization.
+
+        Args:
+            app: The main class of the application.
+            position: The position of the sprite on the screen.
+            size: The area of the subtitles. Lines longer than its width are wrapped.
+            font_size: Font size.
+            font_path: Font path.
+            lookahead: How long before its start a cue is rendered (in seconds).
+            render_budget: Time limit for rendering cues per frame (in seconds).
+        """
+        super().__init__(app, size, position)
+        self.index: Optional[SubtitleIndex] = None
+        self.position_time: float = 0
+        self.font_size: int = font_size
+        self.font_path: str = font_path
+        self.lookahead: float = lookahead
+        self.render_budget: float = render_budget
+        self.rendered: dict[int, Text] = {}
+        self._pool: SpritePool[Text] = SpritePool(self._create_text, self._reset_text)
+        self._active: tuple[int, ...] = ()
+
+    def _create_text(self, text: str) -> Text:
+        """Create a Text sprite for a cue.
+
+        Args:
+            text: Cue text.
+
+        Returns:
+            Rendered text.
+        """
+        return Text(self.app, Vector2(0, 0), text, self.font_size, align=TextAlign.LEFT,
+                    max_wight=self.image.get_width(), font_path=self.font_path)
+
+    @staticmethod
+    def _reset_text(sprite: Text, text: str):
+        """Render another cue into a reused Text sprite.
+
+        Args:
+            sprite: Reused text.
+            text: Cue text.
+        """
+        sprite.text = text
+        sprite.update_view()
+
+    def set_index(self, index: Optional[SubtitleIndex]):
+        """Show other subtitles.
+
+        Args:
+            index: Subtitle index (None to hide the subtitles).
+        """
+        for text in self.rendered.values():
+            self._pool.release(text)
+        self.rendered.clear()
+        self.index = index
+        self._active = ()
+        self.update_view()
+
+    def _get_text(self, cue: Cue) -> Text:
+        """Get the rendered cue, rendering it if it was not rendered in advance.
+
+        Args:
+            cue: Cue.
+
+        Returns:
+            Rendered text.
+        """
+        text: Optional[Text] = self.rendered.get(cue.index)
+        if text is None:
+            text = self._pool.acquire(cue.text)
+            self.rendered[cue.index] = text
+        return text
+
+    def _render_upcoming(self):
+        """Render the upcoming cues within the time budget and release the finished ones.
+        """
+        for cue_index in [cue_index for cue_index in self.rendered
+                          if self.index.cues[cue_index].end <= self.position_time or
+                          self.index.cues[cue_index].start > self.position_time + self.lookahead]:
+            self._pool.release(self.rendered.pop(cue_index))
+
+        deadline: float = time.perf_counter() + self.render_budget
+        for cue in self.index.get_upcoming(self.position_time, self.lookahead):
+            if cue.index in self.rendered:
+                continue
+            if time.perf_counter() > deadline:
+                break
+            self._get_text(cue)
+
+    def update_view(self):
+        self.mark_dirty()
+        self.image.fill((0, 0, 0, 0))
+        if self.index is None:
+            return
+
+        y: float = self.image.get_height()
+        for cue_index in reversed(self._active):
+            text: Text = self._get_text(self.index.cues[cue_index])
+            y -= text.image.get_height()
+            self.image.blit(text.image, ((self.image.get_width() - text.image.get_width()) / 2, y))
+
+    async def update(self):
+        if self.index is None:
+            return
+
+        active: tuple[int, ...] = tuple(cue.index for cue in self.index.get_active(self.position_time))
+        self._render_upcoming()
+        if active != self._active:
+            self._active = active
+            self.update_view()
@@ -1,11 +1,12 @@
 """A module for working with text.
 """
 import os.path
+from functools import cache
 from typing import TYPE_CHECKING, Optional, Self
 from enum import Enum
 
 import pygame as pg
-from pygame import SRCALPHA, Vector2
+from pygame import Vector2
 
 from src.sprite import Sprite
 
@@ -13,6 +14,20 @@ if TYPE_CHECKING:
     from src.app import App
 
 
+@cache
+def get_font(font_path: str, font_size: int) -> pg.font.Font:
+    """Get a loaded font. Fonts are loaded once and shared.
+
+    Args:
+        font_path: Font path.
+        font_size: Font size.
+
+    Returns:
+        Font.
+    """
+    return pg.font.Font(font_path, font_size)
+
+
 class TextAlign(Enum):
     """Text alignment.
     """
@@ -75,10 +90,12 @@ class Text(Sprite):
         TextAlign.apply(align, self)
 
     def update_view(self):
-        self.image = pg.Surface(self._get_surface_size(), SRCALPHA, 32).convert_alpha()
+        self.mark_dirty()
+        self.app.surface_pool.release(self.image)
+        self.image = self.app.surface_pool.acquire(self._get_surface_size())
         for line, text in enumerate(self._get_lines()):
             self.image.blit(
-                pg.font.Font(self.font_path, self.font_size).render(text, True, self.color),
+                get_font(self.font_path, self.font_size).render(text, True, self.color),
                 (0, line * self._get_line_height()))
 
     def _get_lines(self) -> list[str]:
@@ -95,7 +112,7 @@ class Text(Sprite):
         lines: list[str] = []
         line: str = ''
         for word in self.text.split():
-            if pg.font.Font(self.font_path, self.font_size).render(line + ' ' + word, True, (0, 0, 0)).get_size()[
+            if get_font(self.font_path, self.font_size).render(line + ' ' + word, True, (0, 0, 0)).get_size()[
                 0] > self.max_wight:
                 lines.append(line[:])
                 line = ''
@@ -112,7 +129,7 @@ class Text(Sprite):
         Returns:
             Row height
         """
-        return pg.font.Font(self.font_path, self.font_size).render('#', True, (0, 0, 0)).get_size()[1]
+        return get_font(self.font_path, self.font_size).render('#', True, (0, 0, 0)).get_size()[1]
 
     def _get_surface_size(self) -> tuple[int, int]:
         """Getting the image size.
@@ -120,7 +137,7 @@ class Text(Sprite):
         Returns:
             Getting the image size.
         """
-        wight = pg.font.Font(self.font_path, self.font_size).render(self.text, True, self.color).get_size()[0]
+        wight = get_font(self.font_path, self.font_size).render(self.text, True, self.color).get_size()[0]
         if self.max_wight is not None and self.max_wight < wight:
             wight = self.max_wight
 
@@ -0,0 +1,56 @@
+"""A module that adds the video sprite.
+"""
+from typing import TYPE_CHECKING, Optional
+
+import pygame as pg
+from pygame import Vector2
+
+from src.sprite import Sprite
+
+if TYPE_CHECKING:
+    from src.app import App
+
+
+class Video(Sprite):
+    """Sprite that shows decoded video frames.
+
+    Attributes:
+        frames: Number of shown frames.
+        _scaled: Reusable surface the frames of another size are scaled into (None until one is shown).
+    """
+
+    def __init__(self, app: 'App', position: Vector2, size: tuple[int, int]):
+        """Initialization.
+
+        Args:
+            app: The main class of the application.
+            position: The position of the sprite on the screen.
+            size: Sprite size. Frames of another size are scaled.
+        """
+        super().__init__(app, size, position)
+        self.frames: int = 0
+        self._scaled: Optional[pg.Surface] = None
+        self.image.fill((0, 0, 0))
+
+    def set_frame(self, frame: pg.Surface):
+        """Show a frame. The frame is copied, so it can be reused by its owner afterwards.
+
+        Args:
+            frame: Frame.
+        """
+        if frame.get_size() != self.image.get_size():
+            # Scaling needs a target of the frame format, it is allocated once and reused.
+            if self._scaled is None or self._scaled.get_masks() != frame.get_masks():
+                self._scaled = pg.Surface(self.image.get_size(), 0, frame)
+            frame = pg.transform.scale(frame, self.image.get_size(), self._scaled)
+        self.image.blit(frame, (0, 0))
+        self.frames += 1
+        self.mark_dirty()
+
+    def update_view(self):
+        self.mark_dirty()
+        self.image.fill((0, 0, 0))
+        self.frames = 0
+
+    async def update(self):
+        pass
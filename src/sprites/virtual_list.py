@@ -0,0 +1,255 @@
+"""A module that adds a virtualized list of text rows, for example a chat log or a list of participants.
+
+The rows are plain strings kept apart from their images. The wrapped height of every row is measured once
+and accumulated into row offsets, so the visible rows are found with a binary search, and only the visible
+rows have images. The images of rows that scroll out of view go back to the surface pool.
+"""
+import os.path
+from bisect import bisect_right
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable
+
+import pygame as pg
+from pygame import Vector2
+
+from src.sprite import Sprite
+from src.sprites.text import get_font
+from src.sprites.widget import is_under_mouse
+
+if TYPE_CHECKING:
+    from src.app import App
+
+
+@lru_cache(maxsize=65536)
+def get_word_width(font_path: str, font_size: int, word: str) -> int:
+    """Get the width of a word. Widths are cached, since chat messages mostly repeat the same words.
+
+    Args:
+        font_path: Font path.
+        font_size: Font size.
+        word: Word.
+
+    Returns:
+        Width in pixels.
+    """
+    return get_font(font_path, font_size).size(word)[0]
+
+
+def wrap_text(font_path: str, font_size: int, text: str, width: int) -> list[str]:
+    """Split a text into lines that fit into the width. Words longer than the width keep a line of their own.
+
+    Line widths are summed from the cached word widths, so a row is measured without rendering it.
+
+    Args:
+        font_path: Font path.
+        font_size: Font size.
+        text: Text.
+        width: Maximum line width in pixels.
+
+    Returns:
+        Lines (at least one).
+    """
+    space: int = get_word_width(font_path, font_size, ' ')
+    lines: list[str] = []
+    line: list[str] = []
+    line_width: int = 0
+    for word in text.split():
+        word_width: int = get_word_width(font_path, font_size, word)
+        if line and line_width + space + word_width > width:
+            lines.append(' '.join(line))
+            line = []
+            line_width = 0
+        line_width += word_width + (space if line else 0)
+        line.append(word)
+    lines.append(' '.join(line))
+    return lines
+
+
+class VirtualList(Sprite):
+    """A scrollable list that renders only its visible rows.
+
+    Attributes:
+        items: Row texts.
+        scroll: Distance from the top of the content to the top of the list (in pixels).
+        scroll_speed: Scroll distance of one mouse wheel step (in pixels).
+        follow: Whether the list stays scrolled to the end when rows are added at the end.
+        font_size: Font size.
+        color: Font color.
+        font_path: Font path.
+        spacing: Vertical space between rows (in pixels).
+        _heights: Wrapped heights of the rows.
+        _offsets: Top of every row relative to the top of the content.
+        _rows: Images of the visible rows in {row index: image} format.
+        _dirty: The flag that the image has to be rendered again.
+    """
+
+    def __init__(self, app: 'App', position: Vector2, size: tuple[int, int], font_size: int = 16,
+                 color: tuple[int, int, int] = (255, 255, 255), spacing: int = 4, scroll_speed: int = 48,
+                 font_path: str = os.path.join('assets', 'fonts', 'MainFont.ttf')):
+        """Initialization.
+
+        Args:
+            app: The main class of the application.
+            position: The position of the sprite on the screen.
+            size: List size.
+            font_size: Font size.
+            color: Font color.
+            spacing: Vertical space between rows (in pixels).
+            scroll_speed: Scroll distance of one mouse wheel step (in pixels).
+            font_path: Font path.
+        """
+        super().__init__(app, size, position)
+        self.items: list[str] = []
+        self.scroll: float = 0
+        self.scroll_speed: int = scroll_speed
+        self.follow: bool = True
+        self.font_size: int = font_size
+        self.color: tuple[int, int, int] = color
+        self.font_path: str = font_path
+        self.spacing: int = spacing
+
+        self._heights: list[int] = []
+        self._offsets: list[int] = []
+        self._rows: dict[int, pg.Surface] = {}
+        self._dirty: bool = True
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def content_height(self) -> int:
+        """Height of all rows (in pixels).
+        """
+        if not self.items:
+            return 0
+        return self._offsets[-1] + self._heights[-1]
+
+    def _get_lines(self, text: str) -> list[str]:
+        """Get the wrapped lines of a row.
+
+        Args:
+            text: Row text.
+
+        Returns:
+            Lines.
+        """
+        return wrap_text(self.font_path, self.font_size, text, self.image.get_width())
+
+    def extend(self, texts: Iterable[str]):
+        """Add rows at the end.
+
+        Args:
+            texts: Row texts.
+        """
+        at_end: bool = self.scroll >= self.get_max_scroll()
+        line_height: int = get_font(self.font_path, self.font_size).get_linesize()
+        for text in texts:
+            self._offsets.append(self.content_height + (self.spacing if self.items else 0))
+            self._heights.append(line_height * len(self._get_lines(text)))
+            self.items.append(text)
+
+        if self.follow and at_end:
+            self.scroll = self.get_max_scroll()
+        self._dirty = True
+
+    def append(self, text: str):
+        """Add a row at the end.
+
+        Args:
+            text: Row text.
+        """
+        self.extend((text,))
+
+    def clear(self):
+        """Remove all rows.
+        """
+        self.items.clear()
+        self._heights.clear()
+        self._offsets.clear()
+        for row in self._rows.values():
+            self.app.surface_pool.release(row)
+        self._rows.clear()
+        self.scroll = 0
+        self._dirty = True
+
+    def get_max_scroll(self) -> float:
+        """Get the scroll of the list that shows the last row at the bottom.
+
+        Returns:
+            Scroll (in pixels).
+        """
+        return max(0, self.content_height - self.image.get_height())
+
+    def scroll_to(self, scroll: float):
+        """Scroll the list.
+
+        Args:
+            scroll: New scroll. It is limited by the content.
+        """
+        scroll = max(0.0, min(float(scroll), self.get_max_scroll()))
+        if scroll != self.scroll:
+            self.scroll = scroll
+            self._dirty = True
+
+    def get_visible_range(self) -> range:
+        """Get the rows that intersect the list.
+
+        Returns:
+            Range of row indexes.
+        """
+        if not self.items:
+            return range(0)
+        first: int = max(0, bisect_right(self._offsets, self.scroll) - 1)
+        last: int = bisect_right(self._offsets, self.scroll + self.image.get_height())
+        return range(first, last)
+
+    def get_index_at(self, y: float) -> int:
+        """Get the row under a point.
+
+        Args:
+            y: Vertical screen coordinate.
+
+        Returns:
+            Row index or -1 if there is no row.
+        """
+        index: int = bisect_right(self._offsets, y - self.position.y + self.scroll) - 1
+        if index < 0 or y - self.position.y + self.scroll >= self._offsets[index] + self._heights[index]:
+            return -1
+        return index
+
+    def _render_row(self, index: int) -> pg.Surface:
+        """Render a row into a surface from the pool.
+
+        Args:
+            index: Row index.
+
+        Returns:
+            Row image.
+        """
+        font: pg.font.Font = get_font(self.font_path, self.font_size)
+        row: pg.Surface = self.app.surface_pool.acquire((self.image.get_width(), self._heights[index]))
+        for line_number, line in enumerate(self._get_lines(self.items[index])):
+            row.blit(font.render(line, True, self.color), (0, line_number * font.get_linesize()))
+        return row
+
+    def update_view(self):
+        self.mark_dirty()
+        visible: range = self.get_visible_range()
+        for index in [index for index in self._rows if index not in visible]:
+            self.app.surface_pool.release(self._rows.pop(index))
+
+        self.image.fill((0, 0, 0, 0))
+        for index in visible:
+            row: pg.Surface = self._rows.get(index)
+            if row is None:
+                row = self._render_row(index)
+                self._rows[index] = row
+            self.image.blit(row, (0, self._offsets[index] - self.scroll))
+        self._dirty = False
+
+    async def update(self):
+        if self.app.mouse_wheel and is_under_mouse(self):
+            self.scroll_to(self.scroll - self.app.mouse_wheel * self.scroll_speed)
+
+        if self._dirty:
+            self.update_view()
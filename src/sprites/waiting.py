@@ -1,8 +1,7 @@
 """The module that adds the wait sprite.
 """
-import time
 from typing import TYPE_CHECKING, cast, Self
-from math import sin, cos
+from math import sin, cos, pi
 from enum import Enum
 
 import pygame as pg
@@ -10,6 +9,7 @@ import pygame as pg
 from pygame import Vector2
 
 from src.sprite import Sprite
+from src.modules.animation import Tween
 
 if TYPE_CHECKING:
     from src.app import App
@@ -47,8 +47,11 @@ class CompletionStatus(Enum):
 class Waiting(Sprite):
     """Sprite class for waiting for something.
 
+    The sprite is redrawn only while the loading animation is running or when the status changes.
+
     Attributes:
-        completion_status: Completion or work status.
+        phase: Phase of the loading animation (in radians).
+        _completion_status: Completion or work status.
     """
 
     def __init__(self, app: 'App', position: Vector2, size: tuple[int, int],
@@ -62,9 +65,34 @@ class Waiting(Sprite):
             completion_status: Completion or work status.
         """
         super().__init__(app, size, position)
-        self.completion_status: CompletionStatus = completion_status
+        self.phase: float = 0
+        self._completion_status: CompletionStatus = completion_status
+        self._update_animation()
+        self.update_view()
+
+    @property
+    def completion_status(self) -> CompletionStatus:
+        """Completion or work status.
+        """
+        return self._completion_status
+
+    @completion_status.setter
+    def completion_status(self, completion_status: CompletionStatus):
+        if completion_status == self._completion_status:
+            return
+        self._completion_status = completion_status
+        self._update_animation()
+        self.update_view()
+
+    def _update_animation(self):
+        """Starts the loading animation in the working status and stops it otherwise.
+        """
+        self.app.animator.cancel(self, 'phase')
+        if self._completion_status == CompletionStatus.WORKING:
+            self.app.animator.add(Tween(self, 'phase', self.phase, self.phase + 2 * pi, 2 * pi / 1.5, loops=0))
 
     def update_view(self):
+        self.mark_dirty()
         self.image.fill((32, 32, 32))
 
         if self.completion_status == CompletionStatus.WORKING:
@@ -77,19 +105,19 @@ class Waiting(Sprite):
         ), 3)
 
     async def update(self):
-        self.update_view()
+        pass
 
     def _update_loading_plate(self):
         """Animation implementation for the loading plate.
         """
 
         def get_dimensions_of_loading_plate() -> tuple[float, float]:
-            """Gets the width coordinate [-1; 1] of the animated element depending on the time.
+            """Gets the width coordinate [-1; 1] of the animated element depending on the animation phase.
 
             Returns:
                 Tuple with start and end coordinates [-1; 1].
             """
-            return sin(time.time() * 1.5), cos(time.time() * 1.5)
+            return sin(self.phase), cos(self.phase)
 
         dimensions_of_loading_plate: tuple[float, float] = get_dimensions_of_loading_plate()
 
@@ -0,0 +1,29 @@
+"""A module with the visual states of interactive widgets.
+"""
+from enum import Enum
+
+from src.sprite import Sprite
+
+
+class WidgetState(Enum):
+    """Visual state of a widget. Widgets pre-render one surface per state and swap them on transitions.
+    """
+    NORMAL = 0
+    HOVER = 1
+    PRESSED = 2
+    DISABLED = 3
+    FOCUSED = 4
+
+
+def is_under_mouse(sprite: Sprite) -> bool:
+    """Checks whether the mouse cursor is over the sprite.
+
+    Args:
+        sprite: Sprite.
+
+    Returns:
+        Whether the cursor is over the sprite.
+    """
+    x, y = sprite.app.mouse_position
+    return (sprite.position.x <= x <= sprite.position.x + sprite.image.get_size()[0] and
+            sprite.position.y <= y <= sprite.position.y + sprite.image.get_size()[1])